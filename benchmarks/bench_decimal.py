@@ -0,0 +1,65 @@
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_spec
+from src.formal.verifier import FormalVerifier
+from src.formal.z3_translator import DECIMAL_ENCODINGS
+
+
+def make_ledger_spec(n_entities: int) -> dict[str, Any]:
+    entities = []
+    for i in range(n_entities):
+        entities.append({
+            "name": f"Ledger{i}",
+            "fields": [
+                {"name": "id", "type": "UUID", "primary_key": True},
+                {"name": "amount", "type": "Decimal", "precision": 18, "scale": 2},
+                {"name": "fee", "type": "Decimal", "precision": 18, "scale": 2},
+                {"name": "total", "type": "Decimal", "precision": 18, "scale": 2},
+                {"name": "units", "type": "Int"},
+            ],
+            "invariants": [
+                {"name": "positive", "expr": "amount > 0"},
+                {"name": "fee_rate", "expr": f"fee * 1000 == amount * {15 + i % 5}"},
+                {"name": "total_sum", "expr": "total == amount + fee"},
+                {"name": "split", "expr": "amount / units >= 0.01 and units > 1"},
+                {"name": "cap", "expr": f"total <= {10 ** (i % 20)}.99"},
+            ],
+        })
+    services = [{
+        "name": f"Charge{i}",
+        "inputs": [{"name": "ledger_id", "type": "UUID"}, {"name": "amount", "type": "Decimal"}],
+        "preconditions": ["amount > 0.005", f"Ledger{i}(ledger_id).total + amount <= 1000000"],
+    } for i in range(n_entities)]
+    return {"name": f"Ledger{n_entities}", "entities": entities, "services": services}
+
+
+def _run(spec: dict[str, Any], encoding: str) -> tuple[float, bool, bool]:
+    start = time.perf_counter()
+    result = FormalVerifier(decimal_encoding=encoding).verify(spec)
+    return time.perf_counter() - start, result.is_consistent, result.is_complete
+
+
+def main() -> None:
+    cases = [(f"synthetic {n}x{n}", make_spec(n, n)) for n in (10, 50, 100)]
+    cases += [(f"ledger {n}", make_ledger_spec(n)) for n in (10, 50, 100)]
+    print(f"{'spec':>16} {'real (s)':>9} {'fixed (s)':>10} {'ratio':>6} {'real verdict':>13} {'fixed verdict':>14}")
+    for name, spec in cases:
+        runs = {encoding: _run(spec, encoding) for encoding in DECIMAL_ENCODINGS}
+        real, fixed = runs["real"], runs["fixed"]
+        print(
+            f"{name:>16} {real[0]:>9.3f} {fixed[0]:>10.3f} {fixed[0] / real[0]:>6.2f} "
+            f"{_verdict(real):>13} {_verdict(fixed):>14}"
+        )
+
+
+def _verdict(run: tuple[float, bool, bool]) -> str:
+    return "ok" if run[1] and run[2] else "inconsistent" if not run[1] else "incomplete"
+
+
+if __name__ == "__main__":
+    main()
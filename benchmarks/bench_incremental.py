@@ -0,0 +1,52 @@
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_entity, make_spec
+from src.dsl.ast_nodes import Specification
+from src.dsl.spec_loader import build_specification, validate_spec
+from src.dsl.validator import IncrementalValidator, SpecEdit, validate_specification
+
+
+def _edits(spec: Specification) -> list[tuple[str, Specification, SpecEdit]]:
+    n = len(spec.entities)
+    entity = spec.entities[n // 2]
+    narrowed = replace(entity, fields=entity.fields[:-1])
+    service = spec.services[n // 3]
+    contract = replace(service.contract, preconditions=service.preconditions + (f"{entity.name}(x).missing > 0",))
+    added = build_specification({"entities": [make_entity(n)]}).entities[0]
+    return [
+        ("drop field", replace(spec, entities=spec.entities[:n // 2] + (narrowed,) + spec.entities[n // 2 + 1:]),
+         SpecEdit(entities=frozenset({entity.name}))),
+        ("bad precondition",
+         replace(spec, services=spec.services[:n // 3] + (replace(service, contract=contract),)
+                 + spec.services[n // 3 + 1:]),
+         SpecEdit(services=frozenset({service.name}))),
+        ("add entity", replace(spec, entities=spec.entities + (added,)), SpecEdit(entities=frozenset({added.name}))),
+    ]
+
+
+def _time(fn: Callable[[], Any]) -> tuple[float, Any]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    print(f"{'entities':>8} {'edit':>16} {'full (ms)':>10} {'incremental (ms)':>17} {'errors':>7}")
+    for n in (1000, 4000, 16000):
+        spec = build_specification(make_spec(n, n))
+        for label, edited, edit in _edits(spec):
+            validator = IncrementalValidator(spec)
+            full, expected = _time(lambda: validate_spec(edited) + validate_specification(edited))
+            incremental, errors = _time(lambda: validator.update(edited, edit))
+            assert errors == expected
+            print(f"{n:>8} {label:>16} {full * 1e3:>10.1f} {incremental * 1e3:>17.2f} {len(errors):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_spec
+from src.formal.transitions import PRESERVED, InstanceEncoding
+
+
+def make_transfer_spec(n_entities: int, n_services: int) -> dict[str, Any]:
+    spec = make_spec(n_entities, n_services)
+    for i, service in enumerate(spec["services"]):
+        target = f"Account{i % n_entities}"
+        service["postconditions"] = [
+            f"{target}(source_id).amount0 == OLD.{target}(source_id).amount0 - amount",
+            f"{target}(target_id).amount0 == OLD.{target}(target_id).amount0 + amount",
+        ]
+    return spec
+
+
+def _run(spec: dict[str, Any], instances: int) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    encoding = InstanceEncoding(spec, instances)
+    results = encoding.check_all()
+    total = time.perf_counter() - start
+    return total, sum(r.solve_time for r in results), sum(r.status == PRESERVED for r in results)
+
+
+def main() -> None:
+    print(f"{'entities':>8} {'services':>8} {'N':>4} {'total (s)':>10} {'solve (s)':>10} {'preserved':>10}")
+    for n_entities, n_services in ((1, 1), (5, 10), (10, 50), (20, 100)):
+        spec = make_transfer_spec(n_entities, n_services)
+        for instances in (1, 2, 4, 8, 16, 32):
+            total, solve, preserved = _run(spec, instances)
+            print(
+                f"{n_entities:>8} {n_services:>8} {instances:>4} {total:>10.3f} {solve:>10.3f} "
+                f"{preserved:>5}/{n_services:<4}"
+            )
+
+
+if __name__ == "__main__":
+    main()
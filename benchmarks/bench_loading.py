@@ -0,0 +1,38 @@
+import gc
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_spec
+from src.dsl.ast_nodes import spec_dict_to_ast
+from src.dsl.spec_loader import SpecModel, parse_specification_text
+
+
+def _baseline(text: str) -> Any:
+    return spec_dict_to_ast(SpecModel.model_validate(yaml.safe_load(text)).model_dump())
+
+
+def _time(fn: Callable[[str], Any], text: str) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    print(f"{'entities':>8} {'yaml (MB)':>9} {'baseline (s)':>13} {'single pass (s)':>16} {'speedup':>8}")
+    for n in (100, 1000, 10000):
+        text = yaml.dump(make_spec(n, n), Dumper=dumper, sort_keys=False)
+        single = _time(parse_specification_text, text)
+        baseline = _time(_baseline, text)
+        print(f"{n:>8} {len(text) / 2 ** 20:>9.1f} {baseline:>13.3f} {single:>16.3f} {baseline / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from z3 import Solver, SolverFor, Then
+
+from benchmarks.logic_corpus import make_corpus
+from src.formal.smt_utils import SOLVER_STRATEGIES, TACTIC_PIPELINES
+
+
+def _strategies(logic: str) -> dict[str, Callable[[], Solver]]:
+    return {
+        "generic": Solver,
+        "logic": lambda: SolverFor(logic),
+        "tactic": lambda: Then(*TACTIC_PIPELINES[logic]).solver(),
+    }
+
+
+def _incremental(make: Callable[[], Solver], queries: list[list[Any]]) -> float:
+    solver = make()
+    solver.set("timeout", 5000)
+    start = time.perf_counter()
+    for formulas in queries:
+        solver.push()
+        solver.add(*formulas)
+        solver.check()
+        solver.pop()
+    return time.perf_counter() - start
+
+
+def _one_shot(make: Callable[[], Solver], queries: list[list[Any]]) -> float:
+    start = time.perf_counter()
+    for formulas in queries:
+        solver = make()
+        solver.set("timeout", 5000)
+        solver.add(*formulas)
+        solver.check()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    corpus = make_corpus()
+    print(f"{'logic':>8} {'queries':>8} {'mode':>12} {'generic (s)':>12} {'logic (s)':>10} {'tactic (s)':>11} {'selected':>9}")
+    for logic, queries in corpus.items():
+        for i, (mode, run) in enumerate((("incremental", _incremental), ("one-shot", _one_shot))):
+            times = {name: run(make, queries) for name, make in _strategies(logic).items()}
+            selected = SOLVER_STRATEGIES.get(logic, ("generic", "generic"))[i]
+            print(
+                f"{logic:>8} {len(queries):>8} {mode:>12} {times['generic']:>12.3f} "
+                f"{times['logic']:>10.3f} {times['tactic']:>11.3f} {selected:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_spec
+from src.dsl.ast_nodes import TypeTable
+from src.dsl.spec_loader import SpecModel, build_specification
+
+
+def _retained(build: Callable[[], Any]) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return value, retained
+
+
+def main() -> None:
+    print(f"{'entities':>8} {'fields':>8} {'dicts (MB)':>11} {'AST (MB)':>9} {'ratio':>6} {'bytes/field':>12} {'types':>6}")
+    for n_entities, fields_per_entity in ((1000, 8), (10000, 8), (25000, 16)):
+        raw = make_spec(n_entities, n_entities, fields_per_entity)
+        n_fields = sum(len(e["fields"]) for e in raw["entities"])
+        _, dicts = _retained(lambda: SpecModel.model_validate(raw).model_dump())
+        types = TypeTable()
+        _, ast = _retained(lambda: build_specification(raw, types))
+        print(
+            f"{n_entities:>8} {n_fields:>8} {dicts / 2 ** 20:>11.1f} {ast / 2 ** 20:>9.1f} {dicts / ast:>6.1f} "
+            f"{ast / n_fields:>12.0f} {len(types):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
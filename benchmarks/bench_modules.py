@@ -0,0 +1,74 @@
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_spec
+from src.dsl.modules import SpecWorkspace
+from src.dsl.spec_loader import load_spec
+
+N_MODULES = 32
+ENTITIES_PER_MODULE = 300
+
+
+def _module(m: int) -> dict[str, Any]:
+    spec = make_spec(ENTITIES_PER_MODULE, ENTITIES_PER_MODULE)
+    for entity in spec["entities"]:
+        entity["name"] = f"M{m}{entity['name']}"
+    for i, service in enumerate(spec["services"]):
+        service["name"] = f"M{m}{service['name']}"
+        # Every module past the first reads a balance owned by the shared module 0.
+        owner = f"M0Account{i % ENTITIES_PER_MODULE}" if m else f"M{m}Account{i % ENTITIES_PER_MODULE}"
+        service["preconditions"][-1] = f"{owner}(source_id).amount0 >= amount"
+    spec["imports"] = ["module0.yaml"] if m else []
+    return spec
+
+
+def _write_repository(root: Path) -> dict[int, Path]:
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    monolith: dict[str, Any] = {"name": "Monolith", "entities": [], "services": []}
+    for m in range(N_MODULES):
+        module = _module(m)
+        monolith["entities"] += module["entities"]
+        monolith["services"] += module["services"]
+        (root / f"module{m}.yaml").write_text(yaml.dump(module, Dumper=dumper, sort_keys=False), encoding="utf-8")
+    (root / "monolith.yaml").write_text(yaml.dump(monolith, Dumper=dumper, sort_keys=False), encoding="utf-8")
+    entries = {}
+    for touched in (1, 2, 4, 8, 16, N_MODULES):
+        entry = root / f"context{touched}.yaml"
+        imports = [f"module{m}.yaml" for m in range(touched)]
+        entry.write_text(yaml.dump({"name": f"Context{touched}", "imports": imports}), encoding="utf-8")
+        entries[touched] = entry
+    return entries
+
+
+def _load(entry: Path, max_workers: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    with SpecWorkspace(max_workers=max_workers) as workspace:
+        spec = workspace.load(entry)
+    return time.perf_counter() - start, len(spec["entities"])
+
+
+def main() -> None:
+    workers = multiprocessing.cpu_count()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        entries = _write_repository(root)
+        start = time.perf_counter()
+        load_spec(root / "monolith.yaml")
+        print(f"monolith: {N_MODULES} modules, {time.perf_counter() - start:.3f}s\n")
+        print(f"{'modules':>7} {'entities':>9} {'sequential (s)':>15} {f'{workers} workers (s)':>16}")
+        for touched, entry in entries.items():
+            sequential, n_entities = _load(entry, 1)
+            parallel, _ = _load(entry, workers)
+            print(f"{touched:>7} {n_entities:>9} {sequential:>15.3f} {parallel:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from z3 import sat
+
+from benchmarks.synthetic import make_spec
+from src.formal.smt_utils import create_solver
+from src.formal.verifier import FormalVerifier
+from src.formal.z3_translator import translate_spec_to_z3
+
+
+def _monolithic(spec: dict, timeout_ms: int) -> bool:
+    translation = translate_spec_to_z3(spec)
+    solver = create_solver(timeout_ms)
+    solver.add(*translation.invariant_formulas)
+    if solver.check() != sat:
+        return False
+    for formulas in translation.precondition_formulas.values():
+        solver.push()
+        solver.add(*formulas)
+        solver.check()
+        solver.pop()
+    return True
+
+
+def main() -> None:
+    timeout_ms = 5000
+    n_services = 400
+    print(f"services={n_services}, timeout={timeout_ms}ms")
+    print(f"{'entities':>9} {'components':>11} {'monolithic (s)':>15} {'sliced (s)':>11} {'speedup':>8}")
+    for n_entities in (50, 100, 300):
+        spec = make_spec(n_entities, n_services)
+        components = len(translate_spec_to_z3(spec).components)
+        start = time.perf_counter()
+        assert _monolithic(spec, timeout_ms)
+        monolithic_t = time.perf_counter() - start
+        start = time.perf_counter()
+        result = FormalVerifier(timeout_ms).verify(spec)
+        sliced_t = time.perf_counter() - start
+        assert result.is_consistent and result.is_complete
+        print(f"{n_entities:>9} {components:>11} {monolithic_t:>15.3f} {sliced_t:>11.3f} {monolithic_t / sliced_t:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
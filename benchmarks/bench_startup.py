@@ -0,0 +1,56 @@
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_spec
+from src.dsl.spec_loader import load_spec, load_specification
+
+ROOT = Path(__file__).parent.parent
+_STARTUP = "import sys; from src.dsl.spec_loader import {fn}; {fn}(sys.argv[1], sys.argv[2] or None)"
+
+
+def _time(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _startup(fn: str, path: Path, cache_dir: str) -> float:
+    command = [sys.executable, "-c", _STARTUP.format(fn=fn), str(path), cache_dir]
+    start = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    print(
+        f"{'entities':>8} {'loader':>19} {'yaml (s)':>9} {'.cbc (s)':>9} {'speedup':>8} "
+        f"{'process yaml (s)':>17} {'process .cbc (s)':>17}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (100, 1000, 10000):
+            path = Path(tmp) / f"spec{n}.yaml"
+            path.write_text(yaml.dump(make_spec(n, n), Dumper=dumper, sort_keys=False), encoding="utf-8")
+            cache_dir = str(Path(tmp) / "cache")
+            for loader in (load_spec, load_specification):
+                cold = _time(lambda: loader(path))
+                loader(path, cache_dir)
+                warm = _time(lambda: loader(path, cache_dir))
+                process_cold = _startup(loader.__name__, path, "")
+                process_warm = _startup(loader.__name__, path, cache_dir)
+                print(
+                    f"{n:>8} {loader.__name__:>19} {cold:>9.3f} {warm:>9.3f} {cold / warm:>7.1f}x "
+                    f"{process_cold:>17.3f} {process_warm:>17.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_spec
+from src.formal.z3_translator import translate_spec_to_z3
+
+
+def main() -> None:
+    print(f"{'entities':>9} {'services':>9} {'formulas':>9} {'translate (ms)':>15}")
+    for n in (10, 100, 1000, 3000):
+        spec = make_spec(n, n)
+        start = time.perf_counter()
+        result = translate_spec_to_z3(spec)
+        elapsed = (time.perf_counter() - start) * 1000
+        formulas = len(result.invariant_formulas) + sum(len(v) for v in result.precondition_formulas.values())
+        print(f"{n:>9} {n:>9} {formulas:>9} {elapsed:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import make_spec
+from src.codegen.go_checks import plan_precondition_checks
+from src.dsl.spec_index import SpecIndex
+from src.dsl.validator import validate_specification
+
+
+def main() -> None:
+    print(f"{'entities':>8} {'index (s)':>10} {'validate (s)':>13} {'us/entity':>10} {'pre checks (s)':>15}")
+    for n in (1000, 2000, 4000, 8000, 16000):
+        spec = make_spec(n, n)
+        start = time.perf_counter()
+        index = SpecIndex(spec)
+        indexed = time.perf_counter() - start
+        start = time.perf_counter()
+        validate_specification(spec, index)
+        validated = time.perf_counter() - start
+        start = time.perf_counter()
+        for service in spec["services"]:
+            plan_precondition_checks(spec, service, index)
+        planned = time.perf_counter() - start
+        print(f"{n:>8} {indexed:>10.3f} {validated:>13.3f} {validated / n * 1e6:>10.1f} {planned:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
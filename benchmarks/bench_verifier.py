@@ -0,0 +1,45 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from z3 import unsat
+
+from benchmarks.synthetic import make_spec
+from src.formal.verifier import FormalVerifier
+from src.formal.z3_translator import build_consistency_solver, build_service_solver
+
+
+def _rebuild_per_service(spec: dict, timeout_ms: int) -> int:
+    failures = 0
+    if build_consistency_solver(spec, timeout_ms).check() == unsat:
+        return -1
+    for service in spec.get("services", []):
+        solver = build_service_solver(spec, service["name"], timeout_ms=timeout_ms)
+        if solver.check() == unsat:
+            failures += 1
+    return failures
+
+
+def _timed(fn, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    value = fn(*args)
+    return time.perf_counter() - start, value
+
+
+def main() -> None:
+    timeout_ms = 5000
+    n_entities = 50
+    print(f"entities={n_entities}, timeout={timeout_ms}ms")
+    print(f"{'services':>9} {'rebuild (s)':>12} {'session (s)':>12} {'speedup':>8}")
+    for n_services in (10, 50, 100, 200, 400):
+        spec = make_spec(n_entities, n_services)
+        rebuild_t, _ = _timed(_rebuild_per_service, spec, timeout_ms)
+        session_t, result = _timed(FormalVerifier(timeout_ms).verify, spec)
+        assert result.is_consistent and result.is_complete
+        print(f"{n_services:>9} {rebuild_t:>12.3f} {session_t:>12.3f} {rebuild_t / session_t:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
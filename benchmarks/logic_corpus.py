@@ -0,0 +1,60 @@
+from typing import Any
+
+from z3 import BitVec, ULE, ULT, UGE, Or
+
+from benchmarks.synthetic import make_spec
+from src.formal.smt_utils import formula_signature, logic_for
+from src.formal.z3_translator import translate_spec_to_z3
+
+
+def _coupled_spec(n_entities: int, n_services: int, field_type: str) -> dict[str, Any]:
+    spec = make_spec(n_entities, n_services)
+    for entity in spec["entities"]:
+        for f in entity["fields"]:
+            if f["name"].startswith("amount"):
+                f["type"] = field_type
+        entity["invariants"] += [
+            {"name": "coupled_sum", "expr": "amount0 + amount1 <= amount2 * 2 + 7"},
+            {"name": "coupled_gap", "expr": "amount1 - amount3 >= 0 - 50 or amount0 == amount2"},
+            {"name": "closed_empty", "expr": "status != Closed or amount0 == 0"},
+        ]
+    for service in spec["services"]:
+        service["inputs"][2]["type"] = field_type
+    return spec
+
+
+def spec_queries(spec: dict[str, Any]) -> list[list[Any]]:
+    t = translate_spec_to_z3(spec)
+    queries = [t.component_formulas(i) for i in range(len(t.components))]
+    for name, formulas in t.precondition_formulas.items():
+        touched = [f for c in t.precondition_components[name] for f in t.component_formulas(c)]
+        queries.append(touched + formulas)
+    return queries
+
+
+def bitvector_queries(n_entities: int, width: int = 32) -> list[list[Any]]:
+    queries = []
+    for i in range(n_entities):
+        a, b, c = (BitVec(f"Account{i}_amount{j}", width) for j in range(3))
+        queries.append([
+            ULE(a, 1000),
+            ULT(b, 5000),
+            UGE(c, a + b),
+            ULE(c, 2 * a + 7),
+            Or(a == 3, ULT(b, a)),
+        ])
+    return queries
+
+
+def make_corpus(n_entities: int = 100, n_services: int = 200) -> dict[str, list[list[Any]]]:
+    queries = (
+        spec_queries(_coupled_spec(n_entities, n_services, "Int"))
+        + spec_queries(_coupled_spec(n_entities, n_services, "Decimal"))
+        + spec_queries(make_spec(n_entities, n_services))
+        + bitvector_queries(n_entities)
+    )
+    corpus: dict[str, list[list[Any]]] = {}
+    for formulas in queries:
+        logic = logic_for(set().union(*(formula_signature(f)[1] for f in formulas)))
+        corpus.setdefault(logic, []).append(formulas)
+    return dict(sorted(corpus.items()))
@@ -0,0 +1,48 @@
+from typing import Any
+
+
+def make_entity(i: int, fields_per_entity: int = 4) -> dict[str, Any]:
+    name = f"Account{i}"
+    fields: list[dict[str, Any]] = [
+        {"name": "id", "type": "UUID", "primary_key": True},
+        {"name": "owner_id", "type": "UUID", "indexed": True},
+        {"name": "status", "type": "Enum", "values": ["Active", "Frozen", "Closed"]},
+    ]
+    invariants: list[dict[str, Any]] = []
+    for j in range(fields_per_entity):
+        fname = f"amount{j}"
+        if j % 2 == 0:
+            fields.append({"name": fname, "type": "Decimal", "precision": 18, "scale": 2})
+            invariants.append({"name": f"{fname}_non_negative", "expr": f"{fname} >= 0"})
+        else:
+            fields.append({"name": fname, "type": "Int"})
+            invariants.append({"name": f"{fname}_bounded", "expr": f"{fname} <= {1000 * (j + 1)}"})
+    return {"name": name, "fields": fields, "invariants": invariants}
+
+
+def make_service(i: int, n_entities: int) -> dict[str, Any]:
+    target = f"Account{i % max(n_entities, 1)}"
+    return {
+        "name": f"Operation{i}",
+        "inputs": [
+            {"name": "source_id", "type": "UUID"},
+            {"name": "target_id", "type": "UUID"},
+            {"name": "amount", "type": "Decimal"},
+        ],
+        "preconditions": [
+            "amount > 0",
+            "source_id != target_id",
+            f"{target}(source_id).amount0 >= amount",
+        ],
+        "postconditions": [],
+        "strategy": "ACID_Transaction",
+    }
+
+
+def make_spec(n_entities: int, n_services: int, fields_per_entity: int = 4) -> dict[str, Any]:
+    return {
+        "name": f"Synthetic{n_entities}x{n_services}",
+        "version": "1.0.0",
+        "entities": [make_entity(i, fields_per_entity) for i in range(n_entities)],
+        "services": [make_service(i, n_entities) for i in range(n_services)],
+    }
@@ -0,0 +1,63 @@
+package entities
+
+import (
+    "github.com/google/uuid"
+    "github.com/shopspring/decimal"
+    "time"
+    "fmt"
+)
+
+type WalletStatus string
+
+const (
+    WalletActive WalletStatus = "Active"
+    WalletFrozen WalletStatus = "Frozen"
+    WalletClosed WalletStatus = "Closed"
+)
+
+type Wallet struct {
+    Id uuid.UUID `db:"id"` `json:"id"`
+    UserId uuid.UUID `db:"user_id"` `json:"user_id"`
+    Balance decimal.Decimal `db:"balance"` `json:"balance"`
+    Currency string `db:"currency"` `json:"currency"`
+    Status WalletStatus `db:"status"` `json:"status"`
+    CreatedAt time.Time `db:"created_at"` `json:"created_at"`
+    UpdatedAt time.Time `db:"updated_at"` `json:"updated_at"`
+}
+
+func (e *Wallet) Validate() error {
+    if !(e.Balance.Cmp(decimal.Zero) >= 0) {
+        return &ErrInvariantViolation{Entity: "Wallet", Invariant: "positive_balance", Message: "balance >= 0"}
+    }
+    return nil
+}
+type TransactionStatus string
+
+const (
+    TransactionPending TransactionStatus = "Pending"
+    TransactionCompleted TransactionStatus = "Completed"
+    TransactionFailed TransactionStatus = "Failed"
+)
+
+type Transaction struct {
+    Id uuid.UUID `db:"id"` `json:"id"`
+    FromWalletId uuid.UUID `db:"from_wallet_id"` `json:"from_wallet_id"`
+    ToWalletId uuid.UUID `db:"to_wallet_id"` `json:"to_wallet_id"`
+    Amount decimal.Decimal `db:"amount"` `json:"amount"`
+    Status TransactionStatus `db:"status"` `json:"status"`
+    CreatedAt time.Time `db:"created_at"` `json:"created_at"`
+}
+
+func (e *Transaction) Validate() error {
+    return nil
+}
+
+type ErrInvariantViolation struct {
+    Entity    string
+    Invariant string
+    Message   string
+}
+
+func (e ErrInvariantViolation) Error() string {
+    return fmt.Sprintf("invariant violation [%s.%s]: %s", e.Entity, e.Invariant, e.Message)
+}
\ No newline at end of file
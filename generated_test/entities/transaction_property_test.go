@@ -0,0 +1,26 @@
+package entities
+
+import (
+    "testing"
+    "github.com/google/uuid"
+    "github.com/shopspring/decimal"
+)
+
+func TestTransactionInvariantsHold(t *testing.T) {
+    cases := []struct {
+        name  string
+        e     Transaction
+        valid bool
+    }{
+        {"valid_0", Transaction{Id: uuid.New(), FromWalletId: uuid.New(), ToWalletId: uuid.New()}, true},
+    }
+    for _, tc := range cases {
+        err := tc.e.Validate()
+        if tc.valid && err != nil {
+            t.Errorf("%s: unexpected error: %v", tc.name, err)
+        }
+        if !tc.valid && err == nil {
+            t.Errorf("%s: expected an invariant violation", tc.name)
+        }
+    }
+}
\ No newline at end of file
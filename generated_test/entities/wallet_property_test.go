@@ -0,0 +1,29 @@
+package entities
+
+import (
+    "testing"
+    "github.com/google/uuid"
+    "github.com/shopspring/decimal"
+)
+
+func TestWalletInvariantsHold(t *testing.T) {
+    cases := []struct {
+        name  string
+        e     Wallet
+        valid bool
+    }{
+        {"boundary_0", Wallet{Id: uuid.New(), UserId: uuid.New(), Balance: decimal.RequireFromString("0")}, true},
+        {"boundary_1", Wallet{Id: uuid.New(), UserId: uuid.New(), Balance: decimal.RequireFromString("0.01")}, true},
+        {"extreme_2", Wallet{Id: uuid.New(), UserId: uuid.New(), Balance: decimal.RequireFromString("9999999999999999.99")}, true},
+        {"violates_positive_balance_3", Wallet{Id: uuid.New(), UserId: uuid.New(), Balance: decimal.RequireFromString("-0.01")}, false},
+    }
+    for _, tc := range cases {
+        err := tc.e.Validate()
+        if tc.valid && err != nil {
+            t.Errorf("%s: unexpected error: %v", tc.name, err)
+        }
+        if !tc.valid && err == nil {
+            t.Errorf("%s: expected an invariant violation", tc.name)
+        }
+    }
+}
\ No newline at end of file
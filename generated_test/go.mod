@@ -0,0 +1,3 @@
+module generated_test
+
+go 1.21
@@ -0,0 +1,12 @@
+package main
+
+import (
+    "log"
+
+    "generated_test/entities"
+)
+
+func main() {
+    _ = entities.Wallet{}
+    log.Println("Correct-by-Construction generated application")
+}
\ No newline at end of file
@@ -0,0 +1,23 @@
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS wallets (
+    id UUID PRIMARY KEY,
+    user_id UUID ,
+    balance DECIMAL(18,2),
+    currency VARCHAR(3),
+    status VARCHAR(50),
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id UUID PRIMARY KEY,
+    from_wallet_id UUID,
+    to_wallet_id UUID,
+    amount DECIMAL(18,2),
+    status VARCHAR(50),
+    created_at TIMESTAMP
+);
+
+
+COMMIT;
@@ -0,0 +1,26 @@
+package services
+
+import (
+    "context"
+    "errors"
+    "github.com/google/uuid"
+    "github.com/shopspring/decimal"
+    "generated_test/entities"
+)
+
+func CreateWallet(ctx context.Context, req CreateWalletRequest) (*CreateWalletResponse, error) {
+    if !(req.UserId != uuid.Nil) {
+        return nil, errors.New("precondition violated: user_id != null")
+    }
+    // precondition not checked (Membership cannot be checked in Go): currency in ISO_4217_CODES
+
+    return &CreateWalletResponse{}, nil
+}
+
+type CreateWalletRequest struct {
+    UserId uuid.UUID
+    Currency string
+}
+
+type CreateWalletResponse struct {
+}
\ No newline at end of file
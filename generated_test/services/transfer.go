@@ -0,0 +1,53 @@
+package services
+
+import (
+    "context"
+    "errors"
+    "github.com/google/uuid"
+    "github.com/shopspring/decimal"
+    "generated_test/entities"
+)
+
+type TransferDeps struct {
+    LoadWallet func(ctx context.Context, id uuid.UUID) (*entities.Wallet, error)
+}
+
+func Transfer(ctx context.Context, deps TransferDeps, req TransferRequest) (*TransferResponse, error) {
+    if !(req.Amount.Cmp(decimal.Zero) > 0) {
+        return nil, errors.New("precondition violated: amount > 0")
+    }
+    if !(req.FromWalletId != req.ToWalletId) {
+        return nil, errors.New("precondition violated: from_wallet_id != to_wallet_id")
+    }
+    fromWallet, err := deps.LoadWallet(ctx, req.FromWalletId)
+    if err != nil {
+        return nil, err
+    }
+    if !(fromWallet.Status == entities.WalletActive) {
+        return nil, errors.New("precondition violated: Wallet(from_wallet_id).status == Active")
+    }
+    toWallet, err := deps.LoadWallet(ctx, req.ToWalletId)
+    if err != nil {
+        return nil, err
+    }
+    if !(toWallet.Status == entities.WalletActive) {
+        return nil, errors.New("precondition violated: Wallet(to_wallet_id).status == Active")
+    }
+    if !(fromWallet.Balance.Cmp(req.Amount) >= 0) {
+        return nil, errors.New("precondition violated: Wallet(from_wallet_id).balance >= amount")
+    }
+    if !(fromWallet.Currency == toWallet.Currency) {
+        return nil, errors.New("precondition violated: Wallet(from_wallet_id).currency == Wallet(to_wallet_id).currency")
+    }
+
+    return &TransferResponse{}, nil
+}
+
+type TransferRequest struct {
+    FromWalletId uuid.UUID
+    ToWalletId uuid.UUID
+    Amount decimal.Decimal
+}
+
+type TransferResponse struct {
+}
\ No newline at end of file
@@ -0,0 +1,260 @@
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.dsl.expressions import (
+    Binary,
+    BoolLit,
+    BoolOp,
+    Compare,
+    DecimalLit,
+    Expr,
+    ExpressionSyntaxError,
+    FieldRef,
+    IntLit,
+    Membership,
+    Name,
+    NullLit,
+    SetLit,
+    StringLit,
+    Unary,
+    parse_expr,
+    walk,
+)
+from src.dsl.spec_index import SpecIndex
+from src.dsl.type_system import resolve_go_type
+
+LOOKUP_COST = 1000
+
+_KINDS = {
+    "decimal": "decimal", "int": "int", "int64": "int", "integer": "int", "uuid": "uuid",
+    "string": "string", "str": "string", "boolean": "bool", "bool": "bool", "timestamp": "time", "enum": "string",
+}
+_DECIMAL_METHODS = {"+": "Add", "-": "Sub", "*": "Mul", "/": "Div", "%": "Mod"}
+
+
+class UnsupportedGoExpression(ValueError):
+    pass
+
+
+def to_camel(s: str) -> str:
+    parts = re.sub(r"[_\s]+", " ", s).split()
+    return "".join(p.capitalize() for p in parts) if parts else s
+
+
+def _lower_camel(s: str) -> str:
+    camel = to_camel(s)
+    return camel[:1].lower() + camel[1:]
+
+
+@dataclass
+class Operand:
+    code: str
+    kind: str | None
+
+
+def _as_decimal(operand: Operand) -> str:
+    return f"decimal.NewFromInt({operand.code})" if operand.kind == "int" else operand.code
+
+
+@dataclass
+class Lookup:
+    entity: str
+    key: str
+    var: str
+    key_code: str
+    key_type: str
+
+
+@dataclass
+class PreconditionCheck:
+    index: int
+    source: str
+    code: str | None
+    lookups: list[Lookup] = field(default_factory=list)
+    cost: int = 0
+    reason: str | None = None
+
+
+class GoCheckRenderer:
+
+    def __init__(
+        self,
+        spec: dict[str, Any],
+        service: dict[str, Any] | None = None,
+        index: SpecIndex | None = None,
+        entity: dict[str, Any] | None = None,
+    ) -> None:
+        self.index = index or SpecIndex(spec)
+        self.lookups: dict[tuple[str, str], Lookup] = {}
+        # Service checks read inputs from req; entity checks (Validate) read the entity's own fields from e.
+        self.entity = entity.get("name", "") if entity is not None else None
+        if entity is not None:
+            self.inputs = {f.get("name", ""): f for f in entity.get("fields", [])}
+            self.receiver, self.package = "e", ""
+        else:
+            self.inputs = {i.get("name", ""): i for i in (service or {}).get("inputs", [])}
+            self.receiver, self.package = "req", "entities."
+
+    def check(self, index: int, source: str) -> PreconditionCheck:
+        try:
+            tree = parse_expr(source)
+            condition = self.condition(tree)
+        except (ExpressionSyntaxError, UnsupportedGoExpression) as e:
+            return PreconditionCheck(index, source, None, reason=str(e))
+        used = []
+        for node in walk(tree):
+            if isinstance(node, FieldRef) and isinstance(node.key, Name):
+                lookup = self.lookups[(node.entity, node.key.id)]
+                if lookup not in used:
+                    used.append(lookup)
+        code = (
+            f"if !({condition}) {{\n"
+            f"        return nil, errors.New({json.dumps('precondition violated: ' + source)})\n"
+            "    }"
+        )
+        nodes = sum(1 for _ in walk(tree))
+        return PreconditionCheck(index, source, code, used, LOOKUP_COST * len(used) + nodes)
+
+    def invariant_check(self, inv: dict[str, Any]) -> str | None:
+        source = inv.get("expr", inv.get("expression", ""))
+        try:
+            condition = self.condition(parse_expr(source))
+        except (ExpressionSyntaxError, UnsupportedGoExpression):
+            return None
+        violation = (
+            f"Entity: {json.dumps(self.entity)}, Invariant: {json.dumps(inv.get('name', 'inv'))}, "
+            f"Message: {json.dumps(source)}"
+        )
+        return f"if !({condition}) {{\n        return &ErrInvariantViolation{{{violation}}}\n    }}"
+
+    def condition(self, expr: Expr) -> str:
+        if isinstance(expr, BoolOp):
+            joiner = " && " if expr.op == "and" else " || "
+            return "(" + joiner.join(self.condition(o) for o in expr.operands) + ")"
+        if isinstance(expr, Unary) and expr.op == "not":
+            return f"!({self.condition(expr.operand)})"
+        if isinstance(expr, Compare):
+            return self._compare(expr.op, expr.left, expr.right)
+        if isinstance(expr, Membership) and isinstance(expr.container, SetLit):
+            op, joiner = ("!=", " && ") if expr.negated else ("==", " || ")
+            return "(" + joiner.join(self._compare(op, expr.value, item) for item in expr.container.items) + ")"
+        if isinstance(expr, BoolLit):
+            return "true" if expr.value else "false"
+        operand = self.operand(expr)
+        if operand.kind != "bool":
+            raise UnsupportedGoExpression(f"{operand.code} is not a boolean")
+        return operand.code
+
+    def _compare(self, op: str, left: Expr, right: Expr) -> str:
+        hint = self.kind(left) or self.kind(right)
+        lhs, rhs = self.operand(left, hint), self.operand(right, hint)
+        if "decimal" in (lhs.kind, rhs.kind):
+            return f"{_as_decimal(lhs)}.Cmp({_as_decimal(rhs)}) {op} 0"
+        if lhs.kind in ("uuid", "bool", "time") and op not in ("==", "!="):
+            raise UnsupportedGoExpression(f"cannot order {lhs.kind} values")
+        return f"{lhs.code} {op} {rhs.code}"
+
+    def kind(self, expr: Expr) -> str | None:
+        if isinstance(expr, Name):
+            field = self.inputs.get(expr.id)
+            if field is None:
+                return None
+            if self.entity is not None and self._is_enum(self.entity, field):
+                return f"enum:{self.entity}"
+            return _KINDS.get(field.get("type", "String").lower())
+        if isinstance(expr, FieldRef):
+            field = self._field(expr)
+            if self._is_enum(expr.entity, field):
+                return f"enum:{expr.entity}"
+            return _KINDS.get(field.get("type", "String").lower())
+        if isinstance(expr, Binary):
+            kinds = {self.kind(expr.left), self.kind(expr.right)}
+            return "decimal" if "decimal" in kinds else "int" if "int" in kinds else None
+        if isinstance(expr, Unary) and expr.op == "-":
+            return self.kind(expr.operand)
+        if isinstance(expr, DecimalLit):
+            return "decimal"
+        if isinstance(expr, StringLit):
+            return "string"
+        if isinstance(expr, BoolLit):
+            return "bool"
+        return None
+
+    def operand(self, expr: Expr, hint: str | None = None) -> Operand:
+        if isinstance(expr, Name):
+            field = self.inputs.get(expr.id)
+            if field is not None:
+                return Operand(f"{self.receiver}.{to_camel(expr.id)}", self.kind(expr))
+            if hint is not None and hint.startswith("enum:"):
+                return Operand(f"{self.package}{hint[5:]}{expr.id}", hint)
+            if hint == "string":
+                return Operand(json.dumps(expr.id), "string")
+            raise UnsupportedGoExpression(f"unknown name {expr.id}")
+        if isinstance(expr, FieldRef):
+            lookup = self._lookup(expr)
+            return Operand(f"{lookup.var}.{to_camel(expr.field)}", self.kind(expr))
+        if isinstance(expr, IntLit):
+            if hint == "decimal":
+                return Operand("decimal.Zero" if expr.value == 0 else f"decimal.NewFromInt({expr.value})", "decimal")
+            return Operand(str(expr.value), "int")
+        if isinstance(expr, DecimalLit):
+            return Operand(f'decimal.RequireFromString("{expr.value}")', "decimal")
+        if isinstance(expr, StringLit):
+            return Operand(json.dumps(expr.value), "string")
+        if isinstance(expr, BoolLit):
+            return Operand("true" if expr.value else "false", "bool")
+        if isinstance(expr, NullLit):
+            if hint == "uuid":
+                return Operand("uuid.Nil", "uuid")
+            if hint == "string":
+                return Operand('""', "string")
+            raise UnsupportedGoExpression("null is only supported for UUID and string values")
+        if isinstance(expr, Unary) and expr.op == "-":
+            inner = self.operand(expr.operand, hint)
+            return Operand(f"{inner.code}.Neg()" if inner.kind == "decimal" else f"-({inner.code})", inner.kind)
+        if isinstance(expr, Binary):
+            kind = self.kind(expr) or hint
+            lhs, rhs = self.operand(expr.left, kind), self.operand(expr.right, kind)
+            if kind == "decimal":
+                return Operand(f"{_as_decimal(lhs)}.{_DECIMAL_METHODS[expr.op]}({_as_decimal(rhs)})", "decimal")
+            return Operand(f"({lhs.code} {expr.op} {rhs.code})", lhs.kind)
+        raise UnsupportedGoExpression(f"{type(expr).__name__} cannot be checked in Go")
+
+    def _field(self, ref: FieldRef) -> dict[str, Any]:
+        if ref.entity not in self.index.entities:
+            raise UnsupportedGoExpression(f"unknown entity {ref.entity}")
+        f = self.index.field(ref.entity, ref.field)
+        if f is None:
+            raise UnsupportedGoExpression(f"unknown field {ref.entity}.{ref.field}")
+        return f
+
+    def _is_enum(self, entity: str, field: dict[str, Any]) -> bool:
+        enum_field = self.index.enum_field(entity)
+        return enum_field is not None and enum_field.get("name") == field.get("name")
+
+    def _lookup(self, ref: FieldRef) -> Lookup:
+        if self.entity is not None:
+            raise UnsupportedGoExpression(f"{self.entity}.Validate cannot look up {ref.entity}")
+        if not isinstance(ref.key, Name) or ref.key.id not in self.inputs:
+            raise UnsupportedGoExpression(f"{ref.entity} must be looked up by a service input")
+        self._field(ref)
+        key = ref.key.id
+        lookup = self.lookups.get((ref.entity, key))
+        if lookup is None:
+            stem = key[:-3] if key.endswith("_id") and key != "_id" else key
+            var = _lower_camel(stem)
+            if not var.lower().endswith(ref.entity.lower()):
+                var += ref.entity
+            lookup = Lookup(ref.entity, key, var, f"req.{to_camel(key)}", resolve_go_type(self.inputs[key].get("type", "String")))
+            self.lookups[(ref.entity, key)] = lookup
+        return lookup
+
+
+def plan_precondition_checks(
+    spec: dict[str, Any], service: dict[str, Any], index: SpecIndex | None = None
+) -> list[PreconditionCheck]:
+    renderer = GoCheckRenderer(spec, service, index)
+    checks = [renderer.check(i, str(pre)) for i, pre in enumerate(service.get("preconditions", []))]
+    return sorted(checks, key=lambda c: (c.code is None, c.cost, c.index))
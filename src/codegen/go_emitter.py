@@ -1,4 +1,6 @@
+import json
 import re
+from dataclasses import asdict
 from pathlib import Path
 from typing import Any
 
@@ -8,12 +10,15 @@ _project_root = Path(__file__).parent.parent.parent
 if str(_project_root) not in __import__("sys").path:
     __import__("sys").path.insert(0, str(_project_root))
 
+from src.dsl.spec_index import SpecIndex
 from src.dsl.type_system import resolve_go_type
-
-
-def _to_camel(s: str) -> str:
-    parts = re.sub(r"[_\s]+", " ", s).split()
-    return "".join(p.capitalize() for p in parts) if parts else s
+from src.codegen.go_checks import GoCheckRenderer, plan_precondition_checks, to_camel
+from src.formal.redundancy import (
+    RedundantInvariant,
+    RedundantPrecondition,
+    find_redundant_invariants,
+    find_redundant_preconditions,
+)
 
 
 def _to_snake(s: str) -> str:
@@ -21,24 +26,16 @@ def _to_snake(s: str) -> str:
     return re.sub("([a-z0-9])([A-Z])", r"\1_\2", s).lower()
 
 
-def _invariant_to_go_check(inv: dict, entity_name: str, fields: list[dict]) -> str:
-    expr = inv.get("expr", inv.get("expression", ""))
-    name = inv.get("name", "inv")
-    field_map = {f.get("name", ""): _to_camel(f.get("name", "")) for f in fields}
-    balance_go = field_map.get("balance", "Balance")
-    if "balance" in expr and ">=" in expr and "0" in expr:
-        return f'''if e.{balance_go}.LessThan(decimal.Zero) {{
-        return &ErrInvariantViolation{{Entity: "{entity_name}", Invariant: "{name}", Message: fmt.Sprintf("balance must be >= 0, got %s", e.{balance_go})}}
-    }}'''
-    if "balance" in expr and ">" in expr and "0" in expr:
-        return f'''if !e.{balance_go}.GreaterThan(decimal.Zero) {{
-        return &ErrInvariantViolation{{Entity: "{entity_name}", Invariant: "{name}", Message: "balance must be > 0"}}
-    }}'''
-    return ""
+def checked_invariants(entity: dict, index: SpecIndex | None = None) -> list[dict]:
+    renderer = GoCheckRenderer({"entities": [entity]}, index=index, entity=entity)
+    return [inv for inv in entity.get("invariants", []) if renderer.invariant_check(inv) is not None]
 
 
-def _prepare_entity_for_template(entity: dict) -> dict:
+def _prepare_entity_for_template(
+    entity: dict, redundant: list[RedundantInvariant] | None = None, index: SpecIndex | None = None
+) -> dict:
     fields = entity.get("fields", [])
+    renderer = GoCheckRenderer({"entities": [entity]}, index=index, entity=entity)
     enum_field = None
     enum_values = []
     for f in fields:
@@ -60,18 +57,20 @@ def _prepare_entity_for_template(entity: dict) -> dict:
             type_go = f"{entity.get('name', 'Entity')}Status"
         prepared_fields.append({
             "name": f.get("name", ""),
-            "name_go": _to_camel(f.get("name", "")),
+            "name_go": to_camel(f.get("name", "")),
             "name_snake": _to_snake(f.get("name", "")),
             "type_go": type_go,
             "json_tag": True,
         })
 
+    implied = {r.name: r.implied_by for r in redundant or []}
     invariants = []
     for inv in entity.get("invariants", []):
         invariants.append({
             "name": inv.get("name", ""),
             "expr": inv.get("expr", inv.get("expression", "")),
-            "check_go": _invariant_to_go_check(inv, entity.get("name", ""), fields),
+            "check_go": renderer.invariant_check(inv) or "",
+            "implied_by": implied.get(inv.get("name", ""), []),
         })
 
     field_lines = []
@@ -89,28 +88,47 @@ def _prepare_entity_for_template(entity: dict) -> dict:
     }
 
 
-def _prepare_service_for_template(service: dict, spec: dict) -> dict:
+def _prepare_service_for_template(
+    service: dict, spec: dict, redundant: list[RedundantPrecondition] | None = None, index: SpecIndex | None = None
+) -> dict:
     inputs = []
     for i in service.get("inputs", []):
         itype = i.get("type", "String")
         inputs.append({
             "name": i.get("name", ""),
-            "name_go": _to_camel(i.get("name", "")),
+            "name_go": to_camel(i.get("name", "")),
             "type_go": resolve_go_type(itype),
         })
 
+    implied = {int(r.label.rsplit("[", 1)[1].rstrip("]")): r.implied_by for r in redundant or []}
     pre_checks = []
-    for pre in service.get("preconditions", []):
-        pre_str = str(pre)
-        if "amount" in pre_str and "> 0" in pre_str:
-            pre_checks.append("if !req.Amount.GreaterThan(decimal.Zero) { return nil, errors.New(\"amount must be > 0\") }")
-        elif "!=" in pre_str and "from" in pre_str.lower() and "to" in pre_str.lower():
-            pre_checks.append("if req.FromWalletID == req.ToWalletID { return nil, errors.New(\"from and to must be different\") }")
+    loaded: set[str] = set()
+    loaders: dict[str, str] = {}
+    for check in plan_precondition_checks(spec, service, index):
+        if check.code is None:
+            pre_checks.append(f"// precondition not checked ({check.reason}): {check.source}")
+            continue
+        if implied.get(check.index):
+            pre_checks.append(f"// {check.source} (implied by {', '.join(implied[check.index])})")
+            continue
+        for lookup in check.lookups:
+            if lookup.var in loaded:
+                continue
+            loaded.add(lookup.var)
+            loaders.setdefault(lookup.entity, lookup.key_type)
+            pre_checks.append(
+                f"{lookup.var}, err := deps.Load{lookup.entity}(ctx, {lookup.key_code})\n"
+                "    if err != nil {\n"
+                "        return nil, err\n"
+                "    }"
+            )
+        pre_checks.append(check.code)
 
     return {
         "name": service.get("name", ""),
         "inputs": inputs,
         "pre_checks": pre_checks,
+        "loaders": [{"entity": e, "key_type": k} for e, k in loaders.items()],
     }
 
 
@@ -130,7 +148,13 @@ def _needs_imports(entities: list[dict]) -> tuple[bool, bool, bool]:
 
 class GoCodeGenerator:
 
-    def __init__(self, templates_dir: Path | None = None, module_path: str = "generated") -> None:
+    def __init__(
+        self,
+        templates_dir: Path | None = None,
+        module_path: str = "generated",
+        minimal_checks: bool = False,
+        timeout_ms: int = 5000,
+    ) -> None:
         self.templates_dir = templates_dir or Path(__file__).parent.parent.parent / "templates"
         self.env = Environment(
             loader=FileSystemLoader(str(self.templates_dir)),
@@ -138,6 +162,31 @@ class GoCodeGenerator:
             lstrip_blocks=True,
         )
         self.module_path = module_path
+        self.minimal_checks = minimal_checks
+        self.timeout_ms = timeout_ms
+
+    def redundant_invariants(
+        self, spec: dict[str, Any], index: SpecIndex | None = None
+    ) -> dict[str, list[RedundantInvariant]]:
+        index = index or SpecIndex(spec)
+        checked = {
+            f"{e.get('name', '')}.{inv.get('name', '')}"
+            for e in spec.get("entities", [])
+            for inv in checked_invariants(e, index)
+        }
+        return find_redundant_invariants(spec, self.timeout_ms, eligible=checked)
+
+    def redundant_preconditions(
+        self, spec: dict[str, Any], index: SpecIndex | None = None
+    ) -> dict[str, list[RedundantPrecondition]]:
+        index = index or SpecIndex(spec)
+        checked = {
+            f"{s.get('name', '')}.pre[{c.index}]"
+            for s in spec.get("services", [])
+            for c in plan_precondition_checks(spec, s, index)
+            if c.code is not None
+        }
+        return find_redundant_preconditions(spec, self.timeout_ms, eligible=checked)
 
     def generate(
         self,
@@ -156,8 +205,12 @@ class GoCodeGenerator:
         version = spec.get("version", "1.0.0")
 
         needs_uuid, needs_decimal, needs_time = _needs_imports(entities)
+        index = SpecIndex(spec)
 
-        prepared_entities = [_prepare_entity_for_template(e) for e in entities]
+        redundant = self.redundant_invariants(spec, index) if self.minimal_checks else {}
+        prepared_entities = [
+            _prepare_entity_for_template(e, redundant.get(e.get("name", "")), index) for e in entities
+        ]
 
         ctx = {
             "spec_name": name,
@@ -175,11 +228,25 @@ class GoCodeGenerator:
 
         artifacts: dict[str, Any] = {"files": [str(output / "entities" / "entities.go")], "entities": [], "services": []}
 
+        redundant_pre = self.redundant_preconditions(spec, index) if self.minimal_checks else {}
+        if self.minimal_checks:
+            report = {
+                "invariants": [asdict(r) for entity_report in redundant.values() for r in entity_report],
+                "preconditions": [asdict(r) for service_report in redundant_pre.values() for r in service_report],
+            }
+            report_path = output / "redundancy_report.json"
+            report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            artifacts["files"].append(str(report_path))
+            artifacts["redundant_invariants"] = report["invariants"]
+            artifacts["redundant_preconditions"] = report["preconditions"]
+
         for service in services:
             svc_ctx = {
                 "spec_name": name,
                 "spec_version": version,
-                "service": _prepare_service_for_template(service, spec),
+                "service": _prepare_service_for_template(
+                    service, spec, redundant_pre.get(service.get("name", "")), index
+                ),
                 "module_path": self.module_path,
             }
             try:
@@ -0,0 +1,29 @@
+import argparse
+import sys
+
+from .server import VerificationDaemon, serve_stdio, serve_unix
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.daemon")
+    parser.add_argument("--socket", help="Unix socket path; stdin/stdout when omitted")
+    parser.add_argument("--timeout-ms", type=int, default=5000)
+    parser.add_argument("--request-timeout-ms", type=int, default=30000)
+    parser.add_argument("--max-specs", type=int, default=64)
+    parser.add_argument("--max-memory-mb", type=int, default=1024)
+    args = parser.parse_args(argv)
+
+    daemon = VerificationDaemon(
+        timeout_ms=args.timeout_ms,
+        request_timeout_ms=args.request_timeout_ms,
+        max_specs=args.max_specs,
+        max_memory_mb=args.max_memory_mb,
+    )
+    if args.socket:
+        serve_unix(daemon, args.socket)
+    else:
+        serve_stdio(daemon, sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import gc
+import hashlib
+import json
+import os
+import resource
+import socketserver
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, TextIO
+
+import z3
+
+from ..codegen.go_emitter import GoCodeGenerator
+from ..dsl.ast_nodes import Specification, to_plain
+from ..dsl.spec_loader import build_specification, parse_specification_text
+from ..formal.session import VerificationSession
+from ..formal.smt_utils import is_memout
+from ..formal.verifier import FormalVerifier, run_in_z3
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+MEMORY_EXCEEDED = -32001
+REQUEST_TIMEOUT = -32002
+
+
+class RpcError(ValueError):
+    def __init__(self, code: int, message: str) -> None:
+        self.code = code
+        self.message = message
+        super().__init__(message)
+
+
+@dataclass
+class SpecEntry:
+    spec_hash: str
+    spec: Specification
+    session: VerificationSession | None = None
+    size_mb: float = 0.0
+    hits: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+def spec_hash(spec: dict[str, Any] | Specification) -> str:
+    payload = json.dumps(to_plain(spec), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def resident_memory_mb() -> float:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class VerificationDaemon:
+
+    def __init__(
+        self,
+        timeout_ms: int = 5000,
+        request_timeout_ms: int = 30000,
+        max_specs: int = 64,
+        max_memory_mb: int = 1024,
+        verifier_options: dict[str, Any] | None = None,
+    ) -> None:
+        self.timeout_ms = timeout_ms
+        self.request_timeout_ms = request_timeout_ms
+        self.max_specs = max_specs
+        self.max_memory_mb = max_memory_mb
+        self.verifier_options = verifier_options or {}
+        self.base_memory_mb = resident_memory_mb()
+        self.running = True
+        self.requests = 0
+        self._specs: OrderedDict[str, SpecEntry] = OrderedDict()
+        self._texts: dict[str, str] = {}
+        self._generators: dict[str, GoCodeGenerator] = {}
+        self._methods: dict[str, Callable[..., Any]] = {
+            "load": self.load,
+            "verify": self.verify,
+            "generate": self.generate,
+            "stats": self.stats,
+            "evict": self.evict,
+            "shutdown": self.shutdown,
+        }
+        z3.set_param("memory_max_size", max_memory_mb)
+
+    def handle_line(self, line: str) -> str | None:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps(_error(None, PARSE_ERROR, f"Parse error: {e}"))
+        response = self.handle(request)
+        return json.dumps(response, default=str) if response is not None else None
+
+    def handle(self, request: Any) -> dict[str, Any] | None:
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or "method" not in request:
+            return _error(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        method = self._methods.get(request["method"])
+        params = request.get("params") or {}
+        self.requests += 1
+        try:
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            try:
+                result = method(**params)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e)) from e
+            except TimeoutError as e:
+                raise RpcError(REQUEST_TIMEOUT, str(e)) from e
+            except (z3.Z3Exception, MemoryError) as e:
+                if not is_memout(e):
+                    raise RpcError(SERVER_ERROR, str(e)) from e
+                self._reclaim(force=True)
+                raise RpcError(MEMORY_EXCEEDED, str(e)) from e
+        except RpcError as e:
+            return _error(request_id, e.code, e.message) if request_id is not None else None
+        except Exception as e:
+            return _error(request_id, SERVER_ERROR, str(e)) if request_id is not None else None
+        finally:
+            self._reclaim()
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def load(
+        self,
+        spec: dict[str, Any] | None = None,
+        path: str | None = None,
+        text: str | None = None,
+        spec_hash: str | None = None,
+    ) -> dict[str, Any]:
+        entry = self._entry(spec, path, text, spec_hash)
+        return {"spec_hash": entry.spec_hash, "name": entry.spec.get("name", ""), "hits": entry.hits}
+
+    def verify(self, timeout_ms: int | None = None, **source: Any) -> dict[str, Any]:
+        entry = self._entry(**source)
+        budget = timeout_ms if timeout_ms is not None else self.request_timeout_ms
+        verifier = FormalVerifier(self.timeout_ms, budget_ms=budget, **self.verifier_options)
+        start = time.perf_counter()
+        # The budget only schedules checks; the deadline interrupts Z3 if a single check overruns it.
+        result = run_in_z3(self._verify, verifier, entry, timeout_ms=budget)
+        payload = asdict(result)
+        payload["spec_hash"] = entry.spec_hash
+        payload["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return payload
+
+    def generate(
+        self, output_dir: str, module_path: str = "generated", timeout_ms: int | None = None, **source: Any
+    ) -> dict[str, Any]:
+        entry = self._entry(**source)
+        generator = self._generators.get(module_path)
+        if generator is None:
+            generator = self._generators[module_path] = GoCodeGenerator(module_path=module_path)
+        deadline = timeout_ms if timeout_ms is not None else self.request_timeout_ms
+        artifacts = run_in_z3(partial(generator.generate, entry.spec, output_dir=output_dir), timeout_ms=deadline)
+        artifacts["spec_hash"] = entry.spec_hash
+        return artifacts
+
+    def _verify(self, verifier: FormalVerifier, entry: SpecEntry) -> Any:
+        if entry.session is None:
+            before = resident_memory_mb()
+            entry.session = verifier.open_session(entry.spec)
+            entry.size_mb += max(0.0, resident_memory_mb() - before)
+        return verifier.verify_session(entry.session)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "specs": [
+                {
+                    "spec_hash": e.spec_hash,
+                    "name": e.spec.get("name", ""),
+                    "hits": e.hits,
+                    "warm": e.session is not None,
+                }
+                for e in self._specs.values()
+            ],
+            "requests": self.requests,
+            "memory_mb": round(resident_memory_mb(), 1),
+            "accounted_mb": round(self.accounted_memory_mb(), 1),
+            "max_memory_mb": self.max_memory_mb,
+        }
+
+    def evict(self, spec_hash: str | None = None) -> dict[str, Any]:
+        if spec_hash is None:
+            evicted = len(self._specs)
+            self._specs.clear()
+            self._texts.clear()
+        else:
+            evicted = int(self._specs.pop(spec_hash, None) is not None)
+            self._texts = {k: v for k, v in self._texts.items() if v != spec_hash}
+        gc.collect()
+        return {"evicted": evicted}
+
+    def accounted_memory_mb(self) -> float:
+        return self.base_memory_mb + sum(e.size_mb for e in self._specs.values())
+
+    def shutdown(self) -> dict[str, Any]:
+        self.running = False
+        return {"ok": True}
+
+    def _entry(
+        self,
+        spec: dict[str, Any] | None = None,
+        path: str | None = None,
+        text: str | None = None,
+        spec_hash: str | None = None,
+    ) -> SpecEntry:
+        if spec_hash is not None:
+            entry = self._specs.get(spec_hash)
+            if entry is None:
+                raise RpcError(INVALID_PARAMS, f"Unknown spec_hash: {spec_hash}")
+        elif spec is not None:
+            before = resident_memory_mb()
+            entry = self._store(build_specification(spec), before)
+        elif path is not None or text is not None:
+            if text is None:
+                try:
+                    text = Path(path).read_text(encoding="utf-8")
+                except OSError as e:
+                    raise RpcError(INVALID_PARAMS, f"Cannot read {path}: {e}") from e
+            text_key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            entry = self._specs.get(self._texts.get(text_key, ""))
+            if entry is None:
+                before = resident_memory_mb()
+                entry = self._store(parse_specification_text(text), before, len(text))
+                self._texts[text_key] = entry.spec_hash
+        else:
+            raise RpcError(INVALID_PARAMS, "One of spec, path, text or spec_hash is required")
+        entry.hits += 1
+        entry.last_used = time.monotonic()
+        self._specs.move_to_end(entry.spec_hash)
+        return entry
+
+    def _store(self, spec: Specification, before_mb: float, source_bytes: int = 0) -> SpecEntry:
+        key = spec_hash(spec)
+        entry = self._specs.get(key)
+        if entry is None:
+            # RSS growth while building the entry, never less than its source text: freed memory is rarely
+            # returned to the OS, so eviction has to be decided on what each entry was charged, not on RSS.
+            size_mb = max(resident_memory_mb() - before_mb, source_bytes / (1024 * 1024))
+            entry = self._specs[key] = SpecEntry(key, spec, size_mb=size_mb)
+            while len(self._specs) > self.max_specs:
+                self._specs.popitem(last=False)
+        return entry
+
+    def _reclaim(self, force: bool = False) -> None:
+        evicted = 0
+        if force and len(self._specs) > 1:
+            self._specs.popitem(last=False)
+            evicted += 1
+        while len(self._specs) > 1 and self.accounted_memory_mb() > self.max_memory_mb:
+            self._specs.popitem(last=False)
+            evicted += 1
+        if evicted:
+            live = set(self._specs)
+            self._texts = {k: v for k, v in self._texts.items() if v in live}
+            gc.collect()
+
+
+def _error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def serve_stdio(daemon: VerificationDaemon, stdin: TextIO, stdout: TextIO) -> None:
+    for line in stdin:
+        if not line.strip():
+            continue
+        response = daemon.handle_line(line)
+        if response is not None:
+            stdout.write(response + "\n")
+            stdout.flush()
+        if not daemon.running:
+            break
+
+
+def serve_unix(daemon: VerificationDaemon, socket_path: str | Path) -> None:
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        socket_path.unlink()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for raw in self.rfile:
+                line = raw.decode("utf-8").strip()
+                if not line:
+                    continue
+                response = daemon.handle_line(line)
+                if response is not None:
+                    self.wfile.write((response + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                if not daemon.running:
+                    break
+
+    with socketserver.UnixStreamServer(str(socket_path), Handler) as server:
+        try:
+            while daemon.running:
+                server.handle_request()
+        finally:
+            socket_path.unlink(missing_ok=True)
@@ -1,7 +1,12 @@
-from dataclasses import dataclass, field
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, fields
 from enum import Enum
+from sys import intern
 from typing import Any
 
+_VIEW_KEYS: dict[type, tuple[str, ...]] = {}
+_SCALARS = (str, int, float, type(None))
+
 
 class ExecutionStrategy(str, Enum):
     SIMPLE = "Simple"
@@ -9,78 +14,255 @@ class ExecutionStrategy(str, Enum):
     IDEMPOTENT = "Idempotent"
 
 
-@dataclass
-class Field:
+# load_spec() keeps strategies it does not know verbatim, so the AST does too.
+def execution_strategy(value: str) -> ExecutionStrategy | str:
+    try:
+        return ExecutionStrategy(value)
+    except ValueError:
+        return intern(value)
+
+
+# Read-only dict view with the keys load_spec() produces, so dict-based stages accept the AST as is.
+class SpecNode(Mapping):
+    __slots__ = ()
+
+    def _view_keys(self) -> tuple[str, ...]:
+        keys = _VIEW_KEYS.get(type(self))
+        if keys is None:
+            keys = _VIEW_KEYS[type(self)] = tuple(f.name for f in fields(self))
+        return keys
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._view_keys():
+            raise KeyError(key)
+        value = getattr(self, key)
+        if isinstance(value, Enum):
+            return value.value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._view_keys())
+
+    # Tuple fields compare equal to the lists of a plain spec dict.
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return to_plain(self) == to_plain(other)
+
+    # Mapping sets __hash__ to None; hash the scalar fields so equal views still hash alike.
+    def __hash__(self) -> int:
+        return hash(tuple(v for v in map(self.__getitem__, self._view_keys()) if isinstance(v, _SCALARS)))
+
+    def __len__(self) -> int:
+        return len(self._view_keys())
+
+    # Unpickled nodes (e.g. from the .cbc cache) get their names interned again, like freshly loaded ones.
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _rebuild_node, (type(self), tuple(getattr(self, f.name) for f in fields(self)))
+
+
+def _rebuild_node(cls: type, values: tuple[Any, ...]) -> Any:
+    return cls(*(intern(v) if type(v) is str else v for v in values))
+
+
+def to_plain(value: Any) -> Any:
+    if isinstance(value, SpecNode):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class FieldType:
     name: str
-    type: str
-    primary_key: bool = False
-    indexed: bool = False
-    foreign_key: str | None = None
     precision: int | None = None
     scale: int | None = None
     length: int | None = None
-    values: list[str] | None = None
+    values: tuple[str, ...] | None = None
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _shared_type, (self.name, self.precision, self.scale, self.length, self.values)
+
+
+class TypeTable:
+
+    def __init__(self) -> None:
+        self._types: dict[tuple[Any, ...], FieldType] = {}
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def get(
+        self,
+        name: str,
+        precision: int | None = None,
+        scale: int | None = None,
+        length: int | None = None,
+        values: Iterable[str] | None = None,
+    ) -> FieldType:
+        values = tuple(intern(v) for v in values) if values is not None else None
+        key = (name, precision, scale, length, values)
+        found = self._types.get(key)
+        if found is None:
+            found = self._types[key] = FieldType(intern(name), precision, scale, length, values)
+        return found
+
+
+TYPES = TypeTable()
+
+
+def _shared_type(
+    name: str, precision: int | None, scale: int | None, length: int | None, values: tuple[str, ...] | None
+) -> FieldType:
+    return TYPES.get(name, precision, scale, length, values)
 
 
-@dataclass
-class Invariant:
+@dataclass(frozen=True, eq=False, slots=True)
+class Field(SpecNode):
+    name: str
+    field_type: FieldType
+    primary_key: bool = False
+    indexed: bool = False
+    foreign_key: str | None = None
+
+    @property
+    def type(self) -> str:
+        return self.field_type.name
+
+    @property
+    def precision(self) -> int | None:
+        return self.field_type.precision
+
+    @property
+    def scale(self) -> int | None:
+        return self.field_type.scale
+
+    @property
+    def length(self) -> int | None:
+        return self.field_type.length
+
+    @property
+    def values(self) -> tuple[str, ...] | None:
+        return self.field_type.values
+
+    def _view_keys(self) -> tuple[str, ...]:
+        return _FIELD_KEYS
+
+
+_FIELD_KEYS = ("name", "type", "primary_key", "indexed", "foreign_key", "precision", "scale", "length", "values")
+
+
+def make_field(
+    name: str,
+    type: str,
+    primary_key: bool = False,
+    indexed: bool = False,
+    foreign_key: str | None = None,
+    precision: int | None = None,
+    scale: int | None = None,
+    length: int | None = None,
+    values: Iterable[str] | None = None,
+    table: TypeTable = TYPES,
+) -> Field:
+    return Field(
+        intern(name),
+        table.get(type, precision, scale, length, values),
+        primary_key,
+        indexed,
+        intern(foreign_key) if foreign_key is not None else None,
+    )
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Invariant(SpecNode):
     name: str
     expr: str
     severity: str = "error"
 
 
-@dataclass
-class Entity:
+@dataclass(frozen=True, eq=False, slots=True)
+class Entity(SpecNode):
     name: str
-    fields: list[Field] = field(default_factory=list)
-    invariants: list[Invariant] = field(default_factory=list)
+    fields: tuple[Field, ...] = ()
+    invariants: tuple[Invariant, ...] = ()
 
 
-@dataclass
-class Parameter:
+@dataclass(frozen=True, eq=False, slots=True)
+class Parameter(SpecNode):
     name: str
     type: str
 
 
-@dataclass
-class Contract:
-    inputs: list[Parameter] = field(default_factory=list)
-    preconditions: list[str] = field(default_factory=list)
-    postconditions: list[str] = field(default_factory=list)
+@dataclass(frozen=True, eq=False, slots=True)
+class Contract(SpecNode):
+    inputs: tuple[Parameter, ...] = ()
+    preconditions: tuple[str, ...] = ()
+    postconditions: tuple[str, ...] = ()
 
 
-@dataclass
-class Service:
+@dataclass(frozen=True, eq=False, slots=True)
+class Service(SpecNode):
     name: str
     contract: Contract
-    strategy: ExecutionStrategy = ExecutionStrategy.SIMPLE
+    strategy: ExecutionStrategy | str = ExecutionStrategy.SIMPLE
     isolation: str | None = None
     timeout: int | None = None
     retry_policy: str | None = None
 
+    @property
+    def inputs(self) -> tuple[Parameter, ...]:
+        return self.contract.inputs
+
+    @property
+    def preconditions(self) -> tuple[str, ...]:
+        return self.contract.preconditions
+
+    @property
+    def postconditions(self) -> tuple[str, ...]:
+        return self.contract.postconditions
+
+    def _view_keys(self) -> tuple[str, ...]:
+        return _SERVICE_KEYS
+
+
+_SERVICE_KEYS = (
+    "name", "inputs", "preconditions", "postconditions", "strategy", "isolation", "timeout", "retry_policy"
+)
 
-@dataclass
-class OpaqueBlock:
+
+@dataclass(frozen=True, eq=False, slots=True)
+class OpaqueBlock(SpecNode):
     name: str
     signature: Contract
     implementation: str
     binding: str | None = None
 
 
-@dataclass
-class Specification:
+@dataclass(frozen=True, eq=False, slots=True)
+class Specification(SpecNode):
     name: str
     version: str
-    entities: list[Entity] = field(default_factory=list)
-    services: list[Service] = field(default_factory=list)
-    opaque_blocks: list[OpaqueBlock] = field(default_factory=list)
+    entities: tuple[Entity, ...] = ()
+    services: tuple[Service, ...] = ()
+    opaque_blocks: tuple[OpaqueBlock, ...] = ()
+    architecture: dict[str, Any] | None = None
+
+    def _view_keys(self) -> tuple[str, ...]:
+        return _SPECIFICATION_KEYS
+
+
+# opaque_blocks has no load_spec() counterpart, so it stays an attribute and out of the dict view.
+_SPECIFICATION_KEYS = ("name", "version", "entities", "services", "architecture")
 
 
-def spec_dict_to_ast(spec: dict[str, Any]) -> Specification:
+def spec_dict_to_ast(spec: dict[str, Any] | Specification) -> Specification:
+    if isinstance(spec, Specification):
+        return spec
     entities = []
     for e in spec.get("entities", []):
-        fields = [
-            Field(
+        fields = tuple(
+            make_field(
                 name=f.get("name", ""),
                 type=f.get("type", "String"),
                 primary_key=f.get("primary_key", False),
@@ -92,38 +274,33 @@ def spec_dict_to_ast(spec: dict[str, Any]) -> Specification:
                 values=f.get("values"),
             )
             for f in e.get("fields", [])
-        ]
-        invariants = [
+        )
+        invariants = tuple(
             Invariant(
-                name=inv.get("name", ""),
+                name=intern(inv.get("name", "")),
                 expr=inv.get("expr", inv.get("expression", "")),
                 severity=inv.get("severity", "error"),
             )
             for inv in e.get("invariants", [])
-        ]
-        entities.append(Entity(name=e.get("name", ""), fields=fields, invariants=invariants))
+        )
+        entities.append(Entity(name=intern(e.get("name", "")), fields=fields, invariants=invariants))
 
     services = []
     for s in spec.get("services", []):
-        inputs = [
-            Parameter(name=i.get("name", ""), type=i.get("type", "String"))
+        inputs = tuple(
+            Parameter(name=intern(i.get("name", "")), type=intern(i.get("type", "String")))
             for i in s.get("inputs", [])
-        ]
+        )
         contract = Contract(
             inputs=inputs,
-            preconditions=s.get("preconditions", []),
-            postconditions=s.get("postconditions", []),
+            preconditions=tuple(s.get("preconditions", [])),
+            postconditions=tuple(s.get("postconditions", [])),
         )
-        strategy_str = s.get("strategy", "Simple")
-        try:
-            strategy = ExecutionStrategy(strategy_str)
-        except ValueError:
-            strategy = ExecutionStrategy.SIMPLE
         services.append(
             Service(
-                name=s.get("name", ""),
+                name=intern(s.get("name", "")),
                 contract=contract,
-                strategy=strategy,
+                strategy=execution_strategy(s.get("strategy", "Simple")),
                 isolation=s.get("isolation"),
                 timeout=s.get("timeout"),
                 retry_policy=s.get("retry_policy"),
@@ -133,6 +310,7 @@ def spec_dict_to_ast(spec: dict[str, Any]) -> Specification:
     return Specification(
         name=spec.get("name", "UnnamedSystem"),
         version=spec.get("version", "1.0.0"),
-        entities=entities,
-        services=services,
+        entities=tuple(entities),
+        services=tuple(services),
+        architecture=spec.get("architecture"),
     )
@@ -0,0 +1,373 @@
+import re
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterator
+
+
+class ExpressionSyntaxError(ValueError):
+    def __init__(self, message: str, text: str = "", position: int = -1) -> None:
+        self.message = message
+        self.text = text
+        self.position = position
+        where = f" at {position} in {text!r}" if position >= 0 else ""
+        super().__init__(f"{message}{where}")
+
+
+@dataclass(frozen=True, eq=False, slots=True, weakref_slot=True)
+class Expr:
+    pass
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class IntLit(Expr):
+    value: int
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class DecimalLit(Expr):
+    value: Decimal
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class StringLit(Expr):
+    value: str
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class BoolLit(Expr):
+    value: bool
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class NullLit(Expr):
+    pass
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Name(Expr):
+    id: str
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Attribute(Expr):
+    base: Expr
+    attr: str
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Call(Expr):
+    func: str
+    args: tuple[Expr, ...]
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class FieldRef(Expr):
+    entity: str
+    key: Expr
+    field: str
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Old(Expr):
+    operand: Expr
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Unary(Expr):
+    op: str
+    operand: Expr
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Binary(Expr):
+    op: str
+    left: Expr
+    right: Expr
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Compare(Expr):
+    op: str
+    left: Expr
+    right: Expr
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class BoolOp(Expr):
+    op: str
+    operands: tuple[Expr, ...]
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class SetLit(Expr):
+    items: tuple[Expr, ...]
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class Membership(Expr):
+    value: Expr
+    container: Expr
+    negated: bool = False
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<ident>[A-Za-z_][A-Za-z_0-9]*)
+  | (?P<op>==|!=|>=|<=|&&|\|\||[<>+\-*/%()\[\]{},.!])
+    """,
+    re.VERBOSE,
+)
+
+_KEYWORDS = {"and", "or", "not", "in", "true", "false", "null", "none"}
+_COMPARE_OPS = ("==", "!=", ">=", "<=", ">", "<")
+
+
+@dataclass(frozen=True, slots=True)
+class Token:
+    kind: str
+    text: str
+    position: int
+
+
+def tokenize(text: str) -> Iterator[Token]:
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if m is None:
+            raise ExpressionSyntaxError(f"Unexpected character {text[pos]!r}", text, pos)
+        kind = m.lastgroup or ""
+        value = m.group()
+        if kind == "ident" and value.lower() in _KEYWORDS:
+            yield Token("kw", value.lower(), pos)
+        elif kind == "op" and value in ("&&", "||", "!"):
+            yield Token("kw", {"&&": "and", "||": "or", "!": "not"}[value], pos)
+        elif kind != "ws":
+            yield Token(kind, value, pos)
+        pos = m.end()
+    yield Token("end", "", pos)
+
+
+# Hash-consing table; a node stays canonical only while something else still holds it, so long-lived processes
+# (the daemon) do not keep every expression they ever parsed.
+_interned: "weakref.WeakValueDictionary[tuple, Expr]" = weakref.WeakValueDictionary()
+
+
+def _node(cls: type, *args: Any) -> Any:
+    key = (cls, *(id(a) if isinstance(a, Expr) else a for a in args))
+    node = _interned.get(key)
+    if node is None:
+        node = cls(*args)
+        _interned[key] = node
+    return node
+
+
+class _Parser:
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens = list(tokenize(text))
+        self.pos = 0
+
+    def peek(self) -> Token:
+        return self.tokens[self.pos]
+
+    def next(self) -> Token:
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def accept(self, kind: str, text: str | None = None) -> Token | None:
+        tok = self.peek()
+        if tok.kind == kind and (text is None or tok.text == text):
+            self.pos += 1
+            return tok
+        return None
+
+    def expect(self, kind: str, text: str | None = None) -> Token:
+        tok = self.accept(kind, text)
+        if tok is None:
+            got = self.peek()
+            wanted = text or kind
+            raise ExpressionSyntaxError(f"Expected {wanted!r}, got {got.text or 'end of input'!r}", self.text, got.position)
+        return tok
+
+    def parse(self) -> Expr:
+        expr = self.parse_or()
+        tok = self.peek()
+        if tok.kind != "end":
+            raise ExpressionSyntaxError(f"Unexpected {tok.text!r}", self.text, tok.position)
+        return expr
+
+    def parse_or(self) -> Expr:
+        operands = [self.parse_and()]
+        while self.accept("kw", "or"):
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else _node(BoolOp, "or", tuple(operands))
+
+    def parse_and(self) -> Expr:
+        operands = [self.parse_not()]
+        while self.accept("kw", "and"):
+            operands.append(self.parse_not())
+        return operands[0] if len(operands) == 1 else _node(BoolOp, "and", tuple(operands))
+
+    def parse_not(self) -> Expr:
+        if self.accept("kw", "not"):
+            return _node(Unary, "not", self.parse_not())
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> Expr:
+        left = self.parse_additive()
+        comparisons: list[Expr] = []
+        while True:
+            tok = self.peek()
+            if tok.kind == "op" and tok.text in _COMPARE_OPS:
+                self.next()
+                right = self.parse_additive()
+                comparisons.append(_node(Compare, tok.text, left, right))
+                left = right
+            elif tok.kind == "kw" and tok.text == "in":
+                self.next()
+                comparisons.append(_node(Membership, left, self.parse_container(), False))
+            elif tok.kind == "kw" and tok.text == "not" and self.tokens[self.pos + 1].text == "in":
+                self.pos += 2
+                comparisons.append(_node(Membership, left, self.parse_container(), True))
+            else:
+                break
+        if not comparisons:
+            return left
+        return comparisons[0] if len(comparisons) == 1 else _node(BoolOp, "and", tuple(comparisons))
+
+    def parse_container(self) -> Expr:
+        tok = self.peek()
+        if tok.kind == "op" and tok.text in ("{", "["):
+            self.next()
+            closing = "}" if tok.text == "{" else "]"
+            items: list[Expr] = []
+            if not self.accept("op", closing):
+                items.append(self.parse_additive())
+                while self.accept("op", ","):
+                    items.append(self.parse_additive())
+                self.expect("op", closing)
+            return _node(SetLit, tuple(items))
+        return self.parse_additive()
+
+    def parse_additive(self) -> Expr:
+        left = self.parse_multiplicative()
+        while self.peek().kind == "op" and self.peek().text in ("+", "-"):
+            op = self.next().text
+            left = _node(Binary, op, left, self.parse_multiplicative())
+        return left
+
+    def parse_multiplicative(self) -> Expr:
+        left = self.parse_unary()
+        while self.peek().kind == "op" and self.peek().text in ("*", "/", "%"):
+            op = self.next().text
+            left = _node(Binary, op, left, self.parse_unary())
+        return left
+
+    def parse_unary(self) -> Expr:
+        if self.accept("op", "-"):
+            operand = self.parse_unary()
+            if isinstance(operand, IntLit):
+                return _node(IntLit, -operand.value)
+            if isinstance(operand, DecimalLit):
+                return _node(DecimalLit, -operand.value)
+            return _node(Unary, "-", operand)
+        if self.accept("op", "+"):
+            return self.parse_unary()
+        return self.parse_postfix()
+
+    def parse_postfix(self) -> Expr:
+        tok = self.peek()
+        if tok.kind == "ident" and tok.text.upper() == "OLD" and self.tokens[self.pos + 1].text == ".":
+            self.pos += 2
+            return _node(Old, self.parse_postfix())
+        expr = self.parse_primary()
+        while True:
+            if self.accept("op", "."):
+                attr = self.expect("ident").text
+                if isinstance(expr, Call) and len(expr.args) == 1:
+                    expr = _node(FieldRef, expr.func, expr.args[0], attr)
+                else:
+                    expr = _node(Attribute, expr, attr)
+            else:
+                return expr
+
+    def parse_primary(self) -> Expr:
+        tok = self.next()
+        if tok.kind == "number":
+            if "." in tok.text:
+                return _node(DecimalLit, Decimal(tok.text))
+            return _node(IntLit, int(tok.text))
+        if tok.kind == "string":
+            body = tok.text[1:-1]
+            return _node(StringLit, re.sub(r"\\(.)", r"\1", body))
+        if tok.kind == "kw" and tok.text in ("true", "false"):
+            return _node(BoolLit, tok.text == "true")
+        if tok.kind == "kw" and tok.text in ("null", "none"):
+            return _node(NullLit)
+        if tok.kind == "ident":
+            if self.accept("op", "("):
+                args: list[Expr] = []
+                if not self.accept("op", ")"):
+                    args.append(self.parse_or())
+                    while self.accept("op", ","):
+                        args.append(self.parse_or())
+                    self.expect("op", ")")
+                return _node(Call, tok.text, tuple(args))
+            return _node(Name, tok.text)
+        if tok.kind == "op" and tok.text == "(":
+            expr = self.parse_or()
+            self.expect("op", ")")
+            return expr
+        raise ExpressionSyntaxError(f"Unexpected {tok.text or 'end of input'!r}", self.text, tok.position)
+
+
+PARSE_CACHE_SIZE = 65536
+_parsed: OrderedDict[str, Expr] = OrderedDict()
+
+
+def parse_expr(text: str) -> Expr:
+    expr = _parsed.get(text)
+    if expr is None:
+        expr = _Parser(text).parse()
+        _parsed[text] = expr
+        while len(_parsed) > PARSE_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    else:
+        _parsed.move_to_end(text)
+    return expr
+
+
+def walk(expr: Expr, prune: type | tuple[type, ...] = ()) -> Iterator[Expr]:
+    stack = [expr]
+    seen: set[int] = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+        if isinstance(node, prune):
+            continue
+        if isinstance(node, (Unary, Old)):
+            stack.append(node.operand)
+        elif isinstance(node, (Binary, Compare)):
+            stack.extend((node.left, node.right))
+        elif isinstance(node, BoolOp):
+            stack.extend(node.operands)
+        elif isinstance(node, Membership):
+            stack.extend((node.value, node.container))
+        elif isinstance(node, SetLit):
+            stack.extend(node.items)
+        elif isinstance(node, Call):
+            stack.extend(node.args)
+        elif isinstance(node, FieldRef):
+            stack.append(node.key)
+        elif isinstance(node, Attribute):
+            stack.append(node.base)
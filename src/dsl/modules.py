@@ -0,0 +1,161 @@
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable
+
+from .ast_nodes import Specification
+from .spec_cache import SpecCache
+from .spec_index import node_name
+from .spec_loader import parse_module_text
+
+SPEC = "spec"
+SPECIFICATION = "specification"
+_SECTIONS = {"entities": "Entity", "services": "Service"}
+
+
+class ModuleError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class SpecModule:
+    path: Path
+    imports: tuple[Path, ...]
+    spec: dict[str, Any] | Specification
+    mtime_ns: int = 0
+
+
+def parse_module(path: str, kind: str = SPEC, cache_dir: str | None = None) -> tuple[list[str], Any]:
+    text = Path(path).read_text(encoding="utf-8")
+    if cache_dir is None:
+        return parse_module_text(text, kind)
+    return SpecCache(cache_dir).load(text, f"module:{kind}", lambda t: parse_module_text(t, kind))
+
+
+# Modules are parsed only when reachable from the entry file; imports found while others are still parsing go to a
+# spawn pool so independent files overlap. Parsed modules are kept, so later loads only parse what is new.
+class SpecWorkspace:
+
+    def __init__(
+        self,
+        kind: str = SPEC,
+        max_workers: int | None = None,
+        cache_dir: str | Path | None = None,
+    ) -> None:
+        if kind not in (SPEC, SPECIFICATION):
+            raise ValueError(f"Unknown spec kind: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers or multiprocessing.cpu_count())
+        self.cache_dir = str(cache_dir) if cache_dir is not None else None
+        self.modules: dict[Path, SpecModule] = {}
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> "SpecWorkspace":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def load(self, entry: str | Path) -> dict[str, Any] | Specification:
+        return merge_modules(self.resolve(entry))
+
+    def resolve(self, entry: str | Path) -> list[SpecModule]:
+        entry = Path(entry).resolve()
+        if not entry.is_file():
+            raise ModuleError(f"{entry}: spec module not found")
+        seen = {entry}
+        ready = [entry]
+        pending: dict[Future, Path] = {}
+        while ready or pending:
+            while ready:
+                path = ready.pop()
+                module = self.modules.get(path)
+                if module is not None and module.mtime_ns != path.stat().st_mtime_ns:
+                    module = None
+                if module is None and self.max_workers > 1 and (ready or pending):
+                    pending[self._submit(path)] = path
+                    continue
+                if module is None:
+                    module = self._store(path, lambda: parse_module(str(path), self.kind, self.cache_dir))
+                for dep in module.imports:
+                    if dep not in seen:
+                        seen.add(dep)
+                        ready.append(dep)
+            if pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    self._store(path, future.result)
+                    ready.append(path)
+        return self._ordered(entry)
+
+    def _submit(self, path: Path) -> Future:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool.submit(parse_module, str(path), self.kind, self.cache_dir)
+
+    def _store(self, path: Path, parse: Callable[[], tuple[list[str], Any]]) -> SpecModule:
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+            imports, spec = parse()
+        except (OSError, ValueError) as e:
+            raise ModuleError(f"{path}: {e}") from e
+        deps = []
+        for item in imports:
+            dep = (path.parent / item).resolve()
+            if not dep.is_file():
+                raise ModuleError(f"{path}: imported module {item} not found")
+            deps.append(dep)
+        module = self.modules[path] = SpecModule(path, tuple(deps), spec, mtime_ns)
+        return module
+
+    def _ordered(self, entry: Path) -> list[SpecModule]:
+        ordered: dict[Path, SpecModule] = {}
+        stack = [entry]
+        while stack:
+            path = stack.pop()
+            if path in ordered:
+                continue
+            module = ordered[path] = self.modules[path]
+            stack.extend(reversed(module.imports))
+        return list(ordered.values())
+
+
+def merge_modules(modules: list[SpecModule]) -> dict[str, Any] | Specification:
+    origin: dict[tuple[str, str], Path] = {}
+    for module in modules:
+        for section, kind in _SECTIONS.items():
+            for item in module.spec[section]:
+                key = (section, node_name(item))
+                first = origin.setdefault(key, module.path)
+                if first != module.path:
+                    raise ModuleError(f"{kind} {key[1]} is defined in both {first} and {module.path}")
+    entry = modules[0].spec
+    entities = list(chain.from_iterable(m.spec["entities"] for m in modules))
+    services = list(chain.from_iterable(m.spec["services"] for m in modules))
+    if isinstance(entry, Specification):
+        return replace(entry, entities=tuple(entities), services=tuple(services))
+    return {**entry, "entities": entities, "services": services}
+
+
+def load_modular_spec(
+    entry: str | Path, max_workers: int | None = None, cache_dir: str | Path | None = None
+) -> dict[str, Any]:
+    with SpecWorkspace(SPEC, max_workers, cache_dir) as workspace:
+        return workspace.load(entry)
+
+
+def load_modular_specification(
+    entry: str | Path, max_workers: int | None = None, cache_dir: str | Path | None = None
+) -> Specification:
+    with SpecWorkspace(SPECIFICATION, max_workers, cache_dir) as workspace:
+        return workspace.load(entry)
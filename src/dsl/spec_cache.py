@@ -0,0 +1,85 @@
+import hashlib
+import mmap
+import os
+import pickle
+import stat
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import pydantic
+import yaml
+
+MAGIC = b"CBC\x01"
+_HEADER = len(MAGIC) + hashlib.sha256().digest_size
+_LOADER_SOURCES = ("ast_nodes.py", "spec_loader.py", "spec_cache.py")
+
+
+def _loader_digest() -> str:
+    h = hashlib.sha256()
+    for name in _LOADER_SOURCES:
+        h.update((Path(__file__).parent / name).read_bytes())
+    h.update(f"pydantic:{pydantic.VERSION}\nyaml:{yaml.__version__}\n".encode())
+    return h.hexdigest()
+
+
+# Any change to the loader, the AST classes or their parsers changes every key, so stale pickles are never read.
+LOADER_DIGEST = _loader_digest()
+
+
+def spec_digest(text: str, kind: str) -> bytes:
+    h = hashlib.sha256()
+    h.update(f"loader:{LOADER_DIGEST}\nkind:{kind}\npython:{sys.version_info[0]}.{sys.version_info[1]}\n".encode())
+    h.update(text.encode("utf-8"))
+    return h.digest()
+
+
+def _trusted(st: os.stat_result) -> bool:
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+# Compiled specs are stored as <digest>.cbc: a fixed header (magic + digest) followed by one pickle, read through
+# mmap so a hit costs a single mapping of the file and no YAML parsing or pydantic validation.
+# Unpickling runs code chosen by whoever wrote the file, so only files owned by this user and writable by no one
+# else are read; do not share a cache directory between users.
+class SpecCache:
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    def _path(self, digest: bytes) -> Path:
+        return self.directory / f"{digest.hex()}.cbc"
+
+    def get(self, text: str, kind: str) -> Any | None:
+        digest = spec_digest(text, kind)
+        try:
+            with open(self._path(digest), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                if not _trusted(os.fstat(f.fileno())) or view[:_HEADER] != MAGIC + digest:
+                    return None
+                with memoryview(view) as buffer, buffer[_HEADER:] as payload:
+                    return pickle.loads(payload)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, text: str, kind: str, value: Any) -> None:
+        digest = spec_digest(text, kind)
+        path = self._path(digest)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(MAGIC + digest)
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def load(self, text: str, kind: str, parse: Callable[[str], Any]) -> Any:
+        value = self.get(text, kind)
+        if value is None:
+            value = parse(text)
+            self.put(text, kind, value)
+        return value
+
+    def clear(self) -> None:
+        for p in self.directory.glob("*.cbc"):
+            p.unlink(missing_ok=True)
@@ -0,0 +1,177 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .ast_nodes import SpecNode
+from .expressions import ExpressionSyntaxError, Token, tokenize
+
+INVARIANT = "invariant"
+PRECONDITION = "precondition"
+POSTCONDITION = "postcondition"
+
+
+@dataclass(frozen=True, slots=True)
+class Reference:
+    kind: str
+    owner: str
+    name: str
+    expr: str
+    entities: tuple[str, ...]
+    fields: tuple[tuple[str, str], ...]
+
+    @property
+    def label(self) -> str:
+        return f"{self.owner}.{self.name}"
+
+
+def _tokens(expr: str) -> list[Token]:
+    tokens = []
+    try:
+        for token in tokenize(expr):
+            tokens.append(token)
+    except ExpressionSyntaxError:
+        pass
+    return tokens
+
+
+def scan_references(
+    expr: str, entity_names: set[str] | dict[str, Any]
+) -> tuple[tuple[str, ...], tuple[tuple[str, str], ...]]:
+    tokens = _tokens(expr)
+    entities: dict[str, None] = {}
+    fields: dict[tuple[str, str], None] = {}
+    for i, token in enumerate(tokens):
+        if token.kind != "ident" or token.text not in entity_names:
+            continue
+        if i + 1 >= len(tokens) or tokens[i + 1].text != "(":
+            continue
+        entities[token.text] = None
+        depth = 0
+        for j in range(i + 1, len(tokens)):
+            depth += {"(": 1, ")": -1}.get(tokens[j].text, 0)
+            if depth == 0:
+                if j + 2 < len(tokens) and tokens[j + 1].text == "." and tokens[j + 2].kind == "ident":
+                    fields[(token.text, tokens[j + 2].text)] = None
+                break
+    return tuple(entities), tuple(fields)
+
+
+def called_names(expr: str) -> tuple[str, ...]:
+    tokens = _tokens(expr)
+    return tuple(dict.fromkeys(
+        token.text for token, following in zip(tokens, tokens[1:])
+        if token.kind == "ident" and following.text == "("
+    ))
+
+
+def node_name(node: Any) -> str:
+    return node.name if isinstance(node, SpecNode) else node.get("name", "")
+
+
+def _field_map(entity: Any) -> dict[str, Any]:
+    return {f.get("name", ""): f for f in entity.get("fields", [])}
+
+
+class SpecIndex:
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        self.spec = spec
+        self.entities: dict[str, Any] = {}
+        self.fields: dict[str, dict[str, Any]] = {}
+        self.services: dict[str, Any] = {}
+        for entity in spec.get("entities", []):
+            name = node_name(entity)
+            self.entities[name] = entity
+            self.fields[name] = _field_map(entity)
+        for service in spec.get("services", []):
+            self.services[node_name(service)] = service
+        self._references: list[Reference] | None = None
+        self._referenced_by: dict[str, list[Reference]] = {}
+        self._enum_fields: dict[str, Any] = {}
+
+    @property
+    def references(self) -> list[Reference]:
+        if self._references is None:
+            self._references = self._scan()
+        return self._references
+
+    def update(
+        self,
+        spec: dict[str, Any],
+        entities: Mapping[str, Any | None],
+        services: Mapping[str, Any | None],
+        reorder: bool = False,
+    ) -> None:
+        self.spec = spec
+        if reorder:
+            self.entities = {node_name(e): e for e in spec.get("entities", [])}
+            self.services = {node_name(s): s for s in spec.get("services", [])}
+        for name, entity in entities.items():
+            if entity is None:
+                self.entities.pop(name, None)
+                self.fields.pop(name, None)
+            else:
+                self.entities[name] = entity
+                self.fields[name] = _field_map(entity)
+            self._enum_fields.pop(name, None)
+        for name, service in services.items():
+            if service is None:
+                self.services.pop(name, None)
+            else:
+                self.services[name] = service
+        self._references = None
+        self._referenced_by = {}
+
+    def entity_references(self, name: str) -> list[Reference]:
+        entity = self.entities.get(name)
+        if entity is None:
+            return []
+        return [
+            self._reference(INVARIANT, name, inv.get("name", ""), inv.get("expr", inv.get("expression", "")))
+            for inv in entity.get("invariants", [])
+        ]
+
+    def service_references(self, name: str) -> list[Reference]:
+        service = self.services.get(name)
+        if service is None:
+            return []
+        references = []
+        for i, pre in enumerate(service.get("preconditions", [])):
+            references.append(self._reference(PRECONDITION, name, f"pre[{i}]", str(pre)))
+        for i, post in enumerate(service.get("postconditions", [])):
+            references.append(self._reference(POSTCONDITION, name, f"post[{i}]", str(post)))
+        return references
+
+    def _scan(self) -> list[Reference]:
+        references = []
+        for name in self.entities:
+            references.extend(self.entity_references(name))
+        for name in self.services:
+            references.extend(self.service_references(name))
+        for reference in references:
+            for entity in reference.entities:
+                self._referenced_by.setdefault(entity, []).append(reference)
+        return references
+
+    def _reference(self, kind: str, owner: str, name: str, expr: str) -> Reference:
+        entities, fields = scan_references(expr, self.entities)
+        return Reference(kind, owner, name, expr, entities, fields)
+
+    def field(self, entity: str, name: str) -> Any | None:
+        return self.fields.get(entity, {}).get(name)
+
+    def enum_field(self, entity: str) -> Any | None:
+        if entity not in self._enum_fields:
+            self._enum_fields[entity] = next(
+                (
+                    f for f in self.fields.get(entity, {}).values()
+                    if f.get("type", "").lower() == "enum" and f.get("values")
+                ),
+                None,
+            )
+        return self._enum_fields[entity]
+
+    def referenced_by(self, entity: str) -> list[Reference]:
+        if self._references is None:
+            self._references = self._scan()
+        return self._referenced_by.get(entity, [])
@@ -1,9 +1,36 @@
+import gc
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Union
+from sys import intern
+from typing import Any, Callable, Iterator, Union
 
 import yaml
 from pydantic import BaseModel, Field, field_validator
 
+from .ast_nodes import (
+    TYPES,
+    Contract,
+    Entity,
+    Invariant,
+    Parameter,
+    Service,
+    Specification,
+    TypeTable,
+    execution_strategy,
+    make_field,
+)
+from .ast_nodes import Field as FieldNode
+from .spec_cache import SpecCache
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_TRUE = {"1", "true", "t", "yes", "y", "on"}
+_FALSE = {"0", "false", "f", "no", "n", "off"}
+_REQUIRED = object()
+
+
+class SpecFormatError(ValueError):
+    pass
+
 
 class FieldSpec(BaseModel):
     name: str
@@ -113,24 +140,241 @@ class SpecModel(BaseModel):
         return []
 
 
-def load_spec(source: Union[str, Path]) -> dict[str, Any]:
+def _read_source(source: Union[str, Path]) -> str:
     if isinstance(source, Path):
-        source = source.read_text(encoding="utf-8")
-    elif isinstance(source, str) and Path(source).exists():
-        source = Path(source).read_text(encoding="utf-8")
+        return source.read_text(encoding="utf-8")
+    if isinstance(source, str) and Path(source).exists():
+        return Path(source).read_text(encoding="utf-8")
+    return source
+
+
+# Loading allocates millions of acyclic objects on large specs; generational GC passes over them grow quadratically.
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
 
+def _parse_yaml(source: str) -> dict[str, Any]:
     try:
-        raw = yaml.safe_load(source)
+        with _gc_paused():
+            raw = yaml.load(source, Loader=_YAML_LOADER)
     except yaml.YAMLError as e:
         raise ValueError(f"YAML parsing error: {e}") from e
 
     if not isinstance(raw, dict):
         raise ValueError("Specification must be a YAML object (dict)")
+    return raw
+
+
+def _cached(text: str, kind: str, parse: Callable[[str], Any], cache_dir: str | Path | None) -> Any:
+    if cache_dir is None:
+        return parse(text)
+    with _gc_paused():
+        return SpecCache(cache_dir).load(text, kind, parse)
+
+
+def load_spec(source: Union[str, Path], cache_dir: str | Path | None = None) -> dict[str, Any]:
+    return _cached(_read_source(source), "spec", parse_spec_text, cache_dir)
 
-    model = SpecModel.model_validate(raw)
+
+def parse_spec_text(source: str) -> dict[str, Any]:
+    model = SpecModel.model_validate(_parse_yaml(source))
     return model.model_dump()
 
 
+def load_specification(source: Union[str, Path], cache_dir: str | Path | None = None) -> Specification:
+    return _cached(_read_source(source), "specification", parse_specification_text, cache_dir)
+
+
+def parse_specification_text(source: str) -> Specification:
+    raw = _parse_yaml(source)
+    with _gc_paused():
+        return build_specification(raw)
+
+
+def parse_module_text(source: str, kind: str = "spec") -> tuple[list[str], dict[str, Any] | Specification]:
+    raw = _parse_yaml(source)
+    imports = raw.pop("imports", None) or []
+    if not isinstance(imports, list) or not all(isinstance(item, str) for item in imports):
+        raise SpecFormatError("imports: Input should be a list of file paths")
+    if kind == "spec":
+        return imports, SpecModel.model_validate(raw).model_dump()
+    with _gc_paused():
+        return imports, build_specification(raw)
+
+
+def build_specification(raw: dict[str, Any], types: TypeTable = TYPES) -> Specification:
+    raw_entities = raw.get("entities")
+    entities: tuple[Entity, ...] = ()
+    if isinstance(raw_entities, list):
+        entities = tuple(_entity(item, f"entities[{i}]", types) for i, item in enumerate(raw_entities))
+    services = tuple(_service(item, f"services[{i}]") for i, item in enumerate(_list(raw, "services", "", [])))
+    architecture = raw.get("architecture")
+    return Specification(
+        name=_str(raw, "name", "", "UnnamedSystem"),
+        version=_str(raw, "version", "", "1.0.0"),
+        entities=entities,
+        services=services,
+        architecture=_architecture(architecture, "architecture") if architecture is not None else None,
+    )
+
+
+def _entity(item: Any, path: str, types: TypeTable) -> Entity:
+    if not isinstance(item, dict):
+        return Entity(name=intern(str(item)))
+    if "fields" not in item:
+        return Entity(name=intern(_str(item, "name", path, "Entity")))
+    return Entity(
+        name=intern(_str(item, "name", path)),
+        fields=tuple(_field(f, f"{path}.fields[{i}]", types) for i, f in enumerate(_list(item, "fields", path))),
+        invariants=tuple(
+            _invariant(v, f"{path}.invariants[{i}]") for i, v in enumerate(_list(item, "invariants", path, []))
+        ),
+    )
+
+
+def _field(item: Any, path: str, types: TypeTable) -> FieldNode:
+    item = _object(item, path)
+    values = _list(item, "values", path, None)
+    type_ = item.get("type", "String")
+    return make_field(
+        name=_str(item, "name", path),
+        type=type_ if isinstance(type_, str) else str(type_),
+        primary_key=_bool(item, "primary_key", path),
+        indexed=_bool(item, "indexed", path),
+        foreign_key=_str(item, "foreign_key", path, None),
+        precision=_int(item, "precision", path, None),
+        scale=_int(item, "scale", path, None),
+        length=_int(item, "length", path, None),
+        values=[_item_str(v, f"{path}.values[{i}]") for i, v in enumerate(values)] if values is not None else None,
+        table=types,
+    )
+
+
+def _invariant(item: Any, path: str) -> Invariant:
+    item = _object(item, path)
+    if "expr" not in item:
+        raise SpecFormatError(f"{path}.expr: Field required")
+    expr = item["expr"]
+    if isinstance(expr, dict) and "expression" in expr:
+        expr = _item_str(expr["expression"], f"{path}.expr")
+    elif not isinstance(expr, str):
+        expr = str(expr)
+    return Invariant(
+        name=intern(_str(item, "name", path)), expr=expr, severity=intern(_str(item, "severity", path, "error"))
+    )
+
+
+def _service(item: Any, path: str) -> Service:
+    item = _object(item, path)
+    inputs = []
+    raw_inputs = item.get("inputs") or []
+    if not isinstance(raw_inputs, list):
+        raise SpecFormatError(f"{path}.inputs: Input should be a valid list")
+    for i, inp in enumerate(raw_inputs):
+        where = f"{path}.inputs[{i}]"
+        if isinstance(inp, dict):
+            inputs.append(Parameter(intern(_str(inp, "name", where)), intern(_str(inp, "type", where, "String"))))
+        elif isinstance(inp, str):
+            name, sep, type_ = inp.partition(":")
+            name, type_ = (name.strip(), type_.strip()) if sep else (inp, "String")
+            inputs.append(Parameter(intern(name), intern(type_)))
+    return Service(
+        name=intern(_str(item, "name", path)),
+        contract=Contract(
+            inputs=tuple(inputs),
+            preconditions=tuple(
+                _item_str(p, f"{path}.preconditions[{i}]") for i, p in enumerate(_list(item, "preconditions", path, []))
+            ),
+            postconditions=tuple(
+                _item_str(p, f"{path}.postconditions[{i}]")
+                for i, p in enumerate(_list(item, "postconditions", path, []))
+            ),
+        ),
+        strategy=execution_strategy(_str(item, "strategy", path, "Simple")),
+        isolation=_str(item, "isolation", path, None),
+        timeout=_int(item, "timeout", path, None),
+        retry_policy=_str(item, "retry_policy", path, None),
+    )
+
+
+def _architecture(item: Any, path: str) -> dict[str, Any]:
+    item = _object(item, path)
+    requirements = _object(item.get("requirements", {}), f"{path}.requirements")
+    where = f"{path}.requirements"
+    return {"requirements": {
+        "rps_target": _int(requirements, "rps_target", where, 100),
+        "consistency": _str(requirements, "consistency", where, "strong"),
+        "durability": _str(requirements, "durability", where, "high"),
+        "latency_p99": _int(requirements, "latency_p99", where, 100),
+    }}
+
+
+def _object(item: Any, path: str) -> dict[str, Any]:
+    if not isinstance(item, dict):
+        raise SpecFormatError(f"{path}: Input should be a valid dictionary")
+    return item
+
+
+def _value(item: dict[str, Any], key: str, path: str, default: Any) -> Any:
+    if key in item:
+        return item[key]
+    if default is _REQUIRED:
+        raise SpecFormatError(f"{path}.{key}: Field required" if path else f"{key}: Field required")
+    return default
+
+
+def _list(item: dict[str, Any], key: str, path: str, default: Any = _REQUIRED) -> Any:
+    value = _value(item, key, path, default)
+    if value is None and default is None:
+        return None
+    if not isinstance(value, list):
+        raise SpecFormatError(f"{path}.{key}: Input should be a valid list")
+    return value
+
+
+def _item_str(value: Any, path: str) -> str:
+    if not isinstance(value, str):
+        raise SpecFormatError(f"{path}: Input should be a valid string")
+    return value
+
+
+def _str(item: dict[str, Any], key: str, path: str, default: Any = _REQUIRED) -> Any:
+    value = _value(item, key, path, default)
+    if value is None and default is None:
+        return None
+    return _item_str(value, f"{path}.{key}" if path else key)
+
+
+def _bool(item: dict[str, Any], key: str, path: str) -> bool:
+    value = item.get(key, False)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, str)) and str(value).lower() in _TRUE | _FALSE:
+        return str(value).lower() in _TRUE
+    raise SpecFormatError(f"{path}.{key}: Input should be a valid boolean")
+
+
+def _int(item: dict[str, Any], key: str, path: str, default: int | None) -> int | None:
+    value = item.get(key, default)
+    if value is None or isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise SpecFormatError(f"{path}.{key}: Input should be a valid integer")
+
+
 def validate_spec(spec: dict[str, Any]) -> list[str]:
     errors: list[str] = []
     try:
@@ -1,6 +1,15 @@
+from dataclasses import dataclass
+from itertools import chain
 from typing import Any
 
-from .ast_nodes import Entity, Service, Specification, spec_dict_to_ast
+from .ast_nodes import Specification
+from .spec_index import INVARIANT, PRECONDITION, Reference, SpecIndex, called_names, node_name
+from .spec_loader import SpecModel, validate_spec
+
+ENTITY = "entity"
+SERVICE = "service"
+_HEADER_KEYS = ("name", "version", "architecture")
+_SECTIONS = {ENTITY: "entities", SERVICE: "services"}
 
 
 class ValidationError(Exception):
@@ -10,51 +19,226 @@ class ValidationError(Exception):
         super().__init__(f"{path}: {message}" if path else message)
 
 
-def validate_specification(spec: dict[str, Any] | Specification) -> list[str]:
+def invariant_errors(ref: Reference) -> list[str]:
+    return [
+        f"Entity {ref.owner}, invariant {ref.name}: reference to {other} — use only your entity's fields"
+        for other in ref.entities
+        if other != ref.owner
+    ]
+
+
+def precondition_errors(ref: Reference, index: SpecIndex) -> list[str]:
+    errors = []
+    for entity, field_ref in ref.fields:
+        known = index.fields[entity]
+        if known and field_ref not in known:
+            errors.append(f"Service {ref.owner}: precondition references non-existent field {field_ref}")
+    return errors
+
+
+def input_errors(name: str, service: Any) -> list[str]:
+    errors = []
+    for inp in service.get("inputs", []):
+        if not inp.get("name", ""):
+            errors.append(f"Service {name}: empty parameter name")
+        if not inp.get("type", "String"):
+            errors.append(f"Service {name}, input {inp.get('name', '')}: type not specified")
+    return errors
+
+
+def validate_specification(spec: dict[str, Any] | Specification, index: SpecIndex | None = None) -> list[str]:
+    index = index or SpecIndex(spec)
     errors: list[str] = []
-    if isinstance(spec, dict):
-        ast = spec_dict_to_ast(spec)
-    else:
-        ast = spec
-
-    entity_names = {e.name for e in ast.entities}
-    entity_field_map: dict[str, set[str]] = {}
-    for e in ast.entities:
-        entity_field_map[e.name] = {f.name for f in e.fields}
-
-    for entity in ast.entities:
-        for inv in entity.invariants:
-            for f in entity.fields:
-                if f.name in inv.expr and f.name not in entity_field_map.get(entity.name, set()):
-                    pass
-            for other in entity_names:
-                if other != entity.name and f"{other}(" in inv.expr:
-                    errors.append(
-                        f"Entity {entity.name}, invariant {inv.name}: "
-                        f"reference to {other} — use only your entity's fields"
-                    )
-
-    for service in ast.services:
-        for pre in service.contract.preconditions:
-            for ref in entity_names:
-                if f"{ref}(" in pre:
-                    if ref not in entity_names:
-                        errors.append(
-                            f"Service {service.name}: precondition references non-existent entity {ref}"
-                        )
-                    else:
-                        if ")." in pre:
-                            field_ref = pre.split(").")[-1].split(".")[-1].split(" ")[0]
-                            if field_ref and entity_field_map.get(ref) and field_ref not in entity_field_map[ref]:
-                                errors.append(
-                                    f"Service {service.name}: precondition references non-existent field {field_ref}"
-                                )
-
-    for service in ast.services:
-        for inp in service.contract.inputs:
-            if not inp.name:
-                errors.append(f"Service {service.name}: empty parameter name")
-            if not inp.type:
-                errors.append(f"Service {service.name}, input {inp.name}: type not specified")
+
+    for ref in index.references:
+        if ref.kind == INVARIANT:
+            errors.extend(invariant_errors(ref))
+
+    for ref in index.references:
+        if ref.kind == PRECONDITION:
+            errors.extend(precondition_errors(ref, index))
+
+    for name, service in index.services.items():
+        errors.extend(input_errors(name, service))
 
     return errors
+
+
+@dataclass(frozen=True, slots=True)
+class SpecEdit:
+    entities: frozenset[str] = frozenset()
+    services: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_diff(cls, diff: Any) -> "SpecEdit":
+        return cls(
+            frozenset(chain(
+                diff.added_entities,
+                diff.removed_entities,
+                (c.entity for c in diff.field_changes),
+                (c.entity for c in diff.invariant_changes),
+            )),
+            frozenset(chain(diff.added_services, diff.removed_services, diff.modified_services)),
+        )
+
+
+def _parses(data: dict[str, Any]) -> bool:
+    try:
+        SpecModel.model_validate(data)
+    except Exception:
+        return False
+    return True
+
+
+def _store(table: dict[str, list[str]], name: str, errors: list[str]) -> None:
+    if errors:
+        table[name] = errors
+    else:
+        table.pop(name, None)
+
+
+# Keeps per-entity/per-service results plus the "Name(" call graph, so an edit re-checks only the units it
+# touches and the expressions that call them; update() returns exactly validate_spec() + validate_specification().
+class IncrementalValidator:
+
+    def __init__(self, spec: dict[str, Any] | Specification) -> None:
+        self.spec = spec
+        self.index = SpecIndex(spec)
+        self.errors: list[str] = []
+        self._invariants: dict[str, list[str]] = {}
+        self._preconditions: dict[str, list[str]] = {}
+        self._inputs: dict[str, list[str]] = {}
+        self._malformed: set[tuple[str, str]] = set()
+        self._calls: dict[tuple[str, str], tuple[str, ...]] = {}
+        self._callers: dict[str, set[tuple[str, str]]] = {}
+        self._positions: dict[str, dict[str, int]] = {}
+        self._sizes: dict[str, int] = {}
+        self._reposition(self._lists(spec))
+        structure = bool(validate_spec(spec))
+        for name in self.index.entities:
+            self._check(ENTITY, name, structure)
+        for name in self.index.services:
+            self._check(SERVICE, name, structure)
+        self.errors = self._collect()
+
+    def update(self, spec: dict[str, Any] | Specification, change: Any) -> list[str]:
+        edit = change if isinstance(change, SpecEdit) else SpecEdit.from_diff(change)
+        lists = self._lists(spec)
+        if not self._track(lists, edit):
+            self.index.update(spec, {}, {}, reorder=True)
+            self._reposition(lists)
+        if self._duplicated():
+            # Which of two same-named nodes wins depends on order, so no edit can be trusted to be local.
+            edit = SpecEdit(edit.entities | set(self.index.entities), edit.services | set(self.index.services))
+        self.spec = spec
+        self.index.update(
+            spec,
+            {name: self._node(lists, ENTITY, name) for name in edit.entities},
+            {name: self._node(lists, SERVICE, name) for name in edit.services},
+        )
+
+        touched = {(ENTITY, name) for name in edit.entities} | {(SERVICE, name) for name in edit.services}
+        for kind, name in touched:
+            self._check(kind, name)
+        stale = set()
+        for name in edit.entities:
+            stale |= self._callers.get(name, set())
+        for kind, name in stale - touched:
+            self._check(kind, name, structure=False)
+        self.errors = self._collect()
+        return self.errors
+
+    def _lists(self, spec: dict[str, Any] | Specification) -> dict[str, list[Any]]:
+        return {kind: spec.get(section, []) for kind, section in _SECTIONS.items()}
+
+    def _reposition(self, lists: dict[str, list[Any]]) -> None:
+        self._positions = {
+            ENTITY: {name: i for i, name in enumerate(self.index.entities)},
+            SERVICE: {name: i for i, name in enumerate(self.index.services)},
+        }
+        self._sizes = {kind: len(nodes) for kind, nodes in lists.items()}
+
+    def _duplicated(self) -> bool:
+        return any(len(self._positions[kind]) != size for kind, size in self._sizes.items())
+
+    def _flagged(self, kind: str) -> set[str]:
+        tables = (self._invariants,) if kind == ENTITY else (self._preconditions, self._inputs)
+        flagged = {name for k, name in self._malformed if k == kind}
+        for table in tables:
+            flagged.update(table)
+        return flagged
+
+    def _track(self, lists: dict[str, list[Any]], edit: SpecEdit) -> bool:
+        if self._duplicated():
+            return False
+        appended = {}
+        for kind, names in ((ENTITY, edit.entities), (SERVICE, edit.services)):
+            nodes, positions, size = lists[kind], self._positions[kind], self._sizes[kind]
+            fresh = [node_name(node) for node in nodes[size:]]
+            if len(nodes) < size or not names.issuperset(fresh) or len(set(fresh)) != len(fresh):
+                return False
+            if any(name in positions for name in fresh):
+                return False
+            for name in chain(names, self._flagged(kind)):
+                pos = positions.get(name)
+                if pos is None and name not in fresh or pos is not None and node_name(nodes[pos]) != name:
+                    return False
+            appended[kind] = fresh
+        for kind, fresh in appended.items():
+            for name in fresh:
+                self._positions[kind][name] = self._sizes[kind]
+                self._sizes[kind] += 1
+        return True
+
+    def _node(self, lists: dict[str, list[Any]], kind: str, name: str) -> Any | None:
+        pos = self._positions[kind].get(name)
+        if pos is None:
+            return None
+        if self._duplicated():
+            table = self.index.entities if kind == ENTITY else self.index.services
+            return table.get(name)
+        return lists[kind][pos]
+
+    def _check(self, kind: str, name: str, structure: bool = True) -> None:
+        if kind == ENTITY:
+            node = self.index.entities.get(name)
+            refs = self.index.entity_references(name)
+            _store(self._invariants, name, [e for ref in refs for e in invariant_errors(ref)])
+        else:
+            node = self.index.services.get(name)
+            refs = self.index.service_references(name)
+            _store(self._preconditions, name, [
+                e for ref in refs if ref.kind == PRECONDITION for e in precondition_errors(ref, self.index)
+            ])
+            _store(self._inputs, name, input_errors(name, node) if node is not None else [])
+        self._link((kind, name), dict.fromkeys(n for ref in refs for n in called_names(ref.expr)))
+        if structure:
+            if node is not None and not _parses({_SECTIONS[kind]: [node]}):
+                self._malformed.add((kind, name))
+            else:
+                self._malformed.discard((kind, name))
+
+    def _link(self, key: tuple[str, str], names: dict[str, None]) -> None:
+        for name in self._calls.pop(key, ()):
+            self._callers[name].discard(key)
+        if names:
+            self._calls[key] = tuple(names)
+            for name in names:
+                self._callers.setdefault(name, set()).add(key)
+
+    def _header_ok(self) -> bool:
+        return _parses({k: self.spec[k] for k in _HEADER_KEYS if k in self.spec})
+
+    def _ordered(self, kind: str, table: dict[str, list[str]]) -> list[str]:
+        positions = self._positions[kind]
+        return [e for name in sorted(table, key=positions.__getitem__) for e in table[name]]
+
+    def _collect(self) -> list[str]:
+        errors = []
+        if self._malformed or self._duplicated() or not self._header_ok():
+            errors = validate_spec(self.spec)
+        errors += self._ordered(ENTITY, self._invariants)
+        errors += self._ordered(SERVICE, self._preconditions)
+        errors += self._ordered(SERVICE, self._inputs)
+        return errors
+
@@ -1,9 +1,16 @@
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Iterator
 
-from z3 import sat, Solver
+from z3 import Bool, Implies, Not, RealVal, sat
 
-from .z3_translator import translate_spec_to_z3
+from ..dsl.expressions import ExpressionSyntaxError
+from ..dsl.type_system import is_numeric_type, is_reference_type
+from .expr_lowering import LoweringScope, UnsupportedExpression, Z3Lowerer
+from .parallel import INVARIANT_PROBE, SUSPICIOUS_PROBE, CheckTask, run_checks
+from .smt_utils import create_solver
+from .smtlib import export_probe_queries, load_outcomes, read_manifest, read_results
+from .z3_translator import numeric_bounds, translate_spec_to_z3
 
 
 @dataclass
@@ -12,6 +19,7 @@ class SuspiciousState:
     entity_name: str
     variable_values: dict[str, Any]
     prevention_rule: str | None = None
+    probe: str | None = None
 
 
 SUSPICIOUS_PATTERNS = [
@@ -36,44 +44,161 @@ SUSPICIOUS_PATTERNS = [
 ]
 
 
-class CounterexampleFinder:
+class CounterexampleSearch:
+
+    def __init__(self, spec: dict[str, Any], timeout_ms: int = 3000) -> None:
+        self.spec = spec
+        self.translation = translate_spec_to_z3(spec)
+        self.solver = create_solver(timeout_ms)
+        # Invariants sit behind trackers so a probe of one invariant can switch it off and ask whether the rest of
+        # the spec still admits a violating state; with it asserted the probe would be unsat by construction.
+        self.trackers = [Bool(f"probe!{i}") for i in range(len(self.translation.invariant_formulas))]
+        for tracker, f in zip(self.trackers, self.translation.invariant_formulas):
+            self.solver.add(Implies(tracker, f))
+        self.enum_values = {
+            v
+            for entity in spec.get("entities", [])
+            for f in entity.get("fields", [])
+            for v in f.get("values") or []
+        }
+
+    def scopes(self) -> Iterator[tuple[str, list[dict[str, Any]], LoweringScope, dict[str, Any], list[Any]]]:
+        t = self.translation
+        for entity in self.spec.get("entities", []):
+            name = entity.get("name", "")
+            yield name, entity.get("fields", []), t.entity_scopes[name], t.entity_vars[name], []
+        for service in self.spec.get("services", []):
+            name = service.get("name", "")
+            yield (
+                name,
+                service.get("inputs", []),
+                t.service_scopes[name],
+                t.service_vars[name],
+                t.precondition_formulas.get(name, []),
+            )
+
+    def probe(
+        self,
+        condition: Any,
+        variables: dict[str, Any],
+        extra: list[Any] | None = None,
+        disabled: list[int] | None = None,
+    ) -> dict[str, str] | None:
+        assumptions = [t for i, t in enumerate(self.trackers) if i not in (disabled or ())]
+        self.solver.push()
+        try:
+            for f in extra or []:
+                self.solver.add(f)
+            self.solver.add(condition)
+            if self.solver.check(*assumptions) != sat:
+                return None
+            model = self.solver.model()
+            return {str(v): str(model.eval(v, model_completion=True)) for v in variables.values()}
+        finally:
+            self.solver.pop()
+
+    def pattern_probes(self) -> Iterator[tuple[SuspiciousState, Any, dict[str, Any], list[Any]]]:
+        for pattern in SUSPICIOUS_PATTERNS:
+            for name, _, scope, variables, extra in self.scopes():
+                try:
+                    condition = Z3Lowerer(scope.restricted(self.enum_values)).lower_bool(pattern["condition"])
+                except (ExpressionSyntaxError, UnsupportedExpression):
+                    continue
+                state = SuspiciousState(pattern["description"], name, {}, pattern["prevention"], pattern["name"])
+                yield state, condition, variables, extra
+
+    def boundary_probes(self) -> Iterator[tuple[SuspiciousState, Any, dict[str, Any], list[Any]]]:
+        for name, fields, scope, variables, extra in self.scopes():
+            for probe_name, description, condition, prevention in self._boundary_probes(fields, scope, variables):
+                yield SuspiciousState(description, name, {}, prevention, probe_name), condition, variables, extra
+
+    def _found(
+        self, probes: Iterator[tuple[SuspiciousState, Any, dict[str, Any], list[Any]]]
+    ) -> Iterator[SuspiciousState]:
+        for state, condition, variables, extra in probes:
+            values = self.probe(condition, variables, extra)
+            if values is not None:
+                yield replace(state, variable_values=values)
+
+    def pattern_states(self) -> Iterator[SuspiciousState]:
+        return self._found(self.pattern_probes())
+
+    def boundary_states(self) -> Iterator[SuspiciousState]:
+        return self._found(self.boundary_probes())
+
+    def _boundary_probes(
+        self, fields: list[dict[str, Any]], scope: LoweringScope, variables: dict[str, Any]
+    ) -> Iterator[tuple[str, str, Any, str | None]]:
+        lowerer = Z3Lowerer(scope)
+        references = []
+        for f in fields:
+            fname = f.get("name", "")
+            var = variables.get(fname)
+            if var is None:
+                continue
+            ftype = f.get("type", "String")
+            if is_numeric_type(ftype):
+                yield f"zero:{fname}", f"Edge case: {fname} equals zero", var == 0, None
+                bounds = numeric_bounds(f)
+                if bounds is not None:
+                    low, high = bounds
+                    yield f"min:{fname}", f"Edge case: {fname} at minimum {low}", var == RealVal(str(low)), f"{fname} > {low}"
+                    yield f"max:{fname}", f"Edge case: {fname} at maximum {high}", var == RealVal(str(high)), f"{fname} < {high}"
+            elif ftype.lower() == "enum" and f.get("values"):
+                values = f["values"]
+                for value in dict.fromkeys((values[0], values[-1])):
+                    try:
+                        condition = lowerer.lower_bool(f"{fname} == {value}")
+                    except (ExpressionSyntaxError, UnsupportedExpression):
+                        continue
+                    yield f"enum:{fname}={value}", f"Edge case: {fname} is {value}", condition, None
+            elif is_reference_type(ftype) and not f.get("primary_key"):
+                references.append((fname, var))
+
+        for i, (a, var_a) in enumerate(references):
+            for b, var_b in references[i + 1:]:
+                yield f"equal:{a}={b}", f"Edge case: {a} equals {b}", var_a == var_b, f"{a} != {b}"
+
+    def invariant_counterexample(self, entity_name: str, invariant_expr: str) -> SuspiciousState | None:
+        scope = self.translation.entity_scopes.get(entity_name)
+        entity_vars = self.translation.entity_vars.get(entity_name)
+        if scope is None or not entity_vars:
+            return None
+        try:
+            formula = Z3Lowerer(scope).lower_bool(invariant_expr)
+        except (ExpressionSyntaxError, UnsupportedExpression):
+            return None
+        disabled = self.translation.invariant_indices(entity_name, invariant_expr)
+        values = self.probe(Not(formula), entity_vars, disabled=disabled)
+        if values is None:
+            return None
+        return SuspiciousState(
+            description=f"Invariant violation: {invariant_expr}",
+            entity_name=entity_name,
+            variable_values=values,
+            prevention_rule=invariant_expr,
+        )
 
-    def __init__(self, timeout_ms: int = 3000) -> None:
-        self.timeout_ms = timeout_ms
 
-    def find_suspicious_states(self, spec: dict[str, Any]) -> list[SuspiciousState]:
-        result = translate_spec_to_z3(spec)
-        found: list[SuspiciousState] = []
+class CounterexampleFinder:
 
-        solver = Solver()
-        solver.set("timeout", self.timeout_ms)
+    def __init__(
+        self,
+        timeout_ms: int = 3000,
+        parallel: bool = False,
+        max_workers: int | None = None,
+    ) -> None:
+        self.timeout_ms = timeout_ms
+        self.parallel = parallel
+        self.max_workers = max_workers
 
-        for formula in result.invariant_formulas:
-            solver.add(formula)
+    def iter_suspicious_states(self, spec: dict[str, Any]) -> Iterator[SuspiciousState]:
+        search = CounterexampleSearch(spec, self.timeout_ms)
+        yield from search.pattern_states()
+        yield from search.boundary_states()
 
-        for entity_name, entity_vars in result.entity_vars.items():
-            if "balance" in entity_vars:
-                balance_var = entity_vars["balance"]
-                try:
-                    solver.push()
-                    solver.add(balance_var == 0)
-                    if solver.check() == sat:
-                        model = solver.model()
-                        values = {str(v): str(model.eval(v)) for v in entity_vars.values()}
-                        found.append(
-                            SuspiciousState(
-                                description="Edge case: balance equals zero",
-                                entity_name=entity_name,
-                                variable_values=values,
-                                prevention_rule=None,
-                            )
-                        )
-                except Exception:
-                    pass
-                finally:
-                    solver.pop()
-
-        return found
+    def find_suspicious_states(self, spec: dict[str, Any]) -> list[SuspiciousState]:
+        return list(self.iter_suspicious_states(spec))
 
     def find_counterexample_for_invariant(
         self,
@@ -81,39 +206,38 @@ class CounterexampleFinder:
         entity_name: str,
         invariant_expr: str,
     ) -> SuspiciousState | None:
-        result = translate_spec_to_z3(spec)
-        entity_vars = result.entity_vars.get(entity_name)
-        if not entity_vars:
-            return None
-
-        from z3 import Not
-
-        solver = Solver()
-        solver.set("timeout", self.timeout_ms)
-
-        for f in result.invariant_formulas:
-            solver.add(f)
-
-        negation = None
-        for fname, var in entity_vars.items():
-            if fname in invariant_expr:
-                if ">=" in invariant_expr and "0" in invariant_expr:
-                    negation = var < 0
-                    break
-                if ">" in invariant_expr and "0" in invariant_expr:
-                    negation = var <= 0
-                    break
-
-        if negation is not None:
-            solver.add(negation)
-            if solver.check() == sat:
-                model = solver.model()
-                values = {str(v): str(model.eval(v)) for v in entity_vars.values()}
-                return SuspiciousState(
-                    description=f"Invariant violation: {invariant_expr}",
-                    entity_name=entity_name,
-                    variable_values=values,
-                    prevention_rule=invariant_expr,
-                )
-
-        return None
+        return CounterexampleSearch(spec, self.timeout_ms).invariant_counterexample(entity_name, invariant_expr)
+
+    def find_invariant_counterexamples(self, spec: dict[str, Any]) -> list[SuspiciousState]:
+        tasks = [
+            CheckTask(0, INVARIANT_PROBE, entity.get("name", ""), inv.get("expr", inv.get("expression", "")))
+            for entity in spec.get("entities", [])
+            for inv in entity.get("invariants", [])
+        ]
+        if self.parallel:
+            outcomes = run_checks([spec], tasks, self.timeout_ms, self.max_workers)
+            states = [o.payload for o in outcomes]
+        else:
+            search = CounterexampleSearch(spec, self.timeout_ms)
+            states = [search.invariant_counterexample(t.target, t.detail) for t in tasks]
+        return [s for s in states if s is not None]
+
+    def export_smtlib(self, spec: dict[str, Any], output_dir: str | Path) -> Path:
+        return export_probe_queries(spec, output_dir, self.timeout_ms)
+
+    def load_batch(self, manifest_path: str | Path, result_paths: list[str | Path]) -> list[SuspiciousState]:
+        manifest = read_manifest(manifest_path)
+        states = []
+        for entry, o in zip(manifest.queries, load_outcomes(manifest, read_results(result_paths))):
+            if o.status != "sat":
+                continue
+            if o.task.kind == SUSPICIOUS_PROBE:
+                states.append(SuspiciousState(variable_values=o.payload, **entry.payload))
+            else:
+                states.append(SuspiciousState(
+                    description=f"Invariant violation: {o.task.detail}",
+                    entity_name=o.task.target,
+                    variable_values=o.payload,
+                    prevention_rule=o.task.detail,
+                ))
+        return states
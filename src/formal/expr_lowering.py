@@ -0,0 +1,299 @@
+from collections.abc import Mapping, MutableMapping
+from typing import Any
+
+from z3 import (
+    And,
+    BoolRef,
+    BoolVal,
+    Const,
+    If,
+    IntSort,
+    IntVal,
+    Not,
+    Or,
+    RealVal,
+    Z3Exception,
+    is_arith,
+    is_bool,
+    is_int,
+)
+
+from ..dsl.expressions import (
+    Attribute,
+    Binary,
+    BoolLit,
+    BoolOp,
+    Compare,
+    DecimalLit,
+    Expr,
+    FieldRef,
+    IntLit,
+    Membership,
+    Name,
+    NullLit,
+    Old,
+    SetLit,
+    StringLit,
+    Unary,
+    parse_expr,
+)
+
+
+class UnsupportedExpression(ValueError):
+    pass
+
+
+class LoweringScope:
+
+    keyed = False
+    previous: "LoweringScope | None" = None
+
+    def __init__(
+        self,
+        names: Mapping[str, Any] | None = None,
+        entity_fields: Mapping[str, Mapping[str, Any]] | None = None,
+        free: MutableMapping[str, Any] | None = None,
+        strings: MutableMapping[str, int] | None = None,
+        allowed_free: set[str] | None = None,
+        scales: Mapping[str, int] | None = None,
+        enums: Mapping[str, Mapping[str, Any]] | None = None,
+    ) -> None:
+        self.names = names if names is not None else {}
+        self.entity_fields = entity_fields if entity_fields is not None else {}
+        self.free = free if free is not None else {}
+        self.strings = strings if strings is not None else {}
+        self.allowed_free = allowed_free
+        self.scales = scales
+        self.enums = enums if enums is not None else {}
+
+    def restricted(self, allowed_free: set[str]) -> "LoweringScope":
+        return LoweringScope(
+            self.names, self.entity_fields, self.free, self.strings, allowed_free, self.scales, self.enums
+        )
+
+    def resolve_name(self, name: str) -> Any | None:
+        return self.names.get(name)
+
+    def resolve_field(self, entity: str, field: str, key: Any = None) -> Any:
+        fields = self.entity_fields.get(entity)
+        if fields is None or field not in fields:
+            raise UnsupportedExpression(f"unknown field reference {entity}.{field}")
+        return fields[field]
+
+    def resolve_record(self, name: str, field: str) -> Any:
+        raise UnsupportedExpression(f"unsupported attribute {name}.{field}")
+
+    def free_constant(self, name: str, sort: Any | None) -> Any:
+        values = self.enums.get(str(sort)) if sort is not None else None
+        if values is not None:
+            if name not in values:
+                raise UnsupportedExpression(f"{name} is not a value of {sort}")
+            return values[name]
+        if self.allowed_free is not None and name not in self.allowed_free:
+            raise UnsupportedExpression(f"unknown name {name}")
+        var = self.free.get(name)
+        if var is None:
+            var = Const(name, sort if sort is not None else IntSort())
+            self.free[name] = var
+        return var
+
+    def null_constant(self, sort: Any | None) -> Any:
+        sort = sort if sort is not None else IntSort()
+        name = f"null_{sort}"
+        var = self.free.get(name)
+        if var is None:
+            var = Const(name, sort)
+            self.free[name] = var
+        return var
+
+    def string_value(self, value: str) -> Any:
+        code = self.strings.setdefault(value, len(self.strings))
+        return IntVal(code)
+
+
+class Z3Lowerer:
+
+    def __init__(self, scope: LoweringScope) -> None:
+        self.scope = scope
+        # Keyed by the nodes themselves: holding them keeps a released node's id from being reused under us.
+        self._cache: dict[tuple[Expr, Any], Any] = {}
+        self._scales: dict[Expr, int] = {}
+        self._old: Z3Lowerer | None = None
+
+    def lower_bool(self, expr: Expr | str) -> BoolRef:
+        if isinstance(expr, str):
+            expr = parse_expr(expr)
+        try:
+            value = self.lower(expr)
+        except Z3Exception as e:
+            raise UnsupportedExpression(str(e)) from e
+        if not is_bool(value):
+            raise UnsupportedExpression("expression is not a condition")
+        return value
+
+    def lower(self, expr: Expr, hint: Any = None) -> Any:
+        key = (expr, hint)
+        value = self._cache.get(key)
+        if value is None:
+            value = self._lower(expr, hint)
+            self._cache[key] = value
+        return value
+
+    def _is_self_typed(self, expr: Expr) -> bool:
+        if isinstance(expr, NullLit):
+            return False
+        if isinstance(expr, Name):
+            return self.scope.resolve_name(expr.id) is not None
+        return True
+
+    def _lower_pair(self, left: Expr, right: Expr) -> tuple[Any, Any]:
+        if self._is_self_typed(left) or not self._is_self_typed(right):
+            lhs = self.lower(left)
+            return lhs, self.lower(right, lhs.sort())
+        rhs = self.lower(right)
+        return self.lower(left, rhs.sort()), rhs
+
+    def _lower(self, expr: Expr, hint: Any) -> Any:
+        if isinstance(expr, IntLit):
+            return IntVal(expr.value)
+        if isinstance(expr, DecimalLit):
+            if self.scope.scales is None:
+                return RealVal(str(expr.value))
+            scale = max(-expr.value.as_tuple().exponent, 0)
+            self._scales[expr] = scale
+            return IntVal(int(expr.value.scaleb(scale)))
+        if isinstance(expr, BoolLit):
+            return BoolVal(expr.value)
+        if isinstance(expr, StringLit):
+            return self.scope.string_value(expr.value)
+        if isinstance(expr, NullLit):
+            return self.scope.null_constant(hint)
+        if isinstance(expr, Name):
+            var = self.scope.resolve_name(expr.id)
+            return self._scaled(expr, var) if var is not None else self.scope.free_constant(expr.id, hint)
+        if isinstance(expr, FieldRef):
+            key = self.lower(expr.key) if self.scope.keyed else None
+            return self._scaled(expr, self.scope.resolve_field(expr.entity, expr.field, key))
+        if isinstance(expr, Attribute) and isinstance(expr.base, Name):
+            return self._scaled(expr, self.scope.resolve_record(expr.base.id, expr.attr))
+        if isinstance(expr, Old):
+            if self.scope.previous is None:
+                raise UnsupportedExpression("OLD is only available in postconditions")
+            if self._old is None:
+                self._old = Z3Lowerer(self.scope.previous)
+            value = self._old.lower(expr.operand, hint)
+            self._scales[expr] = self._old._scale(expr.operand)
+            return value
+        if isinstance(expr, Unary):
+            if expr.op == "not":
+                return Not(self._as_bool(self.lower(expr.operand)))
+            value = -self._as_arith(self.lower(expr.operand, hint))
+            self._scales[expr] = self._scale(expr.operand)
+            return value
+        if isinstance(expr, Binary):
+            lhs, rhs = self._lower_pair(expr.left, expr.right)
+            lhs, rhs = self._as_arith(lhs), self._as_arith(rhs)
+            if self.scope.scales is not None:
+                return self._fixed_arith(expr, lhs, rhs)
+            return self._arith(expr.op, lhs, rhs)
+        if isinstance(expr, Compare):
+            lhs, rhs = self._lower_pair(expr.left, expr.right)
+            return self._compare(expr.op, *self._align(expr.left, lhs, expr.right, rhs))
+        if isinstance(expr, BoolOp):
+            operands = [self._as_bool(self.lower(o)) for o in expr.operands]
+            return And(*operands) if expr.op == "and" else Or(*operands)
+        if isinstance(expr, Membership):
+            if not isinstance(expr.container, SetLit):
+                raise UnsupportedExpression("membership in a named set")
+            value = self.lower(expr.value)
+            if not expr.container.items:
+                return BoolVal(expr.negated)
+            options = [
+                self._compare("==", *self._align(expr.value, value, item, self.lower(item, value.sort())))
+                for item in expr.container.items
+            ]
+            member = Or(*options)
+            return Not(member) if expr.negated else member
+        raise UnsupportedExpression(f"unsupported construct {type(expr).__name__}")
+
+    def _scaled(self, expr: Expr, var: Any) -> Any:
+        if self.scope.scales is not None:
+            self._scales[expr] = self.scope.scales.get(var.decl().name(), 0)
+        return var
+
+    def _scale(self, expr: Expr) -> int:
+        return self._scales.get(expr, 0)
+
+    def _align(self, left: Expr, lhs: Any, right: Expr, rhs: Any) -> tuple[Any, Any]:
+        if self.scope.scales is None or not (is_arith(lhs) and is_arith(rhs)):
+            return lhs, rhs
+        ls, rs = self._scale(left), self._scale(right)
+        return _shift(lhs, max(rs - ls, 0)), _shift(rhs, max(ls - rs, 0))
+
+    def _fixed_arith(self, expr: Binary, lhs: Any, rhs: Any) -> Any:
+        ls, rs = self._scale(expr.left), self._scale(expr.right)
+        if expr.op in ("+", "-"):
+            lhs, rhs = self._align(expr.left, lhs, expr.right, rhs)
+            self._scales[expr] = max(ls, rs)
+            return self._arith(expr.op, lhs, rhs)
+        if expr.op == "*":
+            self._scales[expr] = ls + rs
+            return lhs * rhs
+        if expr.op == "/" and (ls or rs):
+            scale = max(ls, rs)
+            self._scales[expr] = scale
+            num = _shift(lhs, scale + rs - ls)
+            magnitude = (2 * _abs(num) + _abs(rhs)) / (2 * _abs(rhs))
+            return If((num >= 0) == (rhs >= 0), magnitude, -magnitude)
+        if ls or rs:
+            raise UnsupportedExpression("modulo requires integers")
+        return self._arith(expr.op, lhs, rhs)
+
+    def _as_bool(self, value: Any) -> Any:
+        if not is_bool(value):
+            raise UnsupportedExpression("expected a condition")
+        return value
+
+    def _as_arith(self, value: Any) -> Any:
+        if not is_arith(value):
+            raise UnsupportedExpression(f"expected a number, got {value.sort()}")
+        return value
+
+    def _arith(self, op: str, lhs: Any, rhs: Any) -> Any:
+        if op == "+":
+            return lhs + rhs
+        if op == "-":
+            return lhs - rhs
+        if op == "*":
+            return lhs * rhs
+        if op == "/":
+            return lhs / rhs
+        if op == "%":
+            if not (is_int(lhs) and is_int(rhs)):
+                raise UnsupportedExpression("modulo requires integers")
+            return lhs % rhs
+        raise UnsupportedExpression(f"unsupported operator {op}")
+
+    def _compare(self, op: str, lhs: Any, rhs: Any) -> Any:
+        if op in ("==", "!="):
+            if lhs.sort() != rhs.sort() and not (is_arith(lhs) and is_arith(rhs)):
+                raise UnsupportedExpression(f"cannot compare {lhs.sort()} with {rhs.sort()}")
+            return lhs == rhs if op == "==" else lhs != rhs
+        lhs, rhs = self._as_arith(lhs), self._as_arith(rhs)
+        if op == ">=":
+            return lhs >= rhs
+        if op == "<=":
+            return lhs <= rhs
+        if op == ">":
+            return lhs > rhs
+        if op == "<":
+            return lhs < rhs
+        raise UnsupportedExpression(f"unsupported operator {op}")
+
+
+def _shift(value: Any, digits: int) -> Any:
+    return value * 10**digits if digits else value
+
+
+def _abs(value: Any) -> Any:
+    return If(value >= 0, value, -value)
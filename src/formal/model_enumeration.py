@@ -0,0 +1,169 @@
+from decimal import Decimal
+from typing import Any, Iterator
+
+from z3 import (
+    Bool,
+    Implies,
+    IsInt,
+    Or,
+    RealVal,
+    is_false,
+    is_int_value,
+    is_rational_value,
+    is_true,
+    sat,
+)
+
+from ..dsl.expressions import Expr
+from ..dsl.type_system import is_numeric_type
+from .expr_lowering import LoweringScope, Z3Lowerer
+from .smt_utils import create_solver
+from .z3_translator import DEFAULT_DECIMAL_SCALE, numeric_bounds, translate_spec_to_z3
+
+
+class ModelEnumerator:
+
+    def __init__(self, spec: dict[str, Any], timeout_ms: int = 5000) -> None:
+        self.spec = spec
+        self.translation = translate_spec_to_z3(spec)
+        self.solver = create_solver(timeout_ms)
+        # One tracker per formula index: invariants may share a label, and relaxing a label relaxes all of them.
+        self._trackers: list[Any] = []
+        for i, f in enumerate(self.translation.invariant_formulas):
+            tracker = Bool(f"!inv{i}")
+            self.solver.add(Implies(tracker, f))
+            self._trackers.append(tracker)
+        self._fields: dict[str, dict[str, dict[str, Any]]] = {}
+        for entity in spec.get("entities", []):
+            self._fields[entity.get("name", "")] = {f.get("name", ""): f for f in entity.get("fields", [])}
+        for service in spec.get("services", []):
+            self._fields[service.get("name", "")] = {i.get("name", ""): i for i in service.get("inputs", [])}
+        self._open = False
+        self.last_status = "unknown"
+
+    def targets(self) -> list[str]:
+        return list(self._fields)
+
+    def models(
+        self,
+        target: str,
+        limit: int = 100,
+        project: list[str] | None = None,
+        where: list[str | Expr] | None = None,
+        relax: list[str] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        scope, variables, conditions = self._target(target)
+        projected = self._projection(target, variables, project)
+        lowerer = Z3Lowerer(scope)
+        conditions = conditions + [lowerer.lower_bool(w) for w in where or []]
+        domain, enums = self._domain(projected)
+        relaxed = set(relax or [])
+        labels = self.translation.invariant_labels
+        unknown = relaxed - set(labels)
+        if unknown:
+            raise ValueError(f"Unknown invariants: {', '.join(sorted(unknown))}")
+        assumptions = [t for label, t in zip(labels, self._trackers) if label not in relaxed]
+        return self._enumerate(projected, conditions + domain, enums, assumptions, limit)
+
+    def _enumerate(
+        self,
+        projected: list[tuple[str, Any, dict[str, Any]]],
+        constraints: list[Any],
+        enums: dict[str, dict[str, Any]],
+        assumptions: list[Any],
+        limit: int,
+    ) -> Iterator[dict[str, Any]]:
+        if self._open:
+            raise RuntimeError("another enumeration is still open on this solver")
+        self._open = True
+        self.solver.push()
+        try:
+            self.solver.add(*constraints)
+            for _ in range(limit):
+                status = self.solver.check(*assumptions)
+                self.last_status = str(status)
+                if status != sat:
+                    return
+                model = self.solver.model()
+                values = [model.eval(var, model_completion=True) for _, var, _ in projected]
+                row = {}
+                blocking = []
+                for (name, var, field), value in zip(projected, values):
+                    if name in enums:
+                        label = self._enum_label(enums[name], value, model)
+                        row[name] = label
+                        blocking.append(var != enums[name][label])
+                    else:
+                        row[name] = self._python_value(value, field)
+                        blocking.append(var != value)
+                yield row
+                if not blocking:
+                    return
+                self.solver.add(Or(blocking))
+        finally:
+            self.solver.pop()
+            self._open = False
+
+    def _target(self, target: str) -> tuple[LoweringScope, dict[str, Any], list[Any]]:
+        t = self.translation
+        if target in t.entity_scopes:
+            return t.entity_scopes[target], t.entity_vars[target], []
+        if target in t.service_scopes:
+            return t.service_scopes[target], t.service_vars[target], list(t.precondition_formulas.get(target, []))
+        raise ValueError(f"Unknown entity or service: {target}")
+
+    def _projection(
+        self, target: str, variables: dict[str, Any], project: list[str] | None
+    ) -> list[tuple[str, Any, dict[str, Any]]]:
+        projected = []
+        for name in project if project is not None else list(variables):
+            if name in variables:
+                projected.append((name, variables[name], self._fields[target].get(name, {})))
+                continue
+            entity, _, fname = name.partition(".")
+            var = self.translation.entity_vars.get(entity, {}).get(fname)
+            if var is None:
+                raise ValueError(f"Unknown field {name} for {target}")
+            projected.append((name, var, self._fields[entity].get(fname, {})))
+        return projected
+
+    def _domain(
+        self, projected: list[tuple[str, Any, dict[str, Any]]]
+    ) -> tuple[list[Any], dict[str, dict[str, Any]]]:
+        constraints = []
+        enums: dict[str, dict[str, Any]] = {}
+        for name, var, field in projected:
+            ftype = field.get("type", "String")
+            values = self.translation.enums.get(str(var.sort()))
+            if values is not None:
+                enums[name] = values
+            elif is_numeric_type(ftype):
+                bounds = numeric_bounds(field)
+                if bounds is not None:
+                    constraints += [var >= RealVal(str(bounds[0])), var <= RealVal(str(bounds[1]))]
+                if ftype.lower() == "decimal":
+                    scale = field.get("scale") if field.get("scale") is not None else DEFAULT_DECIMAL_SCALE
+                    constraints.append(IsInt(var * 10**scale))
+        return constraints, enums
+
+    def _enum_label(self, constants: dict[str, Any], value: Any, model: Any) -> str:
+        for label, constant in constants.items():
+            if model.eval(constant, model_completion=True).eq(value):
+                return label
+        raise ValueError(f"Model value {value} is outside the enum domain")
+
+    def _python_value(self, value: Any, field: dict[str, Any]) -> Any:
+        ftype = field.get("type", "String").lower()
+        if is_int_value(value):
+            number = value.as_long()
+            if ftype in ("string", "str"):
+                strings = {code: text for text, code in self.translation.strings.items()}
+                return strings.get(number, f"s{number}")
+            if ftype in ("boolean", "bool"):
+                return number != 0
+            return number
+        if is_rational_value(value):
+            return Decimal(value.numerator_as_long()) / Decimal(value.denominator_as_long())
+        if is_true(value) or is_false(value):
+            return is_true(value)
+        return str(value)
@@ -0,0 +1,242 @@
+import multiprocessing
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+CONSISTENCY = "consistency"
+SERVICE = "service"
+COMPONENT = "component"
+INVARIANT_PROBE = "invariant_probe"
+SUSPICIOUS_PROBE = "suspicious_probe"
+
+SPAWN_GRACE_S = 10.0
+
+
+@dataclass(frozen=True)
+class CheckTask:
+    spec_index: int
+    kind: str
+    target: str = ""
+    detail: str = ""
+    components: tuple[int, ...] | None = None
+
+
+@dataclass
+class CheckStat:
+    name: str
+    status: str
+    solve_time: float = 0.0
+    attempts: int = 0
+    timeout_ms: int = 0
+    cache_hit: bool | None = None
+    statistics: dict[str, Any] = field(default_factory=dict)
+    reason: str = ""
+
+
+@dataclass
+class CheckOutcome:
+    task: CheckTask
+    status: str
+    error: str | None = None
+    payload: Any = None
+    cache_hit: bool | None = None
+    core: list[str] = field(default_factory=list)
+    stat: CheckStat | None = None
+
+
+def check_name(task: CheckTask) -> str:
+    if task.kind == CONSISTENCY:
+        return "consistency"
+    if task.kind == COMPONENT:
+        return f"component:{task.target}"
+    if task.kind in (INVARIANT_PROBE, SUSPICIOUS_PROBE):
+        return f"probe:{task.target}:{task.detail}"
+    return f"service:{task.target}"
+
+
+def session_outcome(session: Any, task: CheckTask, timeout_ms: int | None = None) -> CheckOutcome:
+    payload = None
+    if task.kind == CONSISTENCY:
+        status = session.check_consistency(timeout_ms)
+        payload = session.translation.untranslated
+    elif task.kind == COMPONENT:
+        status = session.check_component(int(task.target), timeout_ms)
+        payload = session.translation.untranslated
+    elif task.kind == SERVICE:
+        if task.components is not None:
+            session.assume_satisfiable(task.components)
+        status = session.check_service(task.target, include_preconditions=True, timeout_ms=timeout_ms)
+    else:
+        raise ValueError(f"Unknown check kind: {task.kind}")
+    verdict = session.last_verdict
+    stat = CheckStat(
+        name=check_name(task),
+        status=str(status),
+        solve_time=verdict.solve_time if verdict is not None else 0.0,
+        attempts=0 if session.last_cache_hit else 1,
+        timeout_ms=timeout_ms if timeout_ms is not None else session.timeout_ms,
+        cache_hit=session.last_cache_hit,
+        statistics=dict(session.last_statistics),
+        reason=verdict.reason if verdict is not None else "",
+    )
+    return CheckOutcome(
+        task,
+        str(status),
+        payload=payload,
+        cache_hit=session.last_cache_hit,
+        core=session.last_core(),
+        stat=stat,
+    )
+
+
+def join_components(task: CheckTask, parts: list[CheckOutcome]) -> CheckOutcome:
+    # Same verdict as VerificationSession.check_consistency: the first unsat component decides.
+    taken = []
+    for part in parts:
+        taken.append(part)
+        if part.status in ("unsat", "error"):
+            break
+    last = taken[-1]
+    if last.status in ("unsat", "error"):
+        status = last.status
+    else:
+        status = "unknown" if any(p.status == "unknown" for p in taken) else "sat"
+    lookups = [p.cache_hit for p in taken if p.cache_hit is not None]
+    cache_hit = all(lookups) if lookups else None
+    stats = [p.stat for p in taken if p.stat is not None]
+    stat = CheckStat(
+        name=check_name(task),
+        status=status,
+        solve_time=sum(s.solve_time for s in stats),
+        attempts=sum(s.attempts for s in stats),
+        timeout_ms=max((s.timeout_ms for s in stats), default=0),
+        cache_hit=cache_hit,
+        reason=next((s.reason for s in stats if s.status == "unknown"), ""),
+    )
+    return CheckOutcome(
+        task,
+        status,
+        error=last.error,
+        payload=next((p.payload for p in parts if p.payload is not None), None),
+        cache_hit=cache_hit,
+        core=list(last.core) if status == "unsat" else [],
+        stat=stat,
+    )
+
+
+def join_outcomes(outcomes: list[CheckOutcome]) -> list[CheckOutcome]:
+    parts: dict[int, list[CheckOutcome]] = {}
+    for outcome in outcomes:
+        if outcome.task.kind == COMPONENT:
+            parts.setdefault(outcome.task.spec_index, []).append(outcome)
+    joined = []
+    for outcome in outcomes:
+        if outcome.task.kind != COMPONENT:
+            joined.append(outcome)
+        elif outcome is parts[outcome.task.spec_index][0]:
+            task = CheckTask(outcome.task.spec_index, CONSISTENCY)
+            joined.append(join_components(task, parts[outcome.task.spec_index]))
+    return joined
+
+
+_worker_specs: list[dict[str, Any]] = []
+_worker_timeout_ms: int = 5000
+_worker_cache: Any = None
+_worker_session_options: dict[str, Any] = {}
+_worker_sessions: dict[int, Any] = {}
+_worker_searches: dict[int, Any] = {}
+
+
+def _init_worker(
+    specs: list[dict[str, Any]],
+    timeout_ms: int,
+    cache: Any = None,
+    session_options: dict[str, Any] | None = None,
+) -> None:
+    global _worker_specs, _worker_timeout_ms, _worker_cache, _worker_session_options
+    _worker_specs = specs
+    _worker_timeout_ms = timeout_ms
+    _worker_cache = cache
+    _worker_session_options = session_options or {}
+    _worker_sessions.clear()
+    _worker_searches.clear()
+
+
+def _worker_session(spec_index: int) -> Any:
+    from .session import VerificationSession
+
+    session = _worker_sessions.get(spec_index)
+    if session is None:
+        session = VerificationSession(
+            _worker_specs[spec_index], _worker_timeout_ms, _worker_cache, **_worker_session_options
+        )
+        _worker_sessions[spec_index] = session
+    return session
+
+
+def run_task(task: CheckTask) -> CheckOutcome:
+    try:
+        if task.kind == INVARIANT_PROBE:
+            from .counterexample_finder import CounterexampleSearch
+
+            search = _worker_searches.get(task.spec_index)
+            if search is None:
+                search = CounterexampleSearch(_worker_specs[task.spec_index], _worker_timeout_ms)
+                _worker_searches[task.spec_index] = search
+            state = search.invariant_counterexample(task.target, task.detail)
+            return CheckOutcome(task, "sat" if state is not None else "unsat", payload=state)
+
+        return session_outcome(_worker_session(task.spec_index), task)
+    except Exception as e:
+        return CheckOutcome(task, "error", error=str(e))
+
+
+def _collect(
+    pool: Any, tasks: list[CheckTask], workers: int, timeout_ms: int
+) -> tuple[list[CheckOutcome], bool]:
+    rounds = -(-len(tasks) // workers)
+    deadline = time.monotonic() + SPAWN_GRACE_S + rounds * timeout_ms / 1000.0
+    pending = [pool.apply_async(run_task, (t,)) for t in tasks]
+    outcomes = []
+    timed_out = False
+    for task, result in zip(tasks, pending):
+        try:
+            outcomes.append(result.get(timeout=max(0.0, deadline - time.monotonic())))
+        except multiprocessing.TimeoutError:
+            timed_out = True
+            outcomes.append(CheckOutcome(task, "unknown"))
+    return outcomes, timed_out
+
+
+def run_checks(
+    specs: list[dict[str, Any]],
+    tasks: list[CheckTask],
+    timeout_ms: int,
+    max_workers: int | None = None,
+    cache: Any = None,
+    session_options: dict[str, Any] | None = None,
+    then: Callable[[list[CheckOutcome]], list[CheckTask]] | None = None,
+) -> list[CheckOutcome]:
+    if not tasks:
+        return []
+    workers = max(1, min(max_workers or multiprocessing.cpu_count(), len(tasks)))
+    context = multiprocessing.get_context("spawn")
+
+    def start() -> Any:
+        return context.Pool(workers, _init_worker, (specs, timeout_ms, cache, session_options))
+
+    pool = start()
+    try:
+        outcomes, timed_out = _collect(pool, tasks, workers, timeout_ms)
+        follow_up = then(outcomes) if then is not None else []
+        if follow_up:
+            if timed_out:
+                # Workers still solving a timed-out task are killed; the follow-up round gets fresh ones.
+                pool.terminate()
+                pool.join()
+                pool = start()
+            outcomes += _collect(pool, follow_up, workers, timeout_ms)[0]
+    finally:
+        pool.terminate()
+        pool.join()
+    return outcomes
@@ -0,0 +1,153 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from z3 import Bool, Implies, Not, Solver, unsat
+
+from ..dsl.expressions import ExpressionSyntaxError, FieldRef, Name, parse_expr, walk
+from .smt_utils import create_solver
+from .z3_translator import Z3TranslationResult, translate_spec_to_z3
+
+
+@dataclass
+class RedundantInvariant:
+    entity: str
+    name: str
+    expr: str
+    implied_by: list[str] = field(default_factory=list)
+
+
+@dataclass
+class RedundantPrecondition:
+    service: str
+    label: str
+    expr: str
+    implied_by: list[str] = field(default_factory=list)
+
+
+def _prune(
+    solver: Solver,
+    candidates: list[tuple[str, Any]],
+    keep: list[str],
+    fixed: list[str] | None = None,
+    domains: list[str] | None = None,
+) -> dict[str, list[str]]:
+    # Domain facts are assumed but never justify dropping a check on their own.
+    dropped: dict[str, list[str]] = {}
+    for tracker, formula in reversed(candidates):
+        rest = [Bool(t) for t in (domains or []) + (fixed or []) + keep if t != tracker]
+        if not rest:
+            continue
+        solver.push()
+        solver.add(Not(formula))
+        if solver.check(*rest) == unsat:
+            core = [str(c) for c in solver.unsat_core() if str(c) not in (domains or [])]
+            if core:
+                dropped[tracker] = sorted(core, key=lambda c: (c[:4], int(c[4:])))
+                if tracker in keep:
+                    keep.remove(tracker)
+        solver.pop()
+    return dropped
+
+
+def _entity_solver(
+    t: Z3TranslationResult, indices: list[int], timeout_ms: int, service_name: str | None = None
+) -> Solver:
+    members = set(indices)
+    components = [c for c, component in enumerate(t.components) if members & set(component.formulas)]
+    solver = create_solver(timeout_ms, t.query_logic(components, service_name))
+    for i in indices:
+        solver.add(Implies(Bool(f"!inv{i}"), t.invariant_formulas[i]))
+    return solver
+
+
+def find_redundant_invariants(
+    spec: dict[str, Any],
+    timeout_ms: int = 5000,
+    eligible: set[str] | None = None,
+) -> dict[str, list[RedundantInvariant]]:
+    t = translate_spec_to_z3(spec, open_enums=True)
+    by_entity: dict[str, list[int]] = {}
+    for i, label in enumerate(t.invariant_labels):
+        by_entity.setdefault(label.partition(".")[0], []).append(i)
+
+    report: dict[str, list[RedundantInvariant]] = {}
+    for entity in spec.get("entities", []):
+        name = entity.get("name", "")
+        indices = by_entity.get(name, [])
+        if len(indices) < 2:
+            continue
+        solver = _entity_solver(t, indices, timeout_ms)
+        candidates = [i for i in indices if t.invariant_labels[i] not in t.domain_labels]
+        domains = [f"!inv{i}" for i in indices if t.invariant_labels[i] in t.domain_labels]
+        keep = [f"!inv{i}" for i in candidates if eligible is None or t.invariant_labels[i] in eligible]
+        dropped = _prune(solver, [(f"!inv{i}", t.invariant_formulas[i]) for i in candidates], keep, domains=domains)
+        redundant = []
+        for i in indices:
+            core = dropped.get(f"!inv{i}")
+            if core is not None:
+                label = t.invariant_labels[i]
+                redundant.append(RedundantInvariant(
+                    name, label.partition(".")[2], t.sources[label], [t.invariant_labels[int(c[4:])] for c in core]
+                ))
+        if redundant:
+            report[name] = redundant
+    return report
+
+
+def _aliased_entities(preconditions: list[str]) -> set[str]:
+    keys: dict[str, set[Any]] = {}
+    for pre in preconditions:
+        try:
+            tree = parse_expr(pre)
+        except ExpressionSyntaxError:
+            continue
+        for node in walk(tree):
+            if isinstance(node, FieldRef):
+                keys.setdefault(node.entity, set()).add(node.key.id if isinstance(node.key, Name) else id(node.key))
+    return {entity for entity, k in keys.items() if len(k) > 1}
+
+
+def find_redundant_preconditions(
+    spec: dict[str, Any],
+    timeout_ms: int = 5000,
+    eligible: set[str] | None = None,
+) -> dict[str, list[RedundantPrecondition]]:
+    t = translate_spec_to_z3(spec, open_enums=True)
+    invariants = [f"!inv{i}" for i, label in enumerate(t.invariant_labels) if label not in t.domain_labels]
+    domains = [f"!inv{i}" for i, label in enumerate(t.invariant_labels) if label in t.domain_labels]
+    report: dict[str, list[RedundantPrecondition]] = {}
+    for service in spec.get("services", []):
+        sname = service.get("name", "")
+        formulas = t.precondition_formulas.get(sname, [])
+        labels = t.precondition_labels.get(sname, [])
+        if not formulas:
+            continue
+        aliased = _aliased_entities([t.sources[label] for label in labels])
+        solver = _entity_solver(t, list(range(len(t.invariant_formulas))), timeout_ms, sname)
+        for k, f in enumerate(formulas):
+            solver.add(Implies(Bool(f"!pre{k}"), f))
+
+        candidates = []
+        keep = []
+        for k, (label, f) in enumerate(zip(labels, formulas)):
+            source = t.sources[label]
+            if label in t.domain_labels or _aliased_entities([source]):
+                continue
+            candidates.append((f"!pre{k}", f))
+            touched = {n.entity for n in walk(parse_expr(source)) if isinstance(n, FieldRef)}
+            if (eligible is None or label in eligible) and not aliased & touched:
+                keep.append(f"!pre{k}")
+        dropped = _prune(solver, candidates, keep, invariants, domains)
+
+        def describe(tracker: str) -> str:
+            index = int(tracker[4:])
+            return labels[index] if tracker.startswith("!pre") else t.invariant_labels[index]
+
+        redundant = [
+            RedundantPrecondition(sname, label, t.sources[label], [describe(c) for c in dropped[f"!pre{k}"]])
+            for k, label in enumerate(labels)
+            if f"!pre{k}" in dropped
+        ]
+        if redundant:
+            report[sname] = redundant
+    return report
@@ -0,0 +1,76 @@
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from .parallel import CheckOutcome, CheckStat, CheckTask, check_name
+from .smt_utils import RESOURCE_OUT
+
+
+@dataclass
+class ScheduledCheck:
+    task: CheckTask
+    run: Callable[[int], CheckOutcome]
+    cost: int = 0
+
+
+class VerificationScheduler:
+
+    def __init__(
+        self,
+        budget_ms: int,
+        initial_slice_ms: int = 50,
+        growth: int = 4,
+        max_slice_ms: int | None = None,
+    ) -> None:
+        self.budget_ms = budget_ms
+        self.initial_slice_ms = initial_slice_ms
+        self.growth = growth
+        self.max_slice_ms = max_slice_ms
+
+    def run(
+        self,
+        checks: list[ScheduledCheck],
+        should_skip: Callable[[ScheduledCheck, dict[CheckTask, CheckOutcome]], bool] | None = None,
+    ) -> list[CheckOutcome]:
+        deadline = time.monotonic() + self.budget_ms / 1000.0
+        finished: dict[CheckTask, CheckOutcome] = {}
+        skipped: set[CheckTask] = set()
+        pending = sorted(checks, key=lambda c: c.cost)
+        slice_ms = self.initial_slice_ms
+        exhausted = False
+
+        while pending and not exhausted:
+            retry: list[ScheduledCheck] = []
+            for check in pending:
+                if should_skip is not None and should_skip(check, finished):
+                    skipped.add(check.task)
+                    continue
+                remaining_ms = int((deadline - time.monotonic()) * 1000)
+                if remaining_ms <= 0:
+                    exhausted = True
+                    break
+                timeout_ms = min(slice_ms, remaining_ms)
+                outcome = check.run(timeout_ms)
+                # Only a check that ran out of time is worth a larger slice; other unknowns will not change.
+                timed_out = outcome.stat is not None and outcome.stat.reason in RESOURCE_OUT
+                previous = finished.get(check.task)
+                if outcome.stat is not None and previous is not None and previous.stat is not None:
+                    outcome.stat.attempts += previous.stat.attempts
+                    outcome.stat.solve_time += previous.stat.solve_time
+                finished[check.task] = outcome
+                if outcome.status == "unknown" and timed_out:
+                    retry.append(check)
+            pending = retry
+            slice_ms *= self.growth
+            if self.max_slice_ms is not None:
+                slice_ms = min(slice_ms, self.max_slice_ms)
+
+        outcomes = []
+        for check in checks:
+            if check.task in skipped:
+                continue
+            outcome = finished.get(check.task)
+            if outcome is None:
+                outcome = CheckOutcome(check.task, "unknown", stat=CheckStat(check_name(check.task), "unknown"))
+            outcomes.append(outcome)
+        return outcomes
@@ -0,0 +1,241 @@
+import time
+from dataclasses import replace
+from typing import Any
+
+from z3 import Bool, CheckSatResult, Implies, Solver, sat, unknown, unsat
+
+from .smt_utils import INTERRUPTED, create_solver, solver_statistics
+from .verdict_cache import Verdict, VerdictCache, canonical_digest, canonical_key, formula_id, timed_check
+from .z3_translator import Z3TranslationResult, translate_spec_to_z3
+
+_STATUS = {"sat": sat, "unsat": unsat, "unknown": unknown}
+
+
+class VerificationSession:
+
+    def __init__(
+        self,
+        spec: dict[str, Any],
+        timeout_ms: int = 5000,
+        cache: VerdictCache | None = None,
+        minimize_cores: bool = False,
+        core_budget_ms: int = 1000,
+        decimal_encoding: str = "real",
+    ) -> None:
+        self.spec = spec
+        self.timeout_ms = timeout_ms
+        self.cache = cache
+        self.minimize_cores = minimize_cores
+        self.core_budget_ms = core_budget_ms
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_verdict: Verdict | None = None
+        self.last_cache_hit: bool | None = None
+        self.last_statistics: dict[str, Any] = {}
+        self.translation: Z3TranslationResult = translate_spec_to_z3(spec, decimal_encoding)
+        self._tracker_labels: dict[str, str] = {}
+        self._invariant_trackers = self._track(self.translation.invariant_labels, "!inv")
+        self._component_trackers = [
+            [self._invariant_trackers[i] for i in component.formulas]
+            for component in self.translation.components
+        ]
+        self._solvers: dict[str, Solver] = {}
+        self._asserted: dict[str, set[int]] = {}
+        self._component_digests = (
+            [canonical_digest(self.translation.component_formulas(i)) for i in range(len(self._component_trackers))]
+            if cache is not None
+            else []
+        )
+        self._component_results: dict[int, tuple[CheckSatResult, Verdict]] = {}
+        self._consistent = False
+
+    def _track(self, labels: list[str], prefix: str) -> list[Any]:
+        trackers = []
+        for i, label in enumerate(labels):
+            tracker = Bool(f"{prefix}{i}")
+            self._tracker_labels[str(tracker)] = label
+            trackers.append(tracker)
+        return trackers
+
+    def solver_for(self, logic: str) -> Solver:
+        solver = self._solvers.get(logic)
+        if solver is None:
+            solver = create_solver(self.timeout_ms, logic)
+            solver.set("core.minimize", True)
+            self._solvers[logic] = solver
+        return solver
+
+    def _assert_components(self, logic: str, solver: Solver, components: list[int]) -> None:
+        # Tracked invariants go on the warm solver once, outside any scope; checks only pick them via assumptions.
+        asserted = self._asserted.setdefault(logic, set())
+        for c in components:
+            if c in asserted:
+                continue
+            for i in self.translation.components[c].formulas:
+                solver.add(Implies(self._invariant_trackers[i], self.translation.invariant_formulas[i]))
+            asserted.add(c)
+
+    def service_names(self) -> list[str]:
+        return list(self.translation.precondition_formulas)
+
+    def describe(self, label: str) -> str:
+        expr = self.translation.sources.get(label)
+        return f"{label}: {expr}" if expr is not None else label
+
+    def check_consistency(self, timeout_ms: int | None = None) -> CheckSatResult:
+        timeout_ms = timeout_ms if timeout_ms is not None else self.timeout_ms
+        self.last_statistics = {}
+        verdicts = []
+        hits = []
+        for i in range(len(self._component_trackers)):
+            status, verdict, hit = self._check_component(i, timeout_ms)
+            hits.append(hit)
+            if status == unsat:
+                return self._finish(status, verdict, hits)
+            verdicts.append(verdict)
+        status = unknown if any(v.status == "unknown" for v in verdicts) else sat
+        self._consistent = status == sat
+        merged = Verdict(
+            status=str(status),
+            model=dict(sorted((k, v) for verdict in verdicts for k, v in verdict.model.items())),
+            solve_time=sum(v.solve_time for v in verdicts),
+            reason=next((v.reason for v in verdicts if v.status == "unknown"), ""),
+        )
+        return self._finish(status, merged, hits)
+
+    def assume_satisfiable(self, components: tuple[int, ...]) -> None:
+        for c in components:
+            if c < len(self._component_trackers):
+                self._component_results.setdefault(c, (sat, Verdict(status="sat")))
+        known = [self._component_results.get(c) for c in range(len(self._component_trackers))]
+        self._consistent = all(k is not None and k[0] == sat for k in known)
+
+    def check_component(self, index: int, timeout_ms: int | None = None) -> CheckSatResult:
+        timeout_ms = timeout_ms if timeout_ms is not None else self.timeout_ms
+        self.last_statistics = {}
+        status, verdict, hit = self._check_component(index, timeout_ms)
+        return self._finish(status, verdict, [hit])
+
+    def check_service(
+        self, service_name: str, include_preconditions: bool = True, timeout_ms: int | None = None
+    ) -> CheckSatResult:
+        if not include_preconditions:
+            return self.check_consistency(timeout_ms)
+        timeout_ms = timeout_ms if timeout_ms is not None else self.timeout_ms
+        components = self.translation.precondition_components.get(service_name, [])
+        status, verdict, hit = self._check(
+            self.translation.precondition_formulas.get(service_name, []),
+            self.translation.precondition_labels.get(service_name, []),
+            components,
+            timeout_ms,
+            self.translation.query_logic(components, service_name),
+        )
+        if status == sat and not self._consistent:
+            touched = set(components)
+            for i in range(len(self._component_trackers)):
+                if i in touched:
+                    continue
+                other_status, other_verdict, _ = self._check_component(i, timeout_ms)
+                if other_status == unsat:
+                    status, verdict = other_status, other_verdict
+                    break
+                if other_status == unknown:
+                    status = unknown
+                    verdict = Verdict(status="unknown", solve_time=verdict.solve_time, reason=other_verdict.reason)
+        return self._finish(status, verdict, [hit])
+
+    def last_core(self) -> list[str]:
+        if self.last_verdict is None:
+            return []
+        return list(self.last_verdict.core)
+
+    def _finish(self, status: CheckSatResult, verdict: Verdict, hits: list[bool | None]) -> CheckSatResult:
+        lookups = [h for h in hits if h is not None]
+        self.last_cache_hit = all(lookups) if lookups else None
+        if self.last_cache_hit is True:
+            self.cache_hits += 1
+        elif self.last_cache_hit is False:
+            self.cache_misses += 1
+        self.last_verdict = verdict
+        return status
+
+    def _check_component(self, index: int, timeout_ms: int) -> tuple[CheckSatResult, Verdict, bool | None]:
+        known = self._component_results.get(index)
+        if known is not None:
+            return known[0], known[1], None
+        status, verdict, hit = self._check([], [], [index], timeout_ms, self.translation.query_logic([index]))
+        if status != unknown:
+            self._component_results[index] = (status, verdict)
+        return status, verdict, hit
+
+    def _check(
+        self, extra: list[Any], extra_labels: list[str], components: list[int], timeout_ms: int, logic: str
+    ) -> tuple[CheckSatResult, Verdict, bool | None]:
+        self.last_statistics = {}
+        pre_trackers = self._track(extra_labels, "!pre")
+        tracked = [
+            (str(t), self.translation.invariant_formulas[i])
+            for c in components
+            for i, t in zip(self.translation.components[c].formulas, self._component_trackers[c])
+        ] + [(str(t), f) for t, f in zip(pre_trackers, extra)]
+        key = None
+        if self.cache is not None:
+            base = "".join(self._component_digests[i] for i in components)
+            key = canonical_key(extra, timeout_ms, base)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return _STATUS.get(cached.status, unknown), self._described(cached, tracked), True
+
+        solver = self.solver_for(logic)
+        self._assert_components(logic, solver, components)
+        solver.push()
+        if timeout_ms != self.timeout_ms:
+            solver.set("timeout", timeout_ms)
+        try:
+            for tracker, f in zip(pre_trackers, extra):
+                solver.add(Implies(tracker, f))
+            assumptions = [t for i in components for t in self._component_trackers[i]] + pre_trackers
+            verdict, status = timed_check(solver, assumptions, keep_model=self.cache is not None)
+            self.last_statistics = solver_statistics(solver)
+            if verdict.core and self.minimize_cores:
+                verdict.core = self._minimize(solver, verdict.core)
+        finally:
+            if timeout_ms != self.timeout_ms:
+                solver.set("timeout", self.timeout_ms)
+            solver.pop()
+
+        # The cache key covers formulas only, so cores are stored by formula and named on every read.
+        ids = dict(tracked) if verdict.core else {}
+        verdict.core = [formula_id(ids[t]) for t in verdict.core if t in ids]
+        if key is not None and not (status == unknown and solver.reason_unknown() in INTERRUPTED):
+            self.cache.put(key, verdict)
+        return status, self._described(verdict, tracked), None if key is None else False
+
+    def _described(self, verdict: Verdict, tracked: list[tuple[str, Any]]) -> Verdict:
+        if not verdict.core:
+            return verdict
+        names: dict[str, str] = {}
+        for tracker, f in tracked:
+            names.setdefault(formula_id(f), tracker)
+        core = sorted((names[c] for c in verdict.core if c in names), key=lambda t: (t[:4], int(t[4:])))
+        return replace(verdict, core=[self.describe(self._tracker_labels[t]) for t in core])
+
+    def _minimize(self, solver: Solver, core: list[str]) -> list[str]:
+        deadline = time.monotonic() + self.core_budget_ms / 1000.0
+        current = list(core)
+        i = 0
+        try:
+            while i < len(current):
+                remaining_ms = int((deadline - time.monotonic()) * 1000)
+                if remaining_ms <= 0:
+                    break
+                solver.set("timeout", min(self.timeout_ms, remaining_ms))
+                candidate = current[:i] + current[i + 1:]
+                if solver.check(*[Bool(n) for n in candidate]) == unsat:
+                    kept = {str(t) for t in solver.unsat_core()}
+                    current = [n for n in candidate if n in kept]
+                else:
+                    i += 1
+        finally:
+            solver.set("timeout", self.timeout_ms)
+        return current
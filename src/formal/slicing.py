@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from typing import Iterable
+
+
+@dataclass
+class ConstraintComponent:
+    formulas: list[int] = field(default_factory=list)
+    symbols: set[str] = field(default_factory=set)
+    features: set[str] = field(default_factory=set)
+
+
+def slice_formulas(symbol_sets: list[frozenset[str]]) -> tuple[list[ConstraintComponent], dict[str, int]]:
+    parent = list(range(len(symbol_sets)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: dict[str, int] = {}
+    for i, symbols in enumerate(symbol_sets):
+        for symbol in symbols:
+            j = owner.setdefault(symbol, i)
+            if j != i:
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[max(ri, rj)] = min(ri, rj)
+
+    components: list[ConstraintComponent] = []
+    by_root: dict[int, int] = {}
+    for i, symbols in enumerate(symbol_sets):
+        root = find(i)
+        index = by_root.get(root)
+        if index is None:
+            index = by_root[root] = len(components)
+            components.append(ConstraintComponent())
+        components[index].formulas.append(i)
+        components[index].symbols.update(symbols)
+
+    symbol_components = {s: c for c, component in enumerate(components) for s in component.symbols}
+    return components, symbol_components
+
+
+def touched_components(symbols: Iterable[str], symbol_components: dict[str, int]) -> list[int]:
+    return sorted({symbol_components[s] for s in symbols if s in symbol_components})
@@ -1,89 +1,201 @@
-import re
-from typing import Any
+from typing import Any, Iterable
 
-from z3 import And, Bool, BoolVal, Int, IntVal, Not, Or, Real, RealVal, Solver
+from z3 import BoolVal, Solver, SolverFor, Then, Z3Exception
+from z3.z3consts import (
+    Z3_APP_AST,
+    Z3_BOOL_SORT,
+    Z3_BV_SORT,
+    Z3_DATATYPE_SORT,
+    Z3_INT_SORT,
+    Z3_NUMERAL_AST,
+    Z3_OP_DIV,
+    Z3_OP_IDIV,
+    Z3_OP_MOD,
+    Z3_OP_MUL,
+    Z3_OP_POWER,
+    Z3_OP_REM,
+    Z3_OP_TO_INT,
+    Z3_OP_TO_REAL,
+    Z3_OP_UMINUS,
+    Z3_OP_UNINTERPRETED,
+    Z3_QUANTIFIER_AST,
+    Z3_REAL_SORT,
+    Z3_UNINTERPRETED_SORT,
+)
+from z3.z3core import (
+    Z3_get_app_arg,
+    Z3_get_app_decl,
+    Z3_get_app_num_args,
+    Z3_get_ast_id,
+    Z3_get_ast_kind,
+    Z3_get_decl_kind,
+    Z3_get_decl_name,
+    Z3_get_quantifier_body,
+    Z3_get_sort,
+    Z3_get_sort_kind,
+    Z3_get_symbol_string,
+    Z3_to_app,
+)
 
+from ..dsl.expressions import ExpressionSyntaxError
+from .expr_lowering import LoweringScope, UnsupportedExpression, Z3Lowerer
 
-def create_solver(timeout_ms: int = 5000) -> Solver:
-    s = Solver()
+
+GENERIC = "generic"
+LOGIC = "logic"
+TACTIC = "tactic"
+
+INTERRUPTED = ("interrupted", "canceled")
+RESOURCE_OUT = ("timeout", "canceled")
+MEMOUT = ("out of memory", "max. memory exceeded")
+
+_SORT_FEATURES = {
+    Z3_INT_SORT: "int",
+    Z3_REAL_SORT: "real",
+    Z3_BV_SORT: "bv",
+    Z3_BOOL_SORT: "bool",
+    Z3_DATATYPE_SORT: "dt",
+    Z3_UNINTERPRETED_SORT: "uf",
+}
+_NUMERAL_WRAPPERS = {Z3_OP_TO_REAL, Z3_OP_TO_INT, Z3_OP_UMINUS}
+_NONLINEAR_OPS = {Z3_OP_MUL, Z3_OP_DIV, Z3_OP_IDIV, Z3_OP_MOD, Z3_OP_REM, Z3_OP_POWER}
+
+# Strategy per logic as (incremental, one-shot), chosen from benchmarks/bench_logic.py.
+# Tactic pipelines re-run preprocessing on every check, so incremental solvers never use them.
+SOLVER_STRATEGIES: dict[str, tuple[str, str]] = {
+    **{
+        f"QF_{theories}{arith}": (LOGIC, TACTIC)
+        for theories in ("", "UF", "DT", "UFDT")
+        for arith in ("LIA", "LRA", "LIRA")
+    },
+    "QF_BV": (GENERIC, TACTIC),
+}
+
+TACTIC_PIPELINES: dict[str, tuple[str, ...]] = {
+    **{
+        f"QF_{theories}{arith}": ("simplify", "propagate-values", "solve-eqs", "smt")
+        for theories in ("", "UF", "DT", "UFDT")
+        for arith in ("LIA", "LRA", "LIRA")
+    },
+    "QF_BV": ("simplify", "propagate-values", "solve-eqs", "bit-blast", "sat"),
+}
+
+
+def create_solver(timeout_ms: int = 5000, logic: str | None = None, incremental: bool = True) -> Solver:
+    strategy = GENERIC
+    if logic in SOLVER_STRATEGIES:
+        strategy = SOLVER_STRATEGIES[logic][0 if incremental else 1]
+    if strategy == TACTIC:
+        s = Then(*TACTIC_PIPELINES[logic]).solver()
+    elif strategy == LOGIC:
+        s = SolverFor(logic)
+    else:
+        s = Solver()
     s.set("timeout", timeout_ms)
     return s
 
 
+def is_memout(error: BaseException) -> bool:
+    if isinstance(error, MemoryError):
+        return True
+    if not isinstance(error, Z3Exception):
+        return False
+    value = error.value.decode("utf-8", "replace") if isinstance(error.value, bytes) else str(error.value)
+    return value.strip().lower() in MEMOUT
+
+
+def solver_statistics(solver: Solver) -> dict[str, Any]:
+    stats = solver.statistics()
+    return dict(stats[i] for i in range(len(stats)))
+
+
+def _is_numeral(ctx: Any, ast: Any) -> bool:
+    kind = Z3_get_ast_kind(ctx, ast)
+    if kind == Z3_NUMERAL_AST:
+        return True
+    if kind != Z3_APP_AST:
+        return False
+    app = Z3_to_app(ctx, ast)
+    if Z3_get_decl_kind(ctx, Z3_get_app_decl(ctx, app)) not in _NUMERAL_WRAPPERS:
+        return False
+    return Z3_get_app_num_args(ctx, app) == 1 and _is_numeral(ctx, Z3_get_app_arg(ctx, app, 0))
+
+
+def formula_signature(formula: Any) -> tuple[frozenset[str], frozenset[str]]:
+    ctx = formula.ctx.ref()
+    symbols = set()
+    features = set()
+    seen = set()
+    stack = [formula.as_ast()]
+    while stack:
+        ast = stack.pop()
+        ast_id = Z3_get_ast_id(ctx, ast)
+        if ast_id in seen:
+            continue
+        seen.add(ast_id)
+        kind = Z3_get_ast_kind(ctx, ast)
+        if kind == Z3_NUMERAL_AST:
+            continue
+        if kind == Z3_QUANTIFIER_AST:
+            features.add("quantifier")
+            stack.append(Z3_get_quantifier_body(ctx, ast))
+            continue
+        if kind != Z3_APP_AST:
+            continue
+        app = Z3_to_app(ctx, ast)
+        decl = Z3_get_app_decl(ctx, app)
+        op = Z3_get_decl_kind(ctx, decl)
+        n = Z3_get_app_num_args(ctx, app)
+        args = [Z3_get_app_arg(ctx, app, i) for i in range(n)]
+        if op in _NONLINEAR_OPS:
+            operands = args if op == Z3_OP_MUL else args[1:]
+            if sum(not _is_numeral(ctx, a) for a in operands) > (1 if op == Z3_OP_MUL else 0):
+                features.add("nonlinear")
+        elif op == Z3_OP_UNINTERPRETED:
+            if n:
+                features.add("uf")
+            else:
+                symbols.add(Z3_get_symbol_string(ctx, Z3_get_decl_name(ctx, decl)))
+            features.add(_SORT_FEATURES.get(Z3_get_sort_kind(ctx, Z3_get_sort(ctx, ast)), "other"))
+        stack.extend(args)
+    return frozenset(symbols), frozenset(features)
+
+
+def formula_symbols(formula: Any) -> frozenset[str]:
+    return formula_signature(formula)[0]
+
+
+def logic_for(features: Iterable[str]) -> str:
+    features = set(features)
+    if features & {"quantifier", "other"}:
+        return "ALL"
+    arith = features & {"int", "real"}
+    uf = "UF" if "uf" in features else ""
+    dt = "DT" if "dt" in features else ""
+    if "bv" in features:
+        return "ALL" if arith or dt else f"QF_{uf}BV"
+    if not arith:
+        return f"QF_{uf}{dt}" if dt else "QF_UF"
+    degree = "N" if "nonlinear" in features else "L"
+    domain = "IRA" if len(arith) == 2 else "IA" if "int" in arith else "RA"
+    return f"QF_{uf}{dt}{degree}{domain}"
+
+
 def expr_to_z3_vars(expr: str, context: dict[str, Any]) -> tuple[Any, dict[str, Any]]:
-    expr = expr.strip()
     context = dict(context)
-
-    operators = [
-        (r"(\w+)\s*>=\s*(\d+(?:\.\d+)?)", ">="),
-        (r"(\w+)\s*<=\s*(\d+(?:\.\d+)?)", "<="),
-        (r"(\w+)\s*>\s*(\d+(?:\.\d+)?)", ">"),
-        (r"(\w+)\s*<\s*(\d+(?:\.\d+)?)", "<"),
-        (r"(\w+)\s*==\s*(\w+)", "=="),
-        (r"(\w+)\s*!=\s*(\w+)", "!="),
-    ]
-
-    for pattern, op in operators:
-        m = re.match(pattern, expr)
-        if m:
-            left_name, right_val = m.group(1), m.group(2)
-            if left_name not in context:
-                context[left_name] = Real(left_name) if "." in right_val else Int(left_name)
-            left = context[left_name]
-
-            try:
-                if "." in right_val:
-                    right = RealVal(float(right_val))
-                else:
-                    right = IntVal(int(right_val))
-            except ValueError:
-                right = context.get(right_val, Int(right_val))
-
-            if op == ">=":
-                return left >= right, context
-            if op == "<=":
-                return left <= right, context
-            if op == ">":
-                return left > right, context
-            if op == "<":
-                return left < right, context
-            if op == "==":
-                return left == right, context
-            if op == "!=":
-                return left != right, context
-
-    return BoolVal(True), context
+    lowerer = Z3Lowerer(LoweringScope(names=context, free=context))
+    try:
+        return lowerer.lower_bool(expr.strip()), context
+    except (ExpressionSyntaxError, UnsupportedExpression):
+        return BoolVal(True), context
 
 
 def simple_invariant_to_z3(expr: str, numeric_vars: dict[str, Any]) -> Any | None:
     expr = expr.strip()
     if not expr:
         return None
-
-    for op_pattern, op_sym in [
-        (r"(\w+)\s*>=\s*(\d+(?:\.\d+)?)", ">="),
-        (r"(\w+)\s*<=\s*(\d+(?:\.\d+)?)", "<="),
-        (r"(\w+)\s*>\s*(\d+(?:\.\d+)?)", ">"),
-        (r"(\w+)\s*<\s*(\d+(?:\.\d+)?)", "<"),
-    ]:
-        m = re.match(op_pattern, expr)
-        if m:
-            var_name, val_str = m.group(1), m.group(2)
-            var = numeric_vars.get(var_name)
-            if var is None:
-                var = Real(var_name) if "." in val_str else Int(var_name)
-                numeric_vars[var_name] = var
-            try:
-                val = RealVal(float(val_str)) if "." in val_str else IntVal(int(val_str))
-            except ValueError:
-                return None
-            if op_sym == ">=":
-                return var >= val
-            if op_sym == "<=":
-                return var <= val
-            if op_sym == ">":
-                return var > val
-            if op_sym == "<":
-                return var < val
-
-    return None
+    lowerer = Z3Lowerer(LoweringScope(names=numeric_vars, free=numeric_vars))
+    try:
+        return lowerer.lower_bool(expr)
+    except (ExpressionSyntaxError, UnsupportedExpression):
+        return None
@@ -0,0 +1,450 @@
+import argparse
+import json
+import multiprocessing
+import subprocess
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import Any, Iterable
+
+from z3 import Bool, Implies, Not, Solver
+from z3.z3util import get_vars
+
+from ..dsl.ast_nodes import to_plain
+from ..dsl.expressions import ExpressionSyntaxError
+from .expr_lowering import UnsupportedExpression, Z3Lowerer
+from .parallel import (
+    CONSISTENCY,
+    INVARIANT_PROBE,
+    SERVICE,
+    SUSPICIOUS_PROBE,
+    CheckOutcome,
+    CheckStat,
+    CheckTask,
+    check_name,
+)
+from .smt_utils import create_solver
+from .verdict_cache import Verdict
+from .z3_translator import DECIMAL_ENCODINGS, Z3TranslationResult, translate_spec_to_z3
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+BINARY_GRACE_S = 5.0
+
+
+@dataclass
+class QueryEntry:
+    file: str
+    spec_index: int
+    kind: str
+    target: str = ""
+    detail: str = ""
+    logic: str = "ALL"
+    trackers: list[str] = field(default_factory=list)
+    labels: dict[str, str] = field(default_factory=dict)
+    variables: list[str] = field(default_factory=list)
+    payload: Any = None
+    error: str | None = None
+
+    @property
+    def task(self) -> CheckTask:
+        return CheckTask(self.spec_index, self.kind, self.target, self.detail)
+
+
+@dataclass
+class Manifest:
+    timeout_ms: int
+    specs: list[dict[str, Any]]
+    queries: list[QueryEntry]
+    version: int = MANIFEST_VERSION
+
+
+def write_manifest(directory: str | Path, manifest: Manifest) -> Path:
+    path = Path(directory) / MANIFEST_NAME
+    path.write_text(json.dumps(asdict(manifest), indent=2), encoding="utf-8")
+    return path
+
+
+def read_manifest(path: str | Path) -> Manifest:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version: {data.get('version')}")
+    return Manifest(
+        timeout_ms=data["timeout_ms"],
+        specs=data["specs"],
+        queries=[QueryEntry(**q) for q in data["queries"]],
+    )
+
+
+def query_text(
+    assertions: Iterable[Any],
+    trackers: list[str],
+    logic: str,
+    timeout_ms: int,
+    variables: list[Any] | None = None,
+) -> str:
+    solver = Solver()
+    assertions = list(assertions)
+    for f in assertions:
+        solver.add(f)
+    # get-value needs every requested constant declared, including ones no assertion mentions.
+    mentioned = {str(v) for f in assertions for v in get_vars(f)}
+    for v in variables or []:
+        if str(v) not in mentioned:
+            solver.add(v == v)
+    lines = [
+        f"; logic: {logic}",
+        "(set-option :produce-unsat-cores true)",
+        "(set-option :smt.core.minimize true)",
+        f"(set-option :timeout {timeout_ms})",
+    ]
+    lines.append(solver.sexpr().rstrip())
+    if trackers:
+        lines.append(f"(check-sat-assuming ({' '.join(_quote(t) for t in trackers)}))")
+        lines.append("(get-unsat-core)")
+    else:
+        lines.append("(check-sat)")
+    if variables:
+        lines.append(f"(get-value ({' '.join(v.sexpr() for v in variables)}))")
+    return "\n".join(lines) + "\n"
+
+
+def _quote(name: str) -> str:
+    return name if name.isidentifier() else f"|{name}|"
+
+
+def _describe(translation: Z3TranslationResult, label: str) -> str:
+    expr = translation.sources.get(label)
+    return f"{label}: {expr}" if expr is not None else label
+
+
+def export_verification_queries(
+    specs: list[dict[str, Any]], output_dir: str | Path, timeout_ms: int = 5000, decimal_encoding: str = "real"
+) -> Path:
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    queries: list[QueryEntry] = []
+    specs = [to_plain(spec) for spec in specs]
+    for i, spec in enumerate(specs):
+        services = [s.get("name", "") for s in spec.get("services", [])]
+        try:
+            t = translate_spec_to_z3(spec, decimal_encoding)
+        except Exception as e:
+            queries.append(QueryEntry("", i, CONSISTENCY, error=str(e)))
+            continue
+
+        inv_trackers = [f"!inv{j}" for j in range(len(t.invariant_formulas))]
+        inv_labels = {tr: _describe(t, label) for tr, label in zip(inv_trackers, t.invariant_labels)}
+        implications = [Implies(Bool(tr), f) for tr, f in zip(inv_trackers, t.invariant_formulas)]
+
+        entry = QueryEntry(
+            f"spec{i:04d}_consistency.smt2",
+            i,
+            CONSISTENCY,
+            logic=t.query_logic(list(range(len(t.components)))),
+            trackers=inv_trackers,
+            labels=inv_labels,
+            payload=[list(u) for u in t.untranslated],
+        )
+        (output / entry.file).write_text(
+            query_text(implications, entry.trackers, entry.logic, timeout_ms), encoding="utf-8"
+        )
+        queries.append(entry)
+
+        for k, sname in enumerate(services):
+            components = t.precondition_components.get(sname, [])
+            used = [j for c in components for j in t.components[c].formulas]
+            pre = t.precondition_formulas.get(sname, [])
+            pre_trackers = [f"!pre{j}" for j in range(len(pre))]
+            labels = {inv_trackers[j]: inv_labels[inv_trackers[j]] for j in used}
+            labels.update(
+                (tr, _describe(t, label)) for tr, label in zip(pre_trackers, t.precondition_labels.get(sname, []))
+            )
+            entry = QueryEntry(
+                f"spec{i:04d}_service{k:03d}.smt2",
+                i,
+                SERVICE,
+                target=sname,
+                logic=t.query_logic(components, sname),
+                trackers=[inv_trackers[j] for j in used] + pre_trackers,
+                labels=labels,
+            )
+            assertions = [implications[j] for j in used] + [Implies(Bool(tr), f) for tr, f in zip(pre_trackers, pre)]
+            (output / entry.file).write_text(
+                query_text(assertions, entry.trackers, entry.logic, timeout_ms), encoding="utf-8"
+            )
+            queries.append(entry)
+    return write_manifest(output, Manifest(timeout_ms, specs, queries))
+
+
+def export_probe_queries(spec: dict[str, Any], output_dir: str | Path, timeout_ms: int = 3000) -> Path:
+    from .counterexample_finder import CounterexampleSearch
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    search = CounterexampleSearch(spec, timeout_ms)
+    t = search.translation
+    queries: list[QueryEntry] = []
+
+    def write(entry: QueryEntry, assertions: list[Any], variables: list[Any]) -> None:
+        entry.variables = [str(v) for v in variables]
+        text = query_text(assertions, [], entry.logic, timeout_ms, variables)
+        (output / entry.file).write_text(text, encoding="utf-8")
+        queries.append(entry)
+
+    # Same probes and order as CounterexampleFinder: suspicious patterns, boundaries, then invariant violations.
+    for state, condition, variables, extra in chain(search.pattern_probes(), search.boundary_probes()):
+        payload = {k: v for k, v in asdict(state).items() if k != "variable_values"}
+        entry = QueryEntry(
+            f"probe{len(queries):04d}.smt2", 0, SUSPICIOUS_PROBE, state.entity_name, state.probe or "", payload=payload
+        )
+        write(entry, [*t.invariant_formulas, *extra, condition], list(variables.values()))
+
+    for entity in spec.get("entities", []):
+        name = entity.get("name", "")
+        variables = t.entity_vars.get(name)
+        if not variables:
+            continue
+        for inv in entity.get("invariants", []):
+            expr = inv.get("expr", inv.get("expression", ""))
+            try:
+                formula = Z3Lowerer(t.entity_scopes[name]).lower_bool(expr)
+            except (ExpressionSyntaxError, UnsupportedExpression):
+                continue
+            disabled = set(t.invariant_indices(name, expr))
+            others = [f for i, f in enumerate(t.invariant_formulas) if i not in disabled]
+            entry = QueryEntry(f"probe{len(queries):04d}.smt2", 0, INVARIANT_PROBE, name, expr)
+            write(entry, [*others, Not(formula)], list(variables.values()))
+    return write_manifest(output, Manifest(timeout_ms, [to_plain(spec)], queries))
+
+
+def smt_value(tree: Any) -> str:
+    if isinstance(tree, list):
+        if len(tree) == 2 and tree[0] == "-":
+            return "-" + smt_value(tree[1])
+        if len(tree) == 3 and tree[0] == "/":
+            return f"{smt_value(tree[1])}/{smt_value(tree[2])}"
+        return "(" + " ".join(smt_value(t) for t in tree) + ")"
+    if tree in ("true", "false"):
+        return tree.capitalize()
+    if tree.endswith(".0") and tree[:-2].isdigit():
+        return tree[:-2]
+    return tree.strip("|")
+
+
+def parse_sexprs(text: str) -> list[Any]:
+    stack: list[list[Any]] = [[]]
+    token = ""
+    quoted = None
+    for ch in text:
+        if quoted is not None:
+            token += ch
+            if ch == quoted:
+                quoted = None
+            continue
+        if ch in "|\"":
+            quoted = ch
+            token += ch
+        elif ch == "(" or ch == ")" or ch.isspace():
+            if token:
+                stack[-1].append(token)
+                token = ""
+            if ch == "(":
+                stack.append([])
+            elif ch == ")" and len(stack) > 1:
+                done = stack.pop()
+                stack[-1].append(done)
+        else:
+            token += ch
+    if token:
+        stack[-1].append(token)
+    return stack[0]
+
+
+def solve_query(
+    directory: str | Path, entry: QueryEntry, timeout_ms: int, z3_binary: str | None = None
+) -> Verdict:
+    path = Path(directory) / entry.file
+    start = time.perf_counter()
+    if z3_binary is None:
+        solver = create_solver(timeout_ms, entry.logic, incremental=bool(entry.trackers))
+        if entry.trackers:
+            solver.set("core.minimize", True)
+        solver.from_file(str(path))
+        status = solver.check(*[Bool(t) for t in entry.trackers])
+        verdict = Verdict(status=str(status), solve_time=time.perf_counter() - start)
+        if verdict.status == "unsat" and entry.trackers:
+            verdict.core = [str(t) for t in solver.unsat_core()]
+        elif verdict.status == "sat" and entry.variables:
+            model = solver.model()
+            constants = {str(v): v for f in solver.assertions() for v in get_vars(f)}
+            verdict.model = {
+                name: smt_value(parse_sexprs(model.eval(constants[name], model_completion=True).sexpr())[0])
+                if name in constants else "0"
+                for name in entry.variables
+            }
+        return verdict
+
+    try:
+        proc = subprocess.run(
+            [z3_binary, "-smt2", str(path)],
+            capture_output=True,
+            text=True,
+            timeout=timeout_ms / 1000.0 + BINARY_GRACE_S,
+        )
+    except subprocess.TimeoutExpired:
+        return Verdict(status="unknown", solve_time=time.perf_counter() - start)
+    elapsed = time.perf_counter() - start
+    trees = parse_sexprs(proc.stdout)
+    status = next((t for t in trees if t in ("sat", "unsat", "unknown")), "unknown")
+    verdict = Verdict(status=status, solve_time=elapsed)
+    answers = [t for t in trees if isinstance(t, list) and (not t or t[0] != "error")]
+    if status == "unsat" and entry.trackers and answers:
+        verdict.core = [smt_value(t) for t in answers[0]]
+    elif status == "sat" and entry.variables and answers:
+        verdict.model = {smt_value(name): smt_value(value) for name, value in answers[-1]}
+    return verdict
+
+
+def _solve_task(args: tuple[str, dict[str, Any], int, str | None]) -> dict[str, Any]:
+    directory, entry, timeout_ms, z3_binary = args
+    query = QueryEntry(**entry)
+    try:
+        verdict = solve_query(directory, query, timeout_ms, z3_binary)
+        return {"file": query.file, **asdict(verdict)}
+    except Exception as e:
+        return {"file": query.file, "status": "error", "error": str(e)}
+
+
+def run_batch(
+    manifest_path: str | Path,
+    results_path: str | Path | None = None,
+    max_workers: int | None = None,
+    z3_binary: str | None = None,
+    shard: tuple[int, int] = (0, 1),
+    timeout_ms: int | None = None,
+) -> dict[str, dict[str, Any]]:
+    manifest_path = Path(manifest_path)
+    manifest = read_manifest(manifest_path)
+    index, count = shard
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard {index}/{count}")
+    timeout_ms = timeout_ms if timeout_ms is not None else manifest.timeout_ms
+    directory = str(manifest_path.parent)
+    selected = [q for n, q in enumerate(manifest.queries) if n % count == index and q.error is None]
+    args = [(directory, asdict(q), timeout_ms, z3_binary) for q in selected]
+
+    results: dict[str, dict[str, Any]] = {}
+    if args:
+        workers = max(1, min(max_workers or multiprocessing.cpu_count(), len(args)))
+        executor: Executor
+        if z3_binary is not None:
+            executor = ThreadPoolExecutor(max_workers=workers)
+        elif workers == 1:
+            executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        with executor:
+            for result in executor.map(_solve_task, args):
+                results[result["file"]] = result
+
+    if results_path is not None:
+        with open(results_path, "w", encoding="utf-8") as f:
+            for result in results.values():
+                f.write(json.dumps(result, sort_keys=True) + "\n")
+    return results
+
+
+def read_results(paths: Iterable[str | Path]) -> dict[str, dict[str, Any]]:
+    results = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    result = json.loads(line)
+                    results[result["file"]] = result
+    return results
+
+
+def load_outcomes(manifest: Manifest, results: dict[str, dict[str, Any]]) -> list[CheckOutcome]:
+    outcomes = []
+    for entry in manifest.queries:
+        task = entry.task
+        if entry.error is not None:
+            outcomes.append(CheckOutcome(task, "error", error=entry.error))
+            continue
+        result = results.get(entry.file)
+        if result is None:
+            outcomes.append(CheckOutcome(task, "unknown", stat=CheckStat(check_name(task), "unknown")))
+            continue
+        status = result["status"]
+        order = {t: n for n, t in enumerate(entry.trackers)}
+        core = sorted(result.get("core", []), key=lambda t: order.get(t, len(order)))
+        payload = entry.payload
+        if entry.kind == CONSISTENCY:
+            payload = [tuple(u) for u in entry.payload or []]
+        elif entry.kind in (INVARIANT_PROBE, SUSPICIOUS_PROBE):
+            payload = result.get("model", {})
+        outcomes.append(CheckOutcome(
+            task,
+            status,
+            error=result.get("error"),
+            payload=payload,
+            core=[entry.labels.get(t, t) for t in core],
+            stat=CheckStat(
+                check_name(task),
+                status,
+                solve_time=result.get("solve_time", 0.0),
+                attempts=1,
+                timeout_ms=manifest.timeout_ms,
+            ),
+        ))
+    return outcomes
+
+
+def _shard(text: str) -> tuple[int, int]:
+    index, _, count = text.partition("/")
+    return int(index), int(count or 1)
+
+
+def main(argv: list[str] | None = None) -> None:
+    from ..dsl.spec_loader import load_specification
+    from .verifier import FormalVerifier
+
+    parser = argparse.ArgumentParser(prog="python -m src.formal.smtlib")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export")
+    export.add_argument("specs", nargs="+")
+    export.add_argument("--out", required=True)
+    export.add_argument("--timeout-ms", type=int, default=5000)
+    export.add_argument("--decimal-encoding", choices=DECIMAL_ENCODINGS, default="real")
+    export.add_argument("--spec-cache")
+    run = sub.add_parser("run")
+    run.add_argument("manifest")
+    run.add_argument("--results", required=True)
+    run.add_argument("--z3")
+    run.add_argument("--workers", type=int)
+    run.add_argument("--shard", type=_shard, default=(0, 1))
+    report = sub.add_parser("report")
+    report.add_argument("manifest")
+    report.add_argument("results", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        specs = [load_specification(Path(p), args.spec_cache) for p in args.specs]
+        print(export_verification_queries(specs, args.out, args.timeout_ms, args.decimal_encoding))
+    elif args.command == "run":
+        results = run_batch(args.manifest, args.results, args.workers, args.z3, args.shard)
+        print(f"{len(results)} queries solved")
+    else:
+        for name, result in zip(
+            (s["name"] for s in read_manifest(args.manifest).specs),
+            FormalVerifier().load_batch(args.manifest, args.results),
+        ):
+            print(json.dumps({"spec": name, **asdict(result)}, default=str))
+
+
+if __name__ == "__main__":
+    main()
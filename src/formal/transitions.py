@@ -0,0 +1,324 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from z3 import And, BoolSort, Const, Distinct, Function, Implies, Not, Or, Solver, is_true, sat, substitute, unsat
+
+from ..dsl.expressions import Attribute, Call, Expr, ExpressionSyntaxError, FieldRef, Name, Old, parse_expr, walk
+from .expr_lowering import LoweringScope, UnsupportedExpression, Z3Lowerer
+from .smt_utils import create_solver, formula_signature, logic_for
+from .z3_translator import DECIMAL_ENCODINGS, UUID_SORT, Z3TranslationResult, field_range, field_sort
+
+PRESERVED = "preserved"
+VIOLATED = "violated"
+UNKNOWN = "unknown"
+
+
+@dataclass
+class TransitionResult:
+    service: str
+    status: str
+    violated: list[str] = field(default_factory=list)
+    counterexample: dict[str, str] = field(default_factory=dict)
+    untranslated: list[tuple[str, str, str]] = field(default_factory=list)
+    solve_time: float = 0.0
+
+
+@dataclass
+class EntityState:
+    fields: dict[str, dict[str, Any]] = field(default_factory=dict)
+    exists: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class EntityInvariant:
+    label: str
+    pre: Any
+    post: Any
+
+
+class InstanceScope(LoweringScope):
+
+    keyed = True
+
+    def __init__(
+        self,
+        state: EntityState,
+        names: dict[str, Any],
+        types: Z3TranslationResult,
+        free: dict[str, Any],
+        records: dict[str, tuple[str, Any]] | None = None,
+        previous: LoweringScope | None = None,
+    ) -> None:
+        super().__init__(names=names, free=free, strings=types.strings, scales=types.scales, enums=types.enums)
+        self.state = state
+        self.records = records or {}
+        self.previous = previous
+
+    def resolve_field(self, entity: str, field: str, key: Any = None) -> Any:
+        functions = self.state.fields.get(entity)
+        if functions is None or field not in functions:
+            raise UnsupportedExpression(f"unknown field reference {entity}.{field}")
+        if key is None or key.sort() != UUID_SORT:
+            raise UnsupportedExpression(f"{entity} must be looked up by a UUID")
+        return functions[field](key)
+
+    def resolve_record(self, name: str, field: str) -> Any:
+        record = self.records.get(name)
+        if record is None:
+            raise UnsupportedExpression(f"unsupported attribute {name}.{field}")
+        return self.resolve_field(record[0], field, record[1])
+
+
+class InstanceEncoding:
+
+    def __init__(self, spec: dict[str, Any], instances: int = 2, decimal_encoding: str = "real") -> None:
+        if instances < 1:
+            raise ValueError("At least one instance per entity is required")
+        if decimal_encoding not in DECIMAL_ENCODINGS:
+            raise ValueError(f"Unknown decimal encoding {decimal_encoding!r}, expected one of {DECIMAL_ENCODINGS}")
+        self.spec = spec
+        self.instances = instances
+        self.types = Z3TranslationResult()
+        if decimal_encoding == "fixed":
+            self.types.scales = {}
+        self.entities = {e.get("name", ""): e for e in spec.get("entities", [])}
+        self.pre = self._state("")
+        self.post = self._state("!post")
+        self.ids = {name: [Const(f"{name}!{i}", UUID_SORT) for i in range(instances)] for name in self.entities}
+        self.untranslated: list[tuple[str, str, str]] = []
+        self.invariants: dict[str, list[EntityInvariant]] = {}
+        self.domains: dict[str, list[tuple[Any, Any]]] = {}
+        self._this = {name: Const(f"{name}!this", UUID_SORT) for name in self.entities}
+        self._free: dict[str, Any] = {}
+        self._solvers: dict[str, Solver] = {}
+        for name, entity in self.entities.items():
+            self._entity_invariants(name, entity)
+
+    def _state(self, suffix: str) -> EntityState:
+        state = EntityState()
+        for name, entity in self.entities.items():
+            functions = state.fields[name] = {}
+            for f in entity.get("fields", []):
+                var_name = f"{name}_{f.get('name', '')}"
+                sort = field_sort(var_name, f, self.types)
+                if suffix and self.types.scales is not None and var_name in self.types.scales:
+                    self.types.scales[var_name + suffix] = self.types.scales[var_name]
+                functions[f.get("name", "")] = Function(var_name + suffix, UUID_SORT, sort)
+            state.exists[name] = Function(f"{name}!exists{suffix}", UUID_SORT, BoolSort())
+        return state
+
+    def _scope(self, state: EntityState, entity: str) -> InstanceScope:
+        this = self._this[entity]
+        names = {fname: f(this) for fname, f in state.fields[entity].items()}
+        return InstanceScope(state, names, self.types, self._free)
+
+    def _entity_invariants(self, name: str, entity: dict[str, Any]) -> None:
+        pre = Z3Lowerer(self._scope(self.pre, name))
+        post = Z3Lowerer(self._scope(self.post, name))
+        invariants = self.invariants[name] = []
+        for inv in entity.get("invariants", []):
+            expr = inv.get("expr", inv.get("expression", ""))
+            if not expr:
+                continue
+            where = f"{name}.{inv.get('name', '')}"
+            try:
+                invariants.append(EntityInvariant(where, pre.lower_bool(expr), post.lower_bool(expr)))
+            except (ExpressionSyntaxError, UnsupportedExpression) as e:
+                self.untranslated.append((where, expr, str(e)))
+        this = self._this[name]
+        domains = self.domains[name] = []
+        for f in entity.get("fields", []):
+            fname = f.get("name", "")
+            fixed = self.types.scales is not None
+            bounded = [field_range(state.fields[name][fname](this), f, fixed) for state in (self.pre, self.post)]
+            if bounded[0] is not None:
+                domains.append((bounded[0][0], bounded[1][0]))
+
+    def at(self, entity: str, formula: Any, instance: Any) -> Any:
+        return substitute(formula, (self._this[entity], instance))
+
+    def check_service(self, service: dict[str, Any], timeout_ms: int = 5000) -> TransitionResult:
+        sname = service.get("name", "")
+        result = TransitionResult(sname, UNKNOWN)
+        inputs = {}
+        formulas = []
+        for inp in service.get("inputs", []):
+            iname = inp.get("name", "")
+            inputs[iname] = Const(f"{sname}_{iname}", field_sort(f"{sname}_{iname}", inp, self.types))
+            bounded = field_range(inputs[iname], inp, self.types.scales is not None)
+            if bounded is not None:
+                formulas.append(bounded[0])
+
+        pre_trees = self._parse(service.get("preconditions", []), f"{sname}.pre", result)
+        post_trees = self._parse(service.get("postconditions", []), f"{sname}.post", result)
+        records = {
+            base: (entity, Const(f"{sname}!{base}", UUID_SORT))
+            for base, entity in self._records(post_trees, inputs).items()
+        }
+        pre_scope = InstanceScope(self.pre, inputs, self.types, self._free)
+        post_scope = InstanceScope(self.post, inputs, self.types, self._free, records, pre_scope)
+        pre_lowerer, post_lowerer = Z3Lowerer(pre_scope), Z3Lowerer(post_scope)
+        formulas += self._lower_all(pre_lowerer, pre_trees, result)
+        formulas += self._lower_all(post_lowerer, post_trees, result)
+
+        lookups: dict[str, dict[int, Any]] = {}
+        writes: dict[str, dict[str, list[Any]]] = {}
+        for where, source, tree in pre_trees + post_trees:
+            for node in walk(tree):
+                if isinstance(node, FieldRef) and node.entity in self.entities:
+                    key = self._key(pre_lowerer, node.key, where, source, result)
+                    if key is not None:
+                        lookups.setdefault(node.entity, {})[key.get_id()] = key
+        for where, source, tree in post_trees:
+            for node in walk(tree, prune=Old):
+                if isinstance(node, FieldRef) and node.entity in self.entities:
+                    key = self._key(pre_lowerer, node.key, where, source, result)
+                    if key is not None:
+                        writes.setdefault(node.entity, {}).setdefault(node.field, []).append(key)
+        for entity, key in records.values():
+            for fname in self.pre.fields[entity]:
+                writes.setdefault(entity, {}).setdefault(fname, []).append(key)
+
+        created = {entity: [key for e, key in records.values() if e == entity] for entity in self.entities}
+        for entity, keys in lookups.items():
+            for key in keys.values():
+                formulas.append(Or([key == i for i in self.ids[entity]]))
+                if not any(key.eq(k) for k in created[entity]):
+                    formulas.append(self.pre.exists[entity](key))
+        for entity, key in records.values():
+            formulas += [
+                Or([key == i for i in self.ids[entity]]),
+                Not(self.pre.exists[entity](key)),
+                self.post.exists[entity](key),
+            ]
+
+        goal = []
+        for entity in set(lookups) | set(writes):
+            ids = self.ids[entity]
+            if len(ids) > 1:
+                formulas.append(Distinct(*ids))
+            for i in ids:
+                formulas += [self.at(entity, d, i) for domain in self.domains[entity] for d in domain]
+                formulas += [
+                    Implies(self.pre.exists[entity](i), self.at(entity, inv.pre, i)) for inv in self.invariants[entity]
+                ]
+            if entity not in writes:
+                continue
+            formulas += self._frame(entity, writes[entity], created[entity])
+            for inv in self.invariants[entity]:
+                for i in ids:
+                    violation = And(self.post.exists[entity](i), Not(self.at(entity, inv.post, i)))
+                    goal.append((inv.label, entity, i, violation))
+
+        if not goal:
+            result.status = PRESERVED
+            return result
+        features = set()
+        for f in formulas:
+            features |= formula_signature(f)[1]
+        solver = self._solver(logic_for(features), timeout_ms)
+        solver.push()
+        try:
+            solver.add(*formulas)
+            solver.add(Or([violation for *_, violation in goal]))
+            start = time.perf_counter()
+            status = solver.check()
+            result.solve_time = time.perf_counter() - start
+            if status == unsat:
+                result.status = PRESERVED
+            elif status == sat:
+                result.status = VIOLATED
+                self._explain(solver.model(), inputs, goal, result)
+        finally:
+            solver.pop()
+        return result
+
+    def check_all(self, timeout_ms: int = 5000) -> list[TransitionResult]:
+        return [self.check_service(service, timeout_ms) for service in self.spec.get("services", [])]
+
+    def _solver(self, logic: str, timeout_ms: int) -> Solver:
+        solver = self._solvers.get(logic)
+        if solver is None:
+            solver = self._solvers[logic] = create_solver(timeout_ms, logic)
+        solver.set("timeout", timeout_ms)
+        return solver
+
+    def _parse(self, sources: list[Any], prefix: str, result: TransitionResult) -> list[tuple[str, str, Expr]]:
+        trees = []
+        for i, source in enumerate(sources):
+            if not isinstance(source, str):
+                continue
+            where = f"{prefix}[{i}]"
+            try:
+                trees.append((where, source, parse_expr(source)))
+            except ExpressionSyntaxError as e:
+                result.untranslated.append((where, source, str(e)))
+        return trees
+
+    def _lower_all(
+        self, lowerer: Z3Lowerer, trees: list[tuple[str, str, Expr]], result: TransitionResult
+    ) -> list[Any]:
+        formulas = []
+        for where, source, tree in trees:
+            try:
+                formulas.append(lowerer.lower_bool(tree))
+            except UnsupportedExpression as e:
+                result.untranslated.append((where, source, str(e)))
+        return formulas
+
+    def _key(self, lowerer: Z3Lowerer, key: Expr, where: str, source: str, result: TransitionResult) -> Any | None:
+        try:
+            value = lowerer.lower(key)
+        except UnsupportedExpression as e:
+            result.untranslated.append((where, source, str(e)))
+            return None
+        return value if value.sort() == UUID_SORT else None
+
+    def _records(self, trees: list[tuple[str, str, Expr]], inputs: dict[str, Any]) -> dict[str, str]:
+        attrs: dict[str, set[str]] = {}
+        for _, _, tree in trees:
+            for node in walk(tree, prune=(Old, Call)):
+                if isinstance(node, Attribute) and isinstance(node.base, Name) and node.base.id not in inputs:
+                    attrs.setdefault(node.base.id, set()).add(node.attr)
+        records = {}
+        for base, used in attrs.items():
+            if base in self.entities:
+                records[base] = base
+                continue
+            owners = [name for name, f in self.pre.fields.items() if used <= set(f)]
+            if len(owners) == 1:
+                records[base] = owners[0]
+        return records
+
+    def _frame(self, entity: str, written: dict[str, list[Any]], created: list[Any]) -> list[Any]:
+        frame = []
+        for i in self.ids[entity]:
+            for fname, function in self.pre.fields[entity].items():
+                unchanged = self.post.fields[entity][fname](i) == function(i)
+                keys = written.get(fname, [])
+                frame.append(Or(*[i == k for k in keys], unchanged) if keys else unchanged)
+            unchanged = self.post.exists[entity](i) == self.pre.exists[entity](i)
+            frame.append(Or(*[i == k for k in created], unchanged) if created else unchanged)
+        return frame
+
+    def _explain(
+        self, model: Any, inputs: dict[str, Any], goal: list[tuple[str, str, Any, Any]], result: TransitionResult
+    ) -> None:
+        for name, var in inputs.items():
+            result.counterexample[name] = str(model.eval(var, model_completion=True))
+        for label, entity, instance, violation in goal:
+            if not is_true(model.eval(violation, model_completion=True)):
+                continue
+            if label not in result.violated:
+                result.violated.append(label)
+            for fname, function in self.pre.fields[entity].items():
+                before = model.eval(function(instance), model_completion=True)
+                after = model.eval(self.post.fields[entity][fname](instance), model_completion=True)
+                result.counterexample[f"{instance}.{fname}"] = f"{before} -> {after}"
+
+
+def verify_transitions(
+    spec: dict[str, Any], instances: int = 2, timeout_ms: int = 5000, decimal_encoding: str = "real"
+) -> list[TransitionResult]:
+    return InstanceEncoding(spec, instances, decimal_encoding).check_all(timeout_ms)
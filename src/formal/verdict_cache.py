@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from z3 import ModelRef
+from z3.z3util import get_vars
+
+
+@dataclass
+class Verdict:
+    status: str
+    model: dict[str, str] = field(default_factory=dict)
+    solve_time: float = 0.0
+    core: list[str] = field(default_factory=list)
+    reason: str = ""
+
+
+def formula_id(formula: Any) -> str:
+    return hashlib.sha256(formula.sexpr().encode()).hexdigest()[:16]
+
+
+def canonical_digest(formulas: Iterable[Any]) -> str:
+    decls = set()
+    texts = set()
+    for f in formulas:
+        texts.add(f.sexpr())
+        for v in get_vars(f):
+            decls.add(f"{v.decl().name()}:{v.sort().sexpr()}")
+    h = hashlib.sha256()
+    for decl in sorted(decls):
+        h.update(f"decl:{decl}\n".encode())
+    for text in sorted(texts):
+        h.update(f"assert:{text}\n".encode())
+    return h.hexdigest()
+
+
+def canonical_key(formulas: Iterable[Any], timeout_ms: int, base_digest: str = "") -> str:
+    h = hashlib.sha256()
+    h.update(f"timeout:{timeout_ms}\nbase:{base_digest}\n".encode())
+    h.update(canonical_digest(formulas).encode())
+    return h.hexdigest()
+
+
+def model_to_dict(model: ModelRef) -> dict[str, str]:
+    values = {}
+    for d in model.decls():
+        name = d.name()
+        if not name.startswith("!"):
+            values[name] = model[d].sexpr()
+    return dict(sorted(values.items()))
+
+
+class VerdictCache:
+
+    def __init__(self, directory: str | Path, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._size = sum(p.stat().st_size for p in self.directory.glob("*.json"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Verdict | None:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return Verdict(
+            status=data["status"],
+            model=data.get("model", {}),
+            solve_time=data.get("solve_time", 0.0),
+            core=data.get("core", []),
+            reason=data.get("reason", ""),
+        )
+
+    def put(self, key: str, verdict: Verdict) -> None:
+        path = self._path(key)
+        payload = json.dumps(asdict(verdict), sort_keys=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        old_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+        self._size += len(payload.encode("utf-8")) - old_size
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for p in self.directory.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, p in entries:
+            if self._size <= target:
+                break
+            try:
+                p.unlink()
+                self._size -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        for p in self.directory.glob("*.json"):
+            p.unlink(missing_ok=True)
+        self._size = 0
+
+
+def timed_check(solver: Any, assumptions: list[Any] | None = None, keep_model: bool = True) -> tuple[Verdict, Any]:
+    start = time.perf_counter()
+    status = solver.check(*(assumptions or []))
+    elapsed = time.perf_counter() - start
+    verdict = Verdict(status=str(status), solve_time=elapsed)
+    if verdict.status == "sat" and keep_model:
+        verdict.model = model_to_dict(solver.model())
+    elif verdict.status == "unsat":
+        verdict.core = [str(t) for t in solver.unsat_core()]
+    else:
+        verdict.reason = solver.reason_unknown()
+    return verdict, status
@@ -1,9 +1,35 @@
-from dataclasses import dataclass, field
-from typing import Any
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
 
-from z3 import sat, unknown, unsat
+from z3 import main_ctx
 
-from .z3_translator import build_consistency_solver, build_service_solver, translate_spec_to_z3
+from .parallel import (
+    COMPONENT,
+    CONSISTENCY,
+    SERVICE,
+    CheckOutcome,
+    CheckStat,
+    CheckTask,
+    join_outcomes,
+    run_checks,
+    session_outcome,
+)
+from .scheduler import ScheduledCheck, VerificationScheduler
+from .session import VerificationSession
+from .smt_utils import is_memout
+from .smtlib import export_verification_queries, load_outcomes, read_manifest, read_results
+from .transitions import UNKNOWN, VIOLATED, InstanceEncoding
+from .verdict_cache import VerdictCache
+from .z3_translator import translate_spec_to_z3
+
+INTERRUPT_RETRY_S = 0.05
+
+# Every Z3 call shares the global context, which is not thread-safe: async checks are serialized on one thread.
+_Z3_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="z3")
 
 
 @dataclass
@@ -13,75 +39,309 @@ class VerificationResult:
     counterexample: str | None = None
     errors: list[str] = field(default_factory=list)
     warnings: list[str] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    conflicts: dict[str, list[str]] = field(default_factory=dict)
+    violations: dict[str, list[str]] = field(default_factory=dict)
+    check_stats: list[CheckStat] = field(default_factory=list, compare=False)
 
 
 class FormalVerifier:
 
-    def __init__(self, timeout_ms: int = 5000) -> None:
+    def __init__(
+        self,
+        timeout_ms: int = 5000,
+        parallel: bool = False,
+        max_workers: int | None = None,
+        cache: VerdictCache | None = None,
+        minimize_cores: bool = False,
+        core_budget_ms: int = 1000,
+        budget_ms: int | None = None,
+        initial_slice_ms: int = 50,
+        decimal_encoding: str = "real",
+        instances: int | None = None,
+    ) -> None:
+        if parallel and budget_ms is not None:
+            # The budget scheduler interleaves slices of every check on the warm in-process sessions.
+            raise ValueError("budget_ms and parallel=True cannot be combined: budgeted runs are scheduled in-process")
         self.timeout_ms = timeout_ms
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.cache = cache
+        self.session_options = {
+            "minimize_cores": minimize_cores,
+            "core_budget_ms": core_budget_ms,
+            "decimal_encoding": decimal_encoding,
+        }
+        self.budget_ms = budget_ms
+        self.initial_slice_ms = initial_slice_ms
+        self.instances = instances
 
-    def verify(self, spec: dict[str, Any]) -> VerificationResult:
-        result = VerificationResult()
+    def open_session(self, spec: dict[str, Any]) -> VerificationSession:
+        return VerificationSession(spec, self.timeout_ms, self.cache, **self.session_options)
 
-        consistency_result = self._check_consistency(spec)
-        result.is_consistent = consistency_result.is_consistent
-        result.counterexample = consistency_result.counterexample
-        result.errors.extend(consistency_result.errors)
+    def verify(self, spec: dict[str, Any]) -> VerificationResult:
+        return self.verify_many([spec])[0]
 
-        if result.is_consistent:
-            completeness_result = self._check_completeness(spec)
-            result.is_complete = completeness_result.is_complete
-            result.errors.extend(completeness_result.errors)
-            result.warnings.extend(completeness_result.warnings)
+    def verify_session(self, session: VerificationSession) -> VerificationResult:
+        if self.budget_ms is not None:
+            outcomes = self._run_scheduled([session.spec], [session])
+        else:
+            outcomes = self._run_sequential(0, session.spec, session)
+        return self._merge_outcomes(session.spec, outcomes)
 
-        return result
+    async def verify_async(self, spec: dict[str, Any]) -> VerificationResult:
+        outcomes = [outcome async for outcome in self.stream_checks(spec)]
+        return await _in_z3(self._merge_outcomes, spec, outcomes)
 
-    def _check_consistency(self, spec: dict[str, Any]) -> VerificationResult:
-        result = VerificationResult()
+    async def stream_checks(self, spec: dict[str, Any]) -> AsyncIterator[CheckOutcome]:
+        tasks = self._plan_checks(0, spec)
         try:
-            solver = build_consistency_solver(spec, self.timeout_ms)
-            z3_result = solver.check()
-
-            if z3_result == unsat:
-                result.is_consistent = False
-                result.errors.append("Invariants are inconsistent: no model exists")
-                result.counterexample = "Solver returned UNSAT — invariants are incompatible"
-            elif z3_result == unknown:
-                result.warnings.append("Z3 could not determine within timeout")
-            elif z3_result == sat:
-                result.is_consistent = True
+            session = await _in_z3(self.open_session, spec)
         except Exception as e:
-            result.is_consistent = False
-            result.errors.append(f"Verification error: {e}")
-            result.counterexample = str(e)
+            yield CheckOutcome(tasks[0], "error", error=str(e))
+            return
+        for task in tasks:
+            outcome = await _in_z3(_run_task, session, task)
+            yield outcome
+            if task.kind == CONSISTENCY and outcome.status in ("unsat", "error"):
+                return
 
-        return result
+    def export_smtlib(self, specs: list[dict[str, Any]], output_dir: str | Path) -> Path:
+        return export_verification_queries(specs, output_dir, self.timeout_ms, self.session_options["decimal_encoding"])
 
-    def _check_completeness(self, spec: dict[str, Any]) -> VerificationResult:
-        result = VerificationResult()
-        services = spec.get("services", [])
+    def load_batch(self, manifest_path: str | Path, result_paths: list[str | Path]) -> list[VerificationResult]:
+        manifest = read_manifest(manifest_path)
+        by_spec: dict[int, list[CheckOutcome]] = {i: [] for i in range(len(manifest.specs))}
+        for outcome in load_outcomes(manifest, read_results(result_paths)):
+            by_spec[outcome.task.spec_index].append(outcome)
+        return [self._merge_outcomes(spec, by_spec[i]) for i, spec in enumerate(manifest.specs)]
+
+    def verify_many(self, specs: list[dict[str, Any]]) -> list[VerificationResult]:
+        if self.budget_ms is not None:
+            outcomes = self._run_scheduled(specs)
+        elif self.parallel:
+            tasks = [task for i, spec in enumerate(specs) for task in self._plan_parallel(i, spec)]
+            services = [task for task in tasks if task.kind == SERVICE]
+            outcomes = join_outcomes(run_checks(
+                specs,
+                [task for task in tasks if task.kind != SERVICE],
+                self.timeout_ms,
+                self.max_workers,
+                self.cache,
+                self.session_options,
+                then=lambda done: _with_components(services, done),
+            ))
+        else:
+            outcomes = [o for i, spec in enumerate(specs) for o in self._run_sequential(i, spec)]
+
+        by_spec: dict[int, list[CheckOutcome]] = {i: [] for i in range(len(specs))}
+        for outcome in outcomes:
+            by_spec[outcome.task.spec_index].append(outcome)
+        return [self._merge_outcomes(spec, by_spec[i]) for i, spec in enumerate(specs)]
 
-        if not services:
-            result.warnings.append("No services for completeness check")
+    def _plan_checks(self, spec_index: int, spec: dict[str, Any]) -> list[CheckTask]:
+        tasks = [CheckTask(spec_index, CONSISTENCY)]
+        for service in spec.get("services", []):
+            tasks.append(CheckTask(spec_index, SERVICE, service.get("name", "")))
+        return tasks
 
-        for service in services:
-            sname = service.get("name", "")
+    def _plan_parallel(self, spec_index: int, spec: dict[str, Any]) -> list[CheckTask]:
+        tasks = self._plan_checks(spec_index, spec)
+        try:
+            n = len(translate_spec_to_z3(spec, self.session_options["decimal_encoding"]).components)
+        except Exception:
+            return tasks
+        if n < 2:
+            return tasks
+        # Independent invariant components are solved on separate workers and joined back into one consistency verdict.
+        return [CheckTask(spec_index, COMPONENT, str(c)) for c in range(n)] + tasks[1:]
+
+    def _run_sequential(
+        self, spec_index: int, spec: dict[str, Any], session: VerificationSession | None = None
+    ) -> list[CheckOutcome]:
+        tasks = self._plan_checks(spec_index, spec)
+        if session is None:
             try:
-                solver = build_service_solver(
-                    spec, sname, include_preconditions=True, timeout_ms=self.timeout_ms
-                )
-                z3_result = solver.check()
-
-                if z3_result == unsat:
-                    result.is_complete = False
-                    result.errors.append(
-                        f"Service «{sname}»: preconditions incompatible with invariants"
-                    )
-                elif z3_result == unknown:
-                    result.warnings.append(
-                        f"Service «{sname}»: could not verify within timeout"
-                    )
+                session = self.open_session(spec)
             except Exception as e:
-                result.warnings.append(f"Service «{sname}»: {e}")
+                return [CheckOutcome(tasks[0], "error", error=str(e))]
+
+        outcomes = []
+        for task in tasks:
+            outcomes.append(_run_task(session, task))
+            if task.kind == CONSISTENCY and outcomes[-1].status in ("unsat", "error"):
+                break
+        return outcomes
+
+    def _run_scheduled(
+        self, specs: list[dict[str, Any]], sessions: list[VerificationSession] | None = None
+    ) -> list[CheckOutcome]:
+        outcomes: list[CheckOutcome] = []
+        checks: list[ScheduledCheck] = []
+        for i, spec in enumerate(specs):
+            tasks = self._plan_checks(i, spec)
+            if sessions is not None:
+                session = sessions[i]
+            else:
+                try:
+                    session = self.open_session(spec)
+                except Exception as e:
+                    outcomes.append(CheckOutcome(tasks[0], "error", error=str(e)))
+                    continue
+            for task in tasks:
+                cost = 0
+                if task.kind == SERVICE:
+                    cost = 1 + sum(len(session.translation.sources.get(label, ""))
+                                   for label in session.translation.precondition_labels.get(task.target, []))
+                checks.append(ScheduledCheck(task, self._scheduled_runner(session, task), cost))
+
+        def blocked(check: ScheduledCheck, finished: dict[CheckTask, CheckOutcome]) -> bool:
+            if check.task.kind != SERVICE:
+                return False
+            consistency = finished.get(CheckTask(check.task.spec_index, CONSISTENCY))
+            return consistency is not None and consistency.status in ("unsat", "error")
+
+        scheduler = VerificationScheduler(self.budget_ms, self.initial_slice_ms, max_slice_ms=self.timeout_ms)
+        return outcomes + scheduler.run(checks, blocked)
+
+    def _scheduled_runner(self, session: VerificationSession, task: CheckTask) -> Any:
+        def run(timeout_ms: int) -> CheckOutcome:
+            return _run_task(session, task, timeout_ms)
+        return run
+
+    def _merge_outcomes(self, spec: dict[str, Any], outcomes: list[CheckOutcome]) -> VerificationResult:
+        result = VerificationResult()
+        for outcome in outcomes:
+            if outcome.stat is not None:
+                result.check_stats.append(outcome.stat)
+            if outcome.cache_hit is True:
+                result.cache_hits += 1
+            elif outcome.cache_hit is False:
+                result.cache_misses += 1
+            if outcome.task.kind == CONSISTENCY:
+                self._apply_consistency(result, outcome)
+
+        if result.is_consistent:
+            if not spec.get("services", []):
+                result.warnings.append("No services for completeness check")
+            for outcome in outcomes:
+                if outcome.task.kind == SERVICE:
+                    self._apply_service(result, outcome)
+            if self.instances is not None:
+                self._apply_transitions(result, spec)
 
         return result
+
+    def _apply_consistency(self, result: VerificationResult, outcome: CheckOutcome) -> None:
+        for where, expr, reason in outcome.payload or []:
+            result.warnings.append(f"{where}: expression not translated ({reason}): {expr}")
+        if outcome.status == "unsat":
+            result.is_consistent = False
+            result.errors.append("Invariants are inconsistent: no model exists")
+            if outcome.core:
+                result.conflicts["invariants"] = list(outcome.core)
+                result.counterexample = "Solver returned UNSAT — conflicting: " + "; ".join(outcome.core)
+            else:
+                result.counterexample = "Solver returned UNSAT — invariants are incompatible"
+        elif outcome.status == "unknown":
+            result.warnings.append("Z3 could not determine within timeout")
+        elif outcome.status == "error":
+            result.is_consistent = False
+            result.errors.append(f"Verification error: {outcome.error}")
+            result.counterexample = outcome.error
+
+    def _apply_service(self, result: VerificationResult, outcome: CheckOutcome) -> None:
+        sname = outcome.task.target
+        if outcome.status == "unsat":
+            result.is_complete = False
+            message = f"Service «{sname}»: preconditions incompatible with invariants"
+            if outcome.core:
+                result.conflicts[sname] = list(outcome.core)
+                message += " — conflicting: " + "; ".join(outcome.core)
+            result.errors.append(message)
+        elif outcome.status == "unknown":
+            result.warnings.append(f"Service «{sname}»: could not verify within timeout")
+        elif outcome.status == "error":
+            result.warnings.append(f"Service «{sname}»: {outcome.error}")
+
+    def _apply_transitions(self, result: VerificationResult, spec: dict[str, Any]) -> None:
+        try:
+            encoding = InstanceEncoding(spec, self.instances, self.session_options["decimal_encoding"])
+            transitions = encoding.check_all(self.timeout_ms)
+        except Exception as e:
+            result.warnings.append(f"Transition check error: {e}")
+            return
+        for where, expr, reason in encoding.untranslated:
+            result.warnings.append(f"{where}: invariant not checked across instances ({reason}): {expr}")
+        # Preconditions the consistency pass already could not translate are reported once per label.
+        reported = {w.partition(": ")[0] for w in result.warnings if ": expression not translated (" in w}
+        for transition in transitions:
+            sname = transition.service
+            for where, expr, reason in transition.untranslated:
+                if where not in reported:
+                    reported.add(where)
+                    result.warnings.append(f"{where}: expression not translated ({reason}): {expr}")
+            if transition.status == VIOLATED:
+                result.is_complete = False
+                result.violations[sname] = transition.violated
+                state = ", ".join(f"{k}={v}" for k, v in transition.counterexample.items())
+                result.errors.append(
+                    f"Service «{sname}» can break {', '.join(transition.violated)} with {self.instances} "
+                    f"instance(s) — e.g. {state}"
+                )
+            elif transition.status == UNKNOWN:
+                result.warnings.append(f"Service «{sname}»: transition could not be verified within timeout")
+
+
+def _with_components(services: list[CheckTask], outcomes: list[CheckOutcome]) -> list[CheckTask]:
+    # Service checks reuse the component verdicts of the first round instead of re-solving them per worker.
+    proven: dict[int, list[int]] = {}
+    failed = set()
+    for outcome in outcomes:
+        index = outcome.task.spec_index
+        if outcome.status in ("unsat", "error"):
+            failed.add(index)
+        elif outcome.status == "sat":
+            proven.setdefault(index, []).append(int(outcome.task.target) if outcome.task.kind == COMPONENT else 0)
+    return [
+        replace(task, components=tuple(proven.get(task.spec_index, ())))
+        for task in services
+        if task.spec_index not in failed
+    ]
+
+
+def _run_task(session: VerificationSession, task: CheckTask, timeout_ms: int | None = None) -> CheckOutcome:
+    try:
+        return session_outcome(session, task, timeout_ms)
+    except Exception as e:
+        # Running out of memory is the caller's problem (the daemon evicts and reports it), not a verdict.
+        if is_memout(e):
+            raise
+        return CheckOutcome(task, "error", error=str(e))
+
+
+async def _in_z3(fn: Callable[..., Any], *args: Any) -> Any:
+    future = _Z3_EXECUTOR.submit(fn, *args)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        _interrupt_until_done(asyncio.get_running_loop(), future)
+        raise
+
+
+def run_in_z3(fn: Callable[..., Any], *args: Any, timeout_ms: int | None = None) -> Any:
+    future = _Z3_EXECUTOR.submit(fn, *args)
+    try:
+        return future.result(timeout=timeout_ms / 1000.0 if timeout_ms is not None else None)
+    except FutureTimeoutError:
+        while not future.done():
+            main_ctx().interrupt()
+            wait([future], timeout=INTERRUPT_RETRY_S)
+        raise TimeoutError(f"Request exceeded {timeout_ms} ms") from None
+
+
+def _interrupt_until_done(loop: asyncio.AbstractEventLoop, future: Future) -> None:
+    if not future.done():
+        main_ctx().interrupt()
+        loop.call_later(INTERRUPT_RETRY_S, _interrupt_until_done, loop, future)
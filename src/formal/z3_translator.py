@@ -1,137 +1,299 @@
-import re
+import hashlib
+from collections import ChainMap
+from decimal import Decimal
 from typing import Any
 
-from z3 import And, Int, IntVal, Real, RealVal, Solver
+from z3 import And, BoolSort, Const, DeclareSort, Distinct, EnumSort, IntSort, RealSort, Solver
 
-from .smt_utils import create_solver, simple_invariant_to_z3
+from ..dsl.expressions import ExpressionSyntaxError
+from .expr_lowering import LoweringScope, UnsupportedExpression, Z3Lowerer
+from .slicing import ConstraintComponent, slice_formulas, touched_components
+from .smt_utils import create_solver, formula_signature, logic_for
+
+DEFAULT_DECIMAL_PRECISION = 18
+DEFAULT_DECIMAL_SCALE = 2
+INT64_MAX = 2**63 - 1
+DECIMAL_ENCODINGS = ("real", "fixed")
+# Seconds since the Unix epoch for 0001-01-01T00:00:00Z and 9999-12-31T23:59:59Z.
+TIMESTAMP_MIN = -62135596800
+TIMESTAMP_MAX = 253402300799
+UUID_SORT = DeclareSort("UUID")
+
+# Z3 refuses to redeclare an enumeration sort in the same context, so each declared sort is kept; names depend only
+# on the field and its values, which keeps digests and exported queries independent of what was translated before.
+_enum_sorts: dict[str, tuple[Any, dict[str, Any]]] = {}
 
 
 class Z3TranslationResult:
 
     def __init__(self) -> None:
         self.invariant_formulas: list[Any] = []
+        self.invariant_labels: list[str] = []
         self.precondition_formulas: dict[str, list[Any]] = {}
+        self.precondition_labels: dict[str, list[str]] = {}
+        self.sources: dict[str, str] = {}
         self.variables: dict[str, Any] = {}
         self.entity_vars: dict[str, dict[str, Any]] = {}
+        self.untranslated: list[tuple[str, str, str]] = []
+        self.service_vars: dict[str, dict[str, Any]] = {}
+        self.entity_scopes: dict[str, LoweringScope] = {}
+        self.service_scopes: dict[str, LoweringScope] = {}
+        self.strings: dict[str, int] = {}
+        self.invariant_symbols: list[frozenset[str]] = []
+        self.invariant_features: list[frozenset[str]] = []
+        self.precondition_features: dict[str, frozenset[str]] = {}
+        self.logic = "QF_UF"
+        self.components: list[ConstraintComponent] = []
+        self.symbol_components: dict[str, int] = {}
+        self.precondition_components: dict[str, list[int]] = {}
+        self.decimal_encoding = "real"
+        self.scales: dict[str, int] | None = None
+        self.enums: dict[str, dict[str, Any]] = {}
+        self.open_enums = False
+        self.domain_labels: set[str] = set()
+
+    def component_formulas(self, index: int) -> list[Any]:
+        return [self.invariant_formulas[i] for i in self.components[index].formulas]
+
+    def invariant_indices(self, entity_name: str, expr: str) -> list[int]:
+        return [
+            i for i, label in enumerate(self.invariant_labels)
+            if label not in self.domain_labels and label.split(".", 1)[0] == entity_name and self.sources[label] == expr
+        ]
+
+    def query_logic(self, components: list[int], service_name: str | None = None) -> str:
+        features = set(self.precondition_features.get(service_name, ())) if service_name else set()
+        for c in components:
+            features |= self.components[c].features
+        return logic_for(features)
+
+
+def numeric_bounds(field: dict[str, Any]) -> tuple[Any, Any] | None:
+    ftype = field.get("type", "String").lower()
+    if ftype == "decimal":
+        precision, scale = _decimal_shape(field)
+        bound = Decimal(10) ** (precision - scale) - Decimal(10) ** (-scale)
+        return -bound, bound
+    if ftype in ("int", "int64", "integer"):
+        return -INT64_MAX - 1, INT64_MAX
+    return None
+
+
+def _decimal_shape(field: dict[str, Any]) -> tuple[int, int]:
+    precision = field.get("precision") or DEFAULT_DECIMAL_PRECISION
+    scale = field.get("scale") if field.get("scale") is not None else DEFAULT_DECIMAL_SCALE
+    return precision, scale
+
+
+def _enum_sort(name: str, values: list[str]) -> tuple[Any, dict[str, Any]]:
+    digest = hashlib.sha256("\0".join(values).encode("utf-8")).hexdigest()[:8]
+    sort_name = f"{name}_enum_{digest}"
+    entry = _enum_sorts.get(sort_name)
+    if entry is None:
+        sort, constants = EnumSort(sort_name, [f"{name}.{v}" for v in values])
+        entry = _enum_sorts[sort_name] = sort, dict(zip(values, constants))
+    return entry
+
+
+def _open_enum_sort(name: str, values: list[str]) -> tuple[Any, dict[str, Any]]:
+    digest = hashlib.sha256("\0".join(values).encode("utf-8")).hexdigest()[:8]
+    sort = DeclareSort(f"{name}_open_{digest}")
+    return sort, {v: Const(f"{name}.{v}", sort) for v in values}
 
 
-def _parse_simple_comparison(expr: str, vars_ctx: dict[str, Any]) -> Any | None:
-    expr = expr.strip()
-    patterns = [
-        (r"(\w+)\s*>=\s*(\d+(?:\.\d+)?)", ">=", True),
-        (r"(\w+)\s*<=\s*(\d+(?:\.\d+)?)", "<=", True),
-        (r"(\w+)\s*>\s*(\d+(?:\.\d+)?)", ">", True),
-        (r"(\w+)\s*<\s*(\d+(?:\.\d+)?)", "<", True),
-        (r"(\w+)\s*==\s*(\d+(?:\.\d+)?)", "==", True),
-        (r"(\w+)\s*!=\s*(\w+)", "!=", False),
-        (r"(\w+)\s*==\s*(\w+)", "==", False),
-    ]
-    for pattern, op, right_is_num in patterns:
-        m = re.match(pattern, expr)
-        if m:
-            left_name, right_str = m.group(1), m.group(2)
-            if left_name not in vars_ctx:
-                vars_ctx[left_name] = Real(left_name) if "." in right_str else Int(left_name)
-            left = vars_ctx[left_name]
-            if right_is_num:
-                try:
-                    right = RealVal(float(right_str)) if "." in right_str else IntVal(int(right_str))
-                except ValueError:
-                    right = IntVal(0)
-            else:
-                right = vars_ctx.get(right_str, Int(right_str))
-            if op == ">=":
-                return left >= right
-            if op == "<=":
-                return left <= right
-            if op == ">":
-                return left > right
-            if op == "<":
-                return left < right
-            if op == "==":
-                return left == right
-            if op == "!=":
-                return left != right
+def field_sort(var_name: str, field: dict[str, Any], result: Z3TranslationResult) -> Any:
+    type_name = field.get("type", "String").lower()
+    if type_name == "enum" and field.get("values"):
+        make = _open_enum_sort if result.open_enums else _enum_sort
+        sort, constants = make(var_name, list(dict.fromkeys(field["values"])))
+        result.enums[str(sort)] = constants
+        return sort
+    if type_name in ("boolean", "bool"):
+        return BoolSort()
+    if type_name == "uuid":
+        return UUID_SORT
+    if type_name in ("real", "float") or (type_name == "decimal" and result.scales is None):
+        return RealSort()
+    if type_name == "decimal":
+        result.scales[var_name] = _decimal_shape(field)[1]
+    return IntSort()
+
+
+def _declare(var_name: str, field: dict[str, Any], result: Z3TranslationResult) -> Any:
+    return Const(var_name, field_sort(var_name, field, result))
+
+
+def field_range(var: Any, field: dict[str, Any], fixed: bool) -> tuple[Any, str] | None:
+    type_name = field.get("type", "String").lower()
+    if type_name == "timestamp":
+        return And(var >= TIMESTAMP_MIN, var <= TIMESTAMP_MAX), "TIMESTAMP"
+    if not fixed:
+        return None
+    if type_name == "decimal":
+        precision, scale = _decimal_shape(field)
+        limit = 10**precision - 1
+        return And(var >= -limit, var <= limit), f"DECIMAL({precision},{scale})"
+    if type_name in ("int", "int64", "integer"):
+        return And(var >= -INT64_MAX - 1, var <= INT64_MAX), "BIGINT"
     return None
 
 
-def translate_spec_to_z3(spec: dict[str, Any]) -> Z3TranslationResult:
+def translate_spec_to_z3(
+    spec: dict[str, Any], decimal_encoding: str = "real", open_enums: bool = False
+) -> Z3TranslationResult:
+    if decimal_encoding not in DECIMAL_ENCODINGS:
+        raise ValueError(f"Unknown decimal encoding {decimal_encoding!r}, expected one of {DECIMAL_ENCODINGS}")
     result = Z3TranslationResult()
+    result.decimal_encoding = decimal_encoding
+    result.open_enums = open_enums
+    if decimal_encoding == "fixed":
+        result.scales = {}
     vars_ctx = result.variables
+    free: dict[str, Any] = {}
+    strings = result.strings
 
-    for entity in spec.get("entities", []):
+    entities = spec.get("entities", [])
+    for entity in entities:
         entity_name = entity.get("name", "")
         entity_vars: dict[str, Any] = {}
         result.entity_vars[entity_name] = entity_vars
 
         for field in entity.get("fields", []):
             fname = field.get("name", "")
-            ftype = field.get("type", "String").lower()
             var_name = f"{entity_name}_{fname}" if entity_name else fname
-            if ftype in ("decimal", "real", "float"):
-                entity_vars[fname] = Real(var_name)
-                vars_ctx[var_name] = entity_vars[fname]
-            elif ftype in ("int", "integer", "int64"):
-                entity_vars[fname] = Int(var_name)
-                vars_ctx[var_name] = entity_vars[fname]
-            else:
-                entity_vars[fname] = Int(var_name)
-                vars_ctx[var_name] = entity_vars[fname]
+            entity_vars[fname] = _declare(var_name, field, result)
+            vars_ctx[var_name] = entity_vars[fname]
 
+    for entity in entities:
+        entity_name = entity.get("name", "")
+        scope = LoweringScope(
+            names=ChainMap(result.entity_vars[entity_name], vars_ctx),
+            entity_fields=result.entity_vars,
+            free=free,
+            strings=strings,
+            scales=result.scales,
+            enums=result.enums,
+        )
+        result.entity_scopes[entity_name] = scope
+        lowerer = Z3Lowerer(scope)
         for inv in entity.get("invariants", []):
             expr = inv.get("expr", inv.get("expression", ""))
             if expr:
-                inv_ctx = {**vars_ctx, **entity_vars}
-                formula = _parse_simple_comparison(expr, inv_ctx)
-                if formula is None:
-                    formula = simple_invariant_to_z3(expr, entity_vars)
+                where = f"{entity_name}.{inv.get('name', '')}"
+                formula = _lower(lowerer, expr, where, result)
                 if formula is not None:
                     result.invariant_formulas.append(formula)
+                    result.invariant_labels.append(where)
+                    result.sources[where] = expr
+        for field in entity.get("fields", []):
+            var = result.entity_vars[entity_name][field.get("name", "")]
+            bounded = field_range(var, field, result.scales is not None)
+            if bounded is not None:
+                where = f"{entity_name}.{field.get('name', '')}:range"
+                result.invariant_formulas.append(bounded[0])
+                result.invariant_labels.append(where)
+                result.sources[where] = bounded[1]
+                result.domain_labels.add(where)
+            values = result.enums.get(str(var.sort())) if open_enums else None
+            if values is not None and len(values) > 1:
+                # Go enums are open strings: only the distinctness of the named values is known.
+                where = f"{entity_name}.{field.get('name', '')}:values"
+                result.invariant_formulas.append(Distinct(*values.values()))
+                result.invariant_labels.append(where)
+                result.sources[where] = "DISTINCT"
+                result.domain_labels.add(where)
+
+    signatures = [formula_signature(f) for f in result.invariant_formulas]
+    result.invariant_symbols = [symbols for symbols, _ in signatures]
+    result.invariant_features = [features for _, features in signatures]
+    result.components, result.symbol_components = slice_formulas(result.invariant_symbols)
+    for component in result.components:
+        for i in component.formulas:
+            component.features |= result.invariant_features[i]
 
     for service in spec.get("services", []):
         sname = service.get("name", "")
         pre_formulas: list[Any] = []
+        pre_labels: list[str] = []
+        inputs: dict[str, Any] = {}
 
         for inp in service.get("inputs", []):
             iname = inp.get("name", "")
-            itype = inp.get("type", "String").lower()
             var_name = f"{sname}_{iname}"
-            if itype in ("decimal", "real", "float"):
-                vars_ctx[var_name] = Real(var_name)
-            else:
-                vars_ctx[var_name] = Int(var_name)
+            inputs[iname] = _declare(var_name, inp, result)
+            vars_ctx[var_name] = inputs[iname]
 
-        for pre in service.get("preconditions", []):
+        scope = LoweringScope(
+            names=ChainMap(inputs, vars_ctx),
+            entity_fields=result.entity_vars,
+            free=free,
+            strings=strings,
+            scales=result.scales,
+            enums=result.enums,
+        )
+        result.service_vars[sname] = inputs
+        result.service_scopes[sname] = scope
+        lowerer = Z3Lowerer(scope)
+        for i, pre in enumerate(service.get("preconditions", [])):
             if isinstance(pre, str):
-                formula = _parse_simple_comparison(pre, vars_ctx)
+                where = f"{sname}.pre[{i}]"
+                formula = _lower(lowerer, pre, where, result)
                 if formula is not None:
                     pre_formulas.append(formula)
-                else:
-                    for entity_name, entity_vars in result.entity_vars.items():
-                        if f"{entity_name}(" in pre:
-                            for fname, var in entity_vars.items():
-                                if fname in pre:
-                                    formula = _parse_simple_comparison(
-                                        pre.replace(f"{entity_name}(", "").replace(")", "").replace(".", "_"),
-                                        {**vars_ctx, **entity_vars},
-                                    )
-                                    if formula is not None:
-                                        pre_formulas.append(formula)
-                                    break
+                    pre_labels.append(where)
+                    result.sources[where] = pre
+        for inp in service.get("inputs", []):
+            bounded = field_range(inputs[inp.get("name", "")], inp, result.scales is not None)
+            if bounded is not None:
+                where = f"{sname}.{inp.get('name', '')}:range"
+                pre_formulas.append(bounded[0])
+                pre_labels.append(where)
+                result.sources[where] = bounded[1]
+                result.domain_labels.add(where)
 
         result.precondition_formulas[sname] = pre_formulas
+        result.precondition_labels[sname] = pre_labels
+        pre_symbols: set[str] = set()
+        pre_features: set[str] = set()
+        for f in pre_formulas:
+            symbols, features = formula_signature(f)
+            pre_symbols |= symbols
+            pre_features |= features
+        result.precondition_components[sname] = touched_components(pre_symbols, result.symbol_components)
+        result.precondition_features[sname] = frozenset(pre_features)
 
+    all_features = set().union(*result.invariant_features, *result.precondition_features.values())
+    result.logic = logic_for(all_features)
     return result
 
 
+def _lower(lowerer: Z3Lowerer, expr: str, where: str, result: Z3TranslationResult) -> Any | None:
+    try:
+        return lowerer.lower_bool(expr)
+    except (ExpressionSyntaxError, UnsupportedExpression) as e:
+        result.untranslated.append((where, expr, str(e)))
+        return None
+
+
 def build_consistency_solver(spec: dict[str, Any], timeout_ms: int = 5000) -> Solver:
     result = translate_spec_to_z3(spec)
-    solver = create_solver(timeout_ms)
+    solver = create_solver(timeout_ms, result.query_logic(list(range(len(result.components)))), incremental=False)
     for f in result.invariant_formulas:
         solver.add(f)
     return solver
 
 
+def build_component_solvers(spec: dict[str, Any], timeout_ms: int = 5000) -> list[Solver]:
+    result = translate_spec_to_z3(spec)
+    solvers = []
+    for i in range(len(result.components)):
+        solver = create_solver(timeout_ms, result.query_logic([i]), incremental=False)
+        for f in result.component_formulas(i):
+            solver.add(f)
+        solvers.append(solver)
+    return solvers
+
+
 def build_service_solver(
     spec: dict[str, Any],
     service_name: str,
@@ -139,7 +301,8 @@ def build_service_solver(
     timeout_ms: int = 5000,
 ) -> Solver:
     result = translate_spec_to_z3(spec)
-    solver = create_solver(timeout_ms)
+    logic = result.query_logic(list(range(len(result.components))), service_name if include_preconditions else None)
+    solver = create_solver(timeout_ms, logic, incremental=False)
     for f in result.invariant_formulas:
         solver.add(f)
     if include_preconditions and service_name in result.precondition_formulas:
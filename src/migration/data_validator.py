@@ -1,5 +1,33 @@
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
 from typing import Any
 
+from ..dsl.expressions import (
+    Binary,
+    BoolLit,
+    BoolOp,
+    Compare,
+    DecimalLit,
+    Expr,
+    ExpressionSyntaxError,
+    IntLit,
+    Membership,
+    Name,
+    NullLit,
+    SetLit,
+    StringLit,
+    Unary,
+    _node,
+    parse_expr,
+    walk,
+)
+from ..dsl.spec_index import SpecIndex
+from ..formal.expr_lowering import UnsupportedExpression
+from ..formal.model_enumeration import ModelEnumerator
+from .diff_analyzer import SpecDiff, compute_diff
+from .sql_migrator import _table_name, _to_snake
+
 
 def generate_validation_script(spec: dict[str, Any]) -> str:
     entities = spec.get("entities", [])
@@ -17,3 +45,208 @@ def generate_validation_script(spec: dict[str, Any]) -> str:
         "}",
     ]
     return "\n".join(lines)
+
+
+SAFE = "safe"
+UNSAFE = "unsafe"
+UNKNOWN = "unknown"
+
+_INVERSE = {"==": "!=", "!=": "==", "<": ">=", ">=": "<", ">": "<=", "<=": ">"}
+_SQL_OPS = {"==": "=", "!=": "<>"}
+_UNSCANNED_TYPES = ("uuid", "timestamp")
+
+
+@dataclass
+class InvariantSafety:
+    entity: str
+    invariant: str
+    expr: str
+    status: str
+    table: str = ""
+    counterexample: dict[str, Any] = field(default_factory=dict)
+    sql_predicate: str | None = None
+    reason: str | None = None
+
+    @property
+    def requires_scan(self) -> bool:
+        return self.status != SAFE
+
+    def violation_query(self) -> str | None:
+        if self.sql_predicate is None:
+            return None
+        return f"SELECT * FROM {self.table} WHERE {self.sql_predicate};"
+
+
+def _nnf(expr: Expr, negated: bool = False) -> Expr:
+    if isinstance(expr, Unary) and expr.op == "not":
+        return _nnf(expr.operand, not negated)
+    if isinstance(expr, BoolOp):
+        op = {"and": "or", "or": "and"}[expr.op] if negated else expr.op
+        return _node(BoolOp, op, tuple(_nnf(o, negated) for o in expr.operands))
+    if not negated:
+        return expr
+    if isinstance(expr, Compare):
+        return _node(Compare, _INVERSE[expr.op], expr.left, expr.right)
+    if isinstance(expr, Membership):
+        return _node(Membership, expr.value, expr.container, not expr.negated)
+    if isinstance(expr, BoolLit):
+        return _node(BoolLit, not expr.value)
+    return _node(Unary, "not", expr)
+
+
+def _disjuncts(expr: Expr) -> list[Expr]:
+    if isinstance(expr, BoolOp) and expr.op == "or":
+        return [d for o in expr.operands for d in _disjuncts(o)]
+    return [expr]
+
+
+def _is_integer(expr: Expr, integers: set[str]) -> bool:
+    if isinstance(expr, IntLit):
+        return True
+    if isinstance(expr, Name):
+        return expr.id in integers
+    if isinstance(expr, Unary) and expr.op == "-":
+        return _is_integer(expr.operand, integers)
+    if isinstance(expr, Binary):
+        return _is_integer(expr.left, integers) and _is_integer(expr.right, integers)
+    return False
+
+
+def _sql(expr: Expr, columns: dict[str, str], integers: set[str]) -> str:
+    if isinstance(expr, BoolOp):
+        return "(" + f" {expr.op.upper()} ".join(_sql(o, columns, integers) for o in expr.operands) + ")"
+    if isinstance(expr, Unary):
+        inner = _sql(expr.operand, columns, integers)
+        return f"NOT ({inner})" if expr.op == "not" else f"{expr.op}{inner}"
+    if isinstance(expr, Compare):
+        for value, other in ((expr.left, expr.right), (expr.right, expr.left)):
+            if isinstance(other, NullLit) and expr.op in ("==", "!="):
+                return f"{_sql(value, columns, integers)} IS {'NOT ' if expr.op == '!=' else ''}NULL"
+        left, right = _sql(expr.left, columns, integers), _sql(expr.right, columns, integers)
+        return _unknown_is_violation(expr, f"{left} {_SQL_OPS.get(expr.op, expr.op)} {right}", columns)
+    if isinstance(expr, Membership) and isinstance(expr.container, SetLit):
+        items = ", ".join(_sql(i, columns, integers) for i in expr.container.items)
+        atom = f"{_sql(expr.value, columns, integers)} {'NOT IN' if expr.negated else 'IN'} ({items})"
+        return _unknown_is_violation(expr, atom, columns)
+    if isinstance(expr, Binary):
+        left, right = _sql(expr.left, columns, integers), _sql(expr.right, columns, integers)
+        if expr.op in ("/", "%") and _is_integer(expr, integers):
+            # Z3 integer div/mod are Euclidean; SQL truncates toward zero and fails on a zero divisor.
+            divisor = f"NULLIF(ABS({right}), 0)"
+            if expr.op == "/":
+                return f"(SIGN({right}) * FLOOR(CAST({left} AS NUMERIC) / {divisor}))"
+            return f"MOD(MOD({left}, {divisor}) + {divisor}, {divisor})"
+        if expr.op == "/":
+            return f"(CAST({left} AS NUMERIC) / NULLIF({right}, 0))"
+        return f"({left} {expr.op} {right})"
+    if isinstance(expr, Name):
+        return columns.get(expr.id) or "'" + expr.id.replace("'", "''") + "'"
+    if isinstance(expr, (IntLit, DecimalLit)):
+        return str(expr.value)
+    if isinstance(expr, StringLit):
+        return "'" + expr.value.replace("'", "''") + "'"
+    if isinstance(expr, BoolLit):
+        return "TRUE" if expr.value else "FALSE"
+    if isinstance(expr, NullLit):
+        return "NULL"
+    raise UnsupportedExpression(f"{type(expr).__name__} has no SQL rendering")
+
+
+def _unknown_is_violation(expr: Expr, atom: str, columns: dict[str, str]) -> str:
+    # The solver never assigns NULL, so a NULL column (or zero divisor) cannot be shown to satisfy the invariant.
+    if any(isinstance(n, Name) and n.id in columns or isinstance(n, Binary) and n.op in ("/", "%") for n in walk(expr)):
+        return f"COALESCE({atom}, TRUE)"
+    return atom
+
+
+def _existing_rows_spec(
+    spec_v1: dict[str, Any], index_v2: SpecIndex
+) -> tuple[dict[str, Any], dict[str, list[str]]]:
+    entities_v2 = index_v2.entities
+    entities = []
+    defaults: dict[str, list[str]] = {}
+    for e1 in spec_v1.get("entities", []):
+        name = e1["name"]
+        fields = list(e1.get("fields", []))
+        known = {f["name"] for f in fields}
+        defaults[name] = []
+        for f in entities_v2.get(name, {}).get("fields", []):
+            if f["name"] in known:
+                continue
+            fields.append(f)
+            default = f.get("default")
+            if isinstance(default, (int, float, Decimal)) and not isinstance(default, bool):
+                defaults[name].append(f"{f['name']} == {default}")
+            elif isinstance(default, str):
+                defaults[name].append(f"{f['name']} == {json.dumps(default)}")
+        entities.append({**e1, "fields": fields})
+    return {"entities": entities}, defaults
+
+
+def check_invariant_safety(
+    spec_v1: dict[str, Any],
+    spec_v2: dict[str, Any],
+    diff: SpecDiff | None = None,
+    timeout_ms: int = 5000,
+) -> list[InvariantSafety]:
+    index_v2 = SpecIndex(spec_v2)
+    diff = diff or compute_diff(spec_v1, spec_v2, index_v2=index_v2)
+    changed = {(c.entity, c.name) for c in diff.invariant_changes if c.action != "removed"}
+    if not changed:
+        return []
+    merged, defaults = _existing_rows_spec(spec_v1, index_v2)
+    enumerator = ModelEnumerator(merged, timeout_ms)
+    fields = {e["name"]: e["fields"] for e in merged["entities"]}
+
+    results = []
+    for name, entity in index_v2.entities.items():
+        if name not in fields:
+            continue
+        for inv in entity.get("invariants", []):
+            expr = inv.get("expr", inv.get("expression", ""))
+            key = inv.get("name") or expr
+            if (name, key) in changed:
+                results.append(_check_invariant(enumerator, name, key, expr, fields[name], defaults[name]))
+    return results
+
+
+def _check_invariant(
+    enumerator: ModelEnumerator,
+    entity: str,
+    invariant: str,
+    expr: str,
+    fields: list[dict[str, Any]],
+    defaults: list[str],
+) -> InvariantSafety:
+    safety = InvariantSafety(entity, invariant, expr, UNKNOWN, table=_table_name(entity))
+    project = [f["name"] for f in fields if f.get("type", "String").lower() not in _UNSCANNED_TYPES]
+    try:
+        violation = _nnf(parse_expr(expr), negated=True)
+        rows = list(enumerator.models(entity, limit=1, project=project, where=[violation, *defaults]))
+    except (ExpressionSyntaxError, UnsupportedExpression) as e:
+        safety.reason = str(e)
+        return safety
+    if enumerator.last_status == "unsat":
+        safety.status = SAFE
+        return safety
+    if not rows:
+        safety.reason = "solver could not decide within the timeout"
+        return safety
+
+    safety.status = UNSAFE
+    safety.counterexample = rows[0]
+    disjuncts = _disjuncts(violation)
+    if len(disjuncts) > 1:
+        reachable = []
+        for d in disjuncts:
+            list(enumerator.models(entity, limit=1, project=project, where=[d, *defaults]))
+            if enumerator.last_status != "unsat":
+                reachable.append(d)
+        disjuncts = reachable
+    columns = {f["name"]: _to_snake(f["name"]) for f in fields}
+    integers = {f["name"] for f in fields if f.get("type", "String").lower() in ("int", "int64", "integer")}
+    try:
+        safety.sql_predicate = " OR ".join(_sql(d, columns, integers) for d in disjuncts)
+    except UnsupportedExpression as e:
+        safety.reason = str(e)
+    return safety
@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from typing import Any
 
+from ..dsl.spec_index import SpecIndex
+
 
 @dataclass
 class FieldDiff:
@@ -11,27 +13,51 @@ class FieldDiff:
     new_value: Any = None
 
 
+@dataclass
+class InvariantDiff:
+    entity: str
+    name: str
+    action: str
+    old_expr: str | None = None
+    new_expr: str | None = None
+
+
 @dataclass
 class SpecDiff:
     added_entities: list[str] = field(default_factory=list)
     removed_entities: list[str] = field(default_factory=list)
     added_services: list[str] = field(default_factory=list)
     removed_services: list[str] = field(default_factory=list)
+    modified_services: list[str] = field(default_factory=list)
     field_changes: list[FieldDiff] = field(default_factory=list)
+    invariant_changes: list[InvariantDiff] = field(default_factory=list)
+
+
+def _invariant_exprs(entity: dict[str, Any]) -> dict[str, str]:
+    exprs = {}
+    for inv in entity.get("invariants", []):
+        expr = inv.get("expr", inv.get("expression", ""))
+        exprs[inv.get("name") or expr] = expr
+    return exprs
 
 
-def compute_diff(spec_v1: dict[str, Any], spec_v2: dict[str, Any]) -> SpecDiff:
+def compute_diff(
+    spec_v1: dict[str, Any],
+    spec_v2: dict[str, Any],
+    index_v1: SpecIndex | None = None,
+    index_v2: SpecIndex | None = None,
+) -> SpecDiff:
     diff = SpecDiff()
+    index_v1 = index_v1 or SpecIndex(spec_v1)
+    index_v2 = index_v2 or SpecIndex(spec_v2)
 
-    entities_v1 = {e["name"]: e for e in spec_v1.get("entities", [])}
-    entities_v2 = {e["name"]: e for e in spec_v2.get("entities", [])}
+    entities_v1, entities_v2 = index_v1.entities, index_v2.entities
     diff.added_entities = [n for n in entities_v2 if n not in entities_v1]
     diff.removed_entities = [n for n in entities_v1 if n not in entities_v2]
 
     for name in set(entities_v1) & set(entities_v2):
         e1, e2 = entities_v1[name], entities_v2[name]
-        fields1 = {f["name"]: f for f in e1.get("fields", [])}
-        fields2 = {f["name"]: f for f in e2.get("fields", [])}
+        fields1, fields2 = index_v1.fields[name], index_v2.fields[name]
         for fn in fields2:
             if fn not in fields1:
                 diff.field_changes.append(FieldDiff(entity=name, field=fn, action="added", new_value=fields2[fn]))
@@ -43,9 +69,24 @@ def compute_diff(spec_v1: dict[str, Any], spec_v2: dict[str, Any]) -> SpecDiff:
                     FieldDiff(entity=name, field=fn, action="modified", old_value=fields1[fn], new_value=fields2[fn])
                 )
 
-    services_v1 = {s["name"] for s in spec_v1.get("services", [])}
-    services_v2 = {s["name"] for s in spec_v2.get("services", [])}
+        invs1, invs2 = _invariant_exprs(e1), _invariant_exprs(e2)
+        for iname, expr in invs2.items():
+            if iname not in invs1:
+                diff.invariant_changes.append(InvariantDiff(entity=name, name=iname, action="added", new_expr=expr))
+            elif invs1[iname] != expr:
+                diff.invariant_changes.append(
+                    InvariantDiff(entity=name, name=iname, action="modified", old_expr=invs1[iname], new_expr=expr)
+                )
+        for iname, expr in invs1.items():
+            if iname not in invs2:
+                diff.invariant_changes.append(InvariantDiff(entity=name, name=iname, action="removed", old_expr=expr))
+
+    services_v1 = set(index_v1.services)
+    services_v2 = set(index_v2.services)
     diff.added_services = list(services_v2 - services_v1)
     diff.removed_services = list(services_v1 - services_v2)
+    diff.modified_services = [
+        n for n, service in index_v2.services.items() if n in services_v1 and index_v1.services[n] != service
+    ]
 
     return diff
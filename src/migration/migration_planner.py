@@ -1,7 +1,11 @@
 from typing import Any
 
+from .data_validator import UNSAFE, check_invariant_safety
 
-def can_migrate_data(diff: Any, spec_v2: dict[str, Any]) -> tuple[bool, list[str]]:
+
+def can_migrate_data(
+    diff: Any, spec_v2: dict[str, Any], spec_v1: dict[str, Any] | None = None
+) -> tuple[bool, list[str]]:
     errors = []
     for fc in diff.field_changes:
         if fc.action == "removed":
@@ -11,4 +15,13 @@ def can_migrate_data(diff: Any, spec_v2: dict[str, Any]) -> tuple[bool, list[str
             new_t = (fc.new_value or {}).get("type", "")
             if old_t != new_t:
                 errors.append(f"Type change {fc.entity}.{fc.field}: {old_t} -> {new_t}")
+    if spec_v1 is not None:
+        for safety in check_invariant_safety(spec_v1, spec_v2, diff):
+            where = f"{safety.entity}.{safety.invariant}"
+            if safety.status == UNSAFE:
+                message = f"Invariant {where} may be violated by existing rows, e.g. {safety.counterexample}"
+                query = safety.violation_query()
+                errors.append(message + (f"; find them with: {query}" if query else ""))
+            elif safety.requires_scan:
+                errors.append(f"Invariant {where} could not be proven for existing rows ({safety.reason}); scan required")
     return len(errors) == 0, errors
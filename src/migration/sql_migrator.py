@@ -1,6 +1,7 @@
 from pathlib import Path
 from typing import Any
 
+from ..dsl.spec_index import SpecIndex
 from .diff_analyzer import FieldDiff, SpecDiff, compute_diff
 
 
@@ -14,32 +15,33 @@ def _table_name(entity: str) -> str:
     return _to_snake(entity) + "s"
 
 
-def generate_migration_sql(diff: SpecDiff, spec_v2: dict[str, Any]) -> str:
+def generate_migration_sql(diff: SpecDiff, spec_v2: dict[str, Any], index_v2: SpecIndex | None = None) -> str:
     lines = ["BEGIN;", ""]
+    index_v2 = index_v2 or SpecIndex(spec_v2)
 
     for entity in diff.added_entities:
-        for e in spec_v2.get("entities", []):
-            if e["name"] == entity:
-                table = _table_name(entity)
-                cols = []
-                for f in e.get("fields", []):
-                    name = _to_snake(f.get("name", ""))
-                    ftype = f.get("type", "String")
-                    if ftype.lower() == "uuid":
-                        col_type = "UUID"
-                    elif ftype.lower() == "decimal":
-                        p, s = f.get("precision", 18), f.get("scale", 2)
-                        col_type = f"DECIMAL({p},{s})"
-                    elif ftype.lower() == "string":
-                        col_type = f"VARCHAR({f.get('length', 255)})"
-                    else:
-                        col_type = "VARCHAR(255)"
-                    cols.append(f"    {name} {col_type}")
-                lines.append(f"CREATE TABLE IF NOT EXISTS {table} (")
-                lines.append(",\n".join(cols))
-                lines.append(");")
-                lines.append("")
-                break
+        e = index_v2.entities.get(entity)
+        if e is None:
+            continue
+        table = _table_name(entity)
+        cols = []
+        for f in e.get("fields", []):
+            name = _to_snake(f.get("name", ""))
+            ftype = f.get("type", "String")
+            if ftype.lower() == "uuid":
+                col_type = "UUID"
+            elif ftype.lower() == "decimal":
+                p, s = f.get("precision", 18), f.get("scale", 2)
+                col_type = f"DECIMAL({p},{s})"
+            elif ftype.lower() == "string":
+                col_type = f"VARCHAR({f.get('length', 255)})"
+            else:
+                col_type = "VARCHAR(255)"
+            cols.append(f"    {name} {col_type}")
+        lines.append(f"CREATE TABLE IF NOT EXISTS {table} (")
+        lines.append(",\n".join(cols))
+        lines.append(");")
+        lines.append("")
 
     for fc in diff.field_changes:
         if fc.action == "added":
@@ -62,5 +64,6 @@ def generate_migration_sql(diff: SpecDiff, spec_v2: dict[str, Any]) -> str:
 
 
 def create_migration_file(spec_v1: dict[str, Any], spec_v2: dict[str, Any], version: str = "002") -> str:
-    diff = compute_diff(spec_v1, spec_v2)
-    return generate_migration_sql(diff, spec_v2)
+    index_v2 = SpecIndex(spec_v2)
+    diff = compute_diff(spec_v1, spec_v2, index_v2=index_v2)
+    return generate_migration_sql(diff, spec_v2, index_v2)
@@ -1,5 +1,17 @@
+import json
+from decimal import Decimal
 from typing import Any
 
+from src.codegen.go_checks import to_camel
+from src.codegen.go_emitter import checked_invariants
+from src.dsl.expressions import Compare, DecimalLit, ExpressionSyntaxError, IntLit, Name, parse_expr, walk
+from src.formal.expr_lowering import UnsupportedExpression
+from src.formal.model_enumeration import ModelEnumerator
+from src.formal.z3_translator import numeric_bounds
+
+VECTORS_PER_ENTITY = 8
+_FINITE_TYPES = ("enum", "boolean", "bool")
+
 
 def _to_snake(s: str) -> str:
     import re
@@ -7,67 +19,195 @@ def _to_snake(s: str) -> str:
     return re.sub("([a-z0-9])([A-Z])", r"\1_\2", s).lower()
 
 
-def generate_entity_property_test(entity: dict) -> str:
+def _testable_fields(entity: dict) -> list[dict]:
+    return [
+        f for f in entity.get("fields", [])
+        if f.get("type", "String").lower() not in ("uuid", "timestamp")
+    ]
+
+
+def _boundary_conditions(expr: str, fields: dict[str, dict]) -> list[tuple[str, Any, Any]]:
+    try:
+        tree = parse_expr(expr)
+    except ExpressionSyntaxError:
+        return []
+    bounds = []
+    for node in walk(tree):
+        if not isinstance(node, Compare):
+            continue
+        for name, literal in ((node.left, node.right), (node.right, node.left)):
+            if isinstance(name, Name) and name.id in fields and isinstance(literal, (IntLit, DecimalLit)):
+                field = fields[name.id]
+                step = Decimal(1) if field.get("type", "").lower() != "decimal" else Decimal(10) ** -(field.get("scale") or 2)
+                bounds.append((name.id, Decimal(literal.value), step))
+    return bounds
+
+
+def _invariant_fields(entity: dict, fields: dict[str, dict]) -> list[str]:
+    referenced: dict[str, None] = {}
+    for inv in entity.get("invariants", []):
+        try:
+            tree = parse_expr(inv.get("expr", inv.get("expression", "")))
+        except ExpressionSyntaxError:
+            continue
+        for node in walk(tree):
+            if isinstance(node, Name) and node.id in fields:
+                referenced[node.id] = None
+    return [name for name in fields if name in referenced]
+
+
+def _pin(fname: str, value: Any) -> str:
+    if isinstance(value, bool):
+        return fname if value else f"not {fname}"
+    return f"{fname} == {value}"
+
+
+def _collect(enumerator: ModelEnumerator, target: str, project: list[str], limit: int, **kwargs: Any) -> list[dict]:
+    try:
+        return list(enumerator.models(target, limit=limit, project=project, **kwargs))
+    except (ExpressionSyntaxError, UnsupportedExpression):
+        return []
+
+
+def generate_test_vectors(
+    entity: dict,
+    enumerator: ModelEnumerator | None = None,
+    limit: int = VECTORS_PER_ENTITY,
+) -> list[tuple[str, dict, bool]]:
     name = entity.get("name", "Entity")
-    has_balance = any(f.get("name") == "balance" for f in entity.get("fields", []))
-    has_status = any(f.get("name") == "status" for f in entity.get("fields", []))
-    status_values = []
-    for f in entity.get("fields", []):
-        if f.get("name") == "status" and f.get("values"):
-            status_values = f.get("values", [])
-            break
+    enumerator = enumerator or ModelEnumerator({"entities": [entity]})
+    fields = {f.get("name", ""): f for f in _testable_fields(entity)}
+    # Fields no invariant mentions cannot change Validate(); enumerating them only yields lookalike vectors.
+    project = _invariant_fields(entity, fields)
+    vectors: list[tuple[str, dict, bool]] = []
+    seen: set[tuple] = set()
+
+    def add(label: str, rows: list[dict], valid: bool) -> None:
+        for row in rows:
+            key = (valid, tuple(sorted(row.items())))
+            if key not in seen:
+                seen.add(key)
+                vectors.append((f"{label}_{len(vectors)}", row, valid))
+
     invariants = entity.get("invariants", [])
+    for inv in invariants:
+        for fname, value, step in _boundary_conditions(inv.get("expr", inv.get("expression", "")), fields):
+            for candidate in (value, value - step, value + step):
+                add("boundary", _collect(enumerator, name, project, 1, where=[f"{fname} == {candidate}"]), True)
+    for fname in project:
+        for extreme in numeric_bounds(fields[fname]) or ():
+            add("extreme", _collect(enumerator, name, project, 1, where=[f"{fname} == {extreme}"]), True)
+    # Numeric and string models differ by one step or one synthetic code, so free enumeration only walks the
+    # finite fields; every combination is then completed into one full vector.
+    finite = [f for f in project if fields[f].get("type", "String").lower() in _FINITE_TYPES]
+    for combo in _collect(enumerator, name, finite, limit) if finite else []:
+        pins = [_pin(fname, value) for fname, value in combo.items()]
+        add("valid", _collect(enumerator, name, project, 1, where=pins), True)
+    if not vectors:
+        add("valid", _collect(enumerator, name, project, 1), True)
+
+    for inv in checked_invariants(entity):
+        expr = inv.get("expr", inv.get("expression", ""))
+        if not expr:
+            continue
+        label = f"{name}.{inv.get('name', '')}"
+        violation = f"violates_{_to_snake(inv.get('name', 'invariant'))}"
+        for fname, value, step in _boundary_conditions(expr, fields):
+            for candidate in (value - step, value + step):
+                rows = _collect(
+                    enumerator, name, project, 1, where=[f"not ({expr})", f"{fname} == {candidate}"], relax=[label]
+                )
+                add(violation, rows, False)
+        add(violation, _collect(enumerator, name, project, 1, where=[f"not ({expr})"], relax=[label]), False)
+    return vectors
+
+
+def _go_literal(entity: dict, field: dict, value: Any, enum_field: dict | None) -> str:
+    ftype = field.get("type", "String").lower()
+    if ftype == "enum":
+        if enum_field is not None and field.get("name") == enum_field.get("name"):
+            return f"{entity.get('name', 'Entity')}{value}"
+        return json.dumps(str(value))
+    if ftype == "decimal":
+        return f'decimal.RequireFromString("{format(value, "f")}")'
+    if ftype in ("boolean", "bool"):
+        return "true" if value else "false"
+    if ftype in ("string", "str"):
+        return json.dumps(str(value))
+    return str(value)
+
+
+def generate_entity_property_test(
+    entity: dict,
+    enumerator: ModelEnumerator | None = None,
+    limit: int = VECTORS_PER_ENTITY,
+) -> str:
+    name = entity.get("name", "Entity")
+    fields = entity.get("fields", [])
+    enum_field = next((f for f in fields if f.get("type", "").lower() == "enum" and f.get("values")), None)
+    uuid_fields = [f for f in fields if f.get("type", "").lower() == "uuid"]
+    needs_decimal = any(f.get("type", "").lower() == "decimal" for f in _testable_fields(entity))
+    by_name = {f.get("name", ""): f for f in fields}
+
+    cases = []
+    for label, row, valid in generate_test_vectors(entity, enumerator, limit):
+        parts = [f"{to_camel(f.get('name', ''))}: uuid.New()" for f in uuid_fields]
+        parts += [
+            f"{to_camel(fname)}: {_go_literal(entity, by_name[fname], value, enum_field)}"
+            for fname, value in row.items()
+        ]
+        cases.append(f'        {{"{label}", {name}{{{", ".join(parts)}}}, {"true" if valid else "false"}}},')
+
+    imports = ['    "testing"']
+    if cases and uuid_fields:
+        imports.append('    "github.com/google/uuid"')
+    if cases and needs_decimal:
+        imports.append('    "github.com/shopspring/decimal"')
 
     lines = [
         "package entities",
         "",
         "import (",
-        '    "testing"',
-        '    "testing/quick"',
-        '    "github.com/google/uuid"',
-        '    "github.com/shopspring/decimal"',
+        *imports,
         ")",
         "",
         f"func Test{name}InvariantsHold(t *testing.T) {{",
     ]
-
-    if has_balance and any("balance" in inv.get("expr", "") and ">=" in inv.get("expr", "") for inv in invariants):
-        struct_fields = ["ID: uuid.New()", "Balance: decimal.NewFromInt(balance)"]
-        if has_status and status_values:
-            struct_fields.append(f"Status: {name}{status_values[0]}")
-        lines.extend([
-            "    f := func(balance int64) bool {",
-            f"        e := {name}{{",
-            "            " + ",\n            ".join(struct_fields),
-            "        }",
-            "        ",
-            "        err := e.Validate()",
-            "        ",
-            "        if balance >= 0 {",
-            "            return err == nil",
-            "        }",
-            "        return err != nil",
-            "    }",
-            "    ",
-            "    if err := quick.Check(f, nil); err != nil {",
-            "        t.Error(err)",
-            "    }",
-            "}",
-        ])
-    else:
+    if not cases:
         lines.extend([
             f"    e := {name}{{}}",
             "    _ = e.Validate()",
             "}",
         ])
+        return "\n".join(lines)
 
+    lines.extend([
+        "    cases := []struct {",
+        "        name  string",
+        f"        e     {name}",
+        "        valid bool",
+        "    }{",
+        *cases,
+        "    }",
+        "    for _, tc := range cases {",
+        "        err := tc.e.Validate()",
+        "        if tc.valid && err != nil {",
+        '            t.Errorf("%s: unexpected error: %v", tc.name, err)',
+        "        }",
+        "        if !tc.valid && err == nil {",
+        '            t.Errorf("%s: expected an invariant violation", tc.name)',
+        "        }",
+        "    }",
+        "}",
+    ])
     return "\n".join(lines)
 
 
 def generate_all_property_tests(spec: dict[str, Any]) -> dict[str, str]:
     result = {}
+    enumerator = ModelEnumerator(spec)
     for entity in spec.get("entities", []):
         name = entity.get("name", "Entity")
-        content = generate_entity_property_test(entity)
+        content = generate_entity_property_test(entity, enumerator)
         result[f"{_to_snake(name)}_property_test.go"] = content
     return result
@@ -1,4 +1,5 @@
 import pytest
+from decimal import Decimal
 from pathlib import Path
 
 import sys
@@ -83,3 +84,1124 @@ def test_migration_diff():
     diff = compute_diff(spec_v1, spec_v2)
     assert len(diff.field_changes) >= 1
     assert any(fc.field == "currency" and fc.action == "added" for fc in diff.field_changes)
+
+
+def test_verification_session_matches_per_service_solvers():
+    from src.formal.session import VerificationSession
+    from src.formal.z3_translator import build_service_solver
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    spec = load_spec(spec_path)
+    spec["services"].append({"name": "Overdraw", "inputs": [], "preconditions": ["amount > 0", "amount < 0"]})
+    session = VerificationSession(spec)
+    for service in spec["services"]:
+        expected = build_service_solver(spec, service["name"]).check()
+        assert session.check_service(service["name"]) == expected
+
+    result = FormalVerifier().verify(spec)
+    assert result.is_consistent
+    assert not result.is_complete
+    assert any("Overdraw" in e for e in result.errors)
+
+
+def test_parallel_verification_matches_sequential():
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    good = load_spec(spec_path)
+    bad = load_spec(spec_path)
+    bad["services"][1]["preconditions"] += ["amount < 0"]
+    broken = {"entities": [{"name": "A", "fields": [{"name": "x", "type": "Int"}],
+                            "invariants": [{"name": "lo", "expr": "x > 5"}, {"name": "hi", "expr": "x < 2"}]}]}
+    specs = [good, bad, broken]
+
+    sequential = FormalVerifier().verify_many(specs)
+    parallel = FormalVerifier(parallel=True, max_workers=2).verify_many(specs)
+    assert parallel == sequential
+    assert [r.is_consistent for r in parallel] == [True, True, False]
+    assert [r.is_complete for r in parallel] == [True, False, True]
+
+
+def test_service_checks_reuse_known_component_verdicts(monkeypatch):
+    from src.formal.parallel import CheckTask, session_outcome
+    from src.formal.session import VerificationSession
+
+    spec = {"name": "S", "entities": [
+        {"name": "A", "fields": [{"name": "x", "type": "Int"}], "invariants": [{"name": "p", "expr": "x > 0"}]},
+        {"name": "B", "fields": [{"name": "y", "type": "Int"}], "invariants": [{"name": "q", "expr": "y > 0"}]},
+    ], "services": [{"name": "Bump", "inputs": [{"name": "n", "type": "Int"}], "preconditions": ["n > 0"]}]}
+    session = VerificationSession(spec)
+    session.assume_satisfiable((0, 1))
+
+    def fail(*args):
+        raise AssertionError("component re-solved")
+
+    monkeypatch.setattr(session, "_check_component", fail)
+    assert session_outcome(session, CheckTask(0, "service", "Bump", components=(0, 1))).status == "sat"
+
+
+def test_verdict_cache_reuses_unchanged_checks(tmp_path):
+    from src.formal.verdict_cache import VerdictCache
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    spec = load_spec(spec_path)
+    cache = VerdictCache(tmp_path / "verdicts")
+
+    first = FormalVerifier(cache=cache).verify(spec)
+    assert (first.cache_hits, first.cache_misses) == (0, 3)
+
+    spec["services"][1]["preconditions"].append("amount <= 1000")
+    second = FormalVerifier(cache=cache).verify(spec)
+    assert (second.cache_hits, second.cache_misses) == (2, 1)
+    assert second.is_consistent and second.is_complete
+
+    assert FormalVerifier(timeout_ms=1000, cache=cache).verify(spec).cache_hits == 0
+
+
+def test_verdict_cache_names_cores_from_current_spec(tmp_path):
+    from src.formal.verdict_cache import VerdictCache
+
+    cache = VerdictCache(tmp_path / "verdicts")
+    spec = {"name": "S", "entities": [{
+        "name": "A", "fields": [{"name": "x", "type": "Int"}],
+        "invariants": [{"name": "low", "expr": "x > 5"}, {"name": "high", "expr": "x < 3"}],
+    }], "services": []}
+    assert FormalVerifier(cache=cache).verify(spec).conflicts["invariants"] == ["A.low: x > 5", "A.high: x < 3"]
+
+    spec["entities"][0]["invariants"] = [{"name": "upper", "expr": "x < 3"}, {"name": "lower", "expr": "x > 5"}]
+    result = FormalVerifier(cache=cache).verify(spec)
+    assert result.cache_hits == 1
+    assert result.conflicts["invariants"] == ["A.upper: x < 3", "A.lower: x > 5"]
+
+
+def test_verdict_cache_evicts_least_recently_used(tmp_path):
+    from src.formal.verdict_cache import Verdict, VerdictCache
+
+    cache = VerdictCache(tmp_path, max_bytes=400)
+    for i in range(10):
+        cache.put(f"k{i}", Verdict(status="sat", model={"x": str(i)}))
+    assert cache.get("k9") is not None
+    assert cache.get("k0") is None
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.json")) <= 400
+
+
+def test_expression_parser_builds_interned_ast():
+    from src.dsl.expressions import BoolOp, ExpressionSyntaxError, FieldRef, Membership, parse_expr
+
+    expr = parse_expr("Wallet(from_wallet_id).balance >= amount and status in {Active, Frozen} or not x < 2")
+    assert isinstance(expr, BoolOp) and expr.op == "or"
+    assert parse_expr("a>=0") is parse_expr("a >= 0")
+    ref = parse_expr("Wallet(w).balance > 0").left
+    assert isinstance(ref, FieldRef) and (ref.entity, ref.field) == ("Wallet", "balance")
+    assert isinstance(parse_expr("currency not in ['USD', 'EUR']"), Membership)
+    with pytest.raises(ExpressionSyntaxError):
+        parse_expr("balance >= ")
+
+
+def test_expression_caches_are_bounded(monkeypatch):
+    from src.dsl import expressions
+
+    monkeypatch.setattr(expressions, "PARSE_CACHE_SIZE", 8)
+    kept = expressions.parse_expr("evicted_name > 0")
+    for i in range(20):
+        expressions.parse_expr(f"bounded_{i} > {i}")
+    assert len(expressions._parsed) == 8
+    assert expressions.parse_expr("evicted_name > 0") is kept
+    del kept
+    names = {node.id for node in expressions._interned.values() if isinstance(node, expressions.Name)}
+    assert "bounded_0" not in names and "bounded_19" in names
+
+
+def test_translator_lowers_compound_expressions():
+    from z3 import Solver, unsat
+
+    from src.formal.z3_translator import translate_spec_to_z3
+
+    spec = {
+        "entities": [{
+            "name": "Account",
+            "fields": [{"name": "balance", "type": "Decimal"}, {"name": "limit", "type": "Int"}],
+            "invariants": [
+                {"name": "bounded", "expr": "balance >= 0 and balance <= limit * 2"},
+                {"name": "tier", "expr": "limit in {100, 200}"},
+            ],
+        }],
+        "services": [{
+            "name": "Withdraw",
+            "inputs": [{"name": "amount", "type": "Decimal"}],
+            "preconditions": ["amount > 0", "Account(a).balance - amount > 400", "amount in KNOWN_AMOUNTS"],
+        }],
+    }
+    result = translate_spec_to_z3(spec)
+    assert len(result.invariant_formulas) == 2
+    assert len(result.precondition_formulas["Withdraw"]) == 2
+    assert [u[0] for u in result.untranslated] == ["Withdraw.pre[2]"]
+
+    solver = Solver()
+    solver.add(*result.invariant_formulas, *result.precondition_formulas["Withdraw"])
+    assert solver.check() == unsat
+
+
+def test_unsat_core_names_conflicting_invariants_and_preconditions():
+    spec = {
+        "entities": [
+            {"name": "A", "fields": [{"name": "x", "type": "Int"}, {"name": "y", "type": "Int"}],
+             "invariants": [
+                 {"name": "x_low", "expr": "x > 5"},
+                 {"name": "y_pos", "expr": "y >= 0"},
+                 {"name": "x_high", "expr": "x < 2 or y < 0"},
+             ]},
+        ],
+    }
+    for minimize in (False, True):
+        result = FormalVerifier(minimize_cores=minimize).verify(spec)
+        assert not result.is_consistent
+        assert sorted(result.conflicts["invariants"]) == [
+            "A.x_high: x < 2 or y < 0", "A.x_low: x > 5", "A.y_pos: y >= 0",
+        ]
+
+    spec["entities"][0]["invariants"].pop()
+    spec["services"] = [{"name": "Shrink", "inputs": [{"name": "n", "type": "Int"}],
+                         "preconditions": ["n > 0", "A(id).x <= n", "n < 3"]}]
+    result = FormalVerifier(minimize_cores=True, core_budget_ms=500).verify(spec)
+    assert result.is_consistent and not result.is_complete
+    assert sorted(result.conflicts["Shrink"]) == [
+        "A.x_low: x > 5", "Shrink.pre[1]: A(id).x <= n", "Shrink.pre[2]: n < 3",
+    ]
+
+
+def test_counterexample_search_streams_patterns_and_boundary_probes():
+    import types
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    spec = load_spec(spec_path)
+    stream = CounterexampleFinder().iter_suspicious_states(spec)
+    assert isinstance(stream, types.GeneratorType)
+    first = next(stream)
+    assert (first.probe, first.entity_name) == ("zero_amount_transfer", "Transaction")
+
+    probes = {(s.entity_name, s.probe) for s in CounterexampleFinder().find_suspicious_states(spec)}
+    assert ("Wallet", "zero:balance") in probes
+    assert ("Wallet", "min:balance") not in probes
+    assert ("Transaction", "equal:from_wallet_id=to_wallet_id") in probes
+    assert ("Transfer", "equal:from_wallet_id=to_wallet_id") not in probes
+    assert ("Transfer", "zero:amount") not in probes
+    assert ("Wallet", "negative_balance_active") not in probes
+
+    violation = CounterexampleFinder().find_counterexample_for_invariant(spec, "Wallet", "balance > 0")
+    assert violation is not None and violation.variable_values["Wallet_balance"] == "0"
+
+
+def test_budgeted_verification_reports_per_check_stats():
+    from src.formal.parallel import CheckOutcome, CheckStat, CheckTask, check_name
+    from src.formal.scheduler import ScheduledCheck, VerificationScheduler
+    import time
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    spec = load_spec(spec_path)
+    budgeted = FormalVerifier(budget_ms=5000).verify(spec)
+    with pytest.raises(ValueError, match="budget_ms"):
+        FormalVerifier(parallel=True, budget_ms=5000)
+    assert budgeted == FormalVerifier().verify(spec)
+    assert [s.name for s in budgeted.check_stats] == ["consistency", "service:CreateWallet", "service:Transfer"]
+    assert all(s.attempts == 1 and s.statistics for s in budgeted.check_stats)
+
+    slices = []
+
+    def stubborn(timeout_ms):
+        slices.append(timeout_ms)
+        time.sleep(timeout_ms / 1000.0)
+        task = CheckTask(0, "service", "Slow")
+        stat = CheckStat(check_name(task), "unknown", timeout_ms / 1000.0, 1, timeout_ms, reason="timeout")
+        return CheckOutcome(task, "unknown", stat=stat)
+
+    outcomes = VerificationScheduler(budget_ms=120, initial_slice_ms=10, growth=3).run(
+        [ScheduledCheck(CheckTask(0, "service", "Slow"), stubborn)]
+    )
+    assert slices[:2] == [10, 30] and 0 < slices[2] <= 90 and sum(slices) <= 120
+    assert outcomes[0].status == "unknown" and outcomes[0].stat.attempts == len(slices)
+
+    calls = []
+
+    def incomplete(timeout_ms):
+        calls.append(timeout_ms)
+        task = CheckTask(0, "service", "Quantified")
+        stat = CheckStat(check_name(task), "unknown", 0.0, 0, timeout_ms, cache_hit=True, reason="incomplete")
+        return CheckOutcome(task, "unknown", cache_hit=True, stat=stat)
+
+    scheduler = VerificationScheduler(budget_ms=120, initial_slice_ms=10)
+    scheduler.run([ScheduledCheck(CheckTask(0, "service", "Q"), incomplete)])
+    assert calls == [10]
+
+
+def test_invariants_are_sliced_into_independent_components():
+    from z3 import unsat
+    from src.formal.session import VerificationSession
+    from src.formal.z3_translator import translate_spec_to_z3
+
+    spec = {
+        "entities": [
+            {"name": "A", "fields": [{"name": "x", "type": "Int"}, {"name": "y", "type": "Int"}],
+             "invariants": [{"name": "x_pos", "expr": "x > 0"}, {"name": "y_gt_x", "expr": "y > x"}]},
+            {"name": "B", "fields": [{"name": "z", "type": "Int"}],
+             "invariants": [{"name": "z_low", "expr": "z < 0"}]},
+        ],
+        "services": [
+            {"name": "TouchB", "inputs": [{"name": "n", "type": "Int"}], "preconditions": ["B(n).z == n"]},
+            {"name": "Alone", "inputs": [{"name": "n", "type": "Int"}], "preconditions": ["n > 1"]},
+        ],
+    }
+    translation = translate_spec_to_z3(spec)
+    assert [c.formulas for c in translation.components] == [[0, 1], [2]]
+    assert translation.precondition_components == {"TouchB": [1], "Alone": []}
+    assert FormalVerifier().verify(spec).is_complete
+
+    spec["entities"][0]["invariants"].append({"name": "x_neg", "expr": "x < 0"})
+    session = VerificationSession(spec)
+    assert session.check_service("TouchB") == unsat
+    assert session.last_core() == ["A.x_pos: x > 0", "A.x_neg: x < 0"]
+    result = FormalVerifier().verify(spec)
+    assert result.conflicts["invariants"] == ["A.x_pos: x > 0", "A.x_neg: x < 0"]
+
+
+def test_translator_detects_logic_fragment_per_query():
+    from z3 import sat, unsat
+    from src.formal.z3_translator import build_consistency_solver, build_service_solver, translate_spec_to_z3
+
+    spec = {
+        "entities": [
+            {"name": "A", "fields": [{"name": "n", "type": "Int"}], "invariants": [{"name": "pos", "expr": "n > 0"}]},
+            {"name": "B", "fields": [{"name": "r", "type": "Decimal"}], "invariants": [{"name": "cap", "expr": "r <= 1.5"}]},
+        ],
+        "services": [
+            {"name": "Mix", "inputs": [{"name": "k", "type": "Int"}], "preconditions": ["B(k).r >= k"]},
+            {"name": "Square", "inputs": [{"name": "k", "type": "Int"}], "preconditions": ["A(k).n * k == 7 * k"]},
+        ],
+    }
+    t = translate_spec_to_z3(spec)
+    assert [t.query_logic([i]) for i in range(len(t.components))] == ["QF_LIA", "QF_LRA"]
+    assert t.query_logic(t.precondition_components["Mix"], "Mix") == "QF_LIRA"
+    assert t.query_logic(t.precondition_components["Square"], "Square") == "QF_NIA"
+    assert t.logic == "QF_NIRA"
+
+    assert build_consistency_solver(spec).check() == sat
+    spec["services"][0]["preconditions"].append("k > 2")
+    assert build_service_solver(spec, "Mix").check() == unsat
+    assert any("Mix" in e for e in FormalVerifier().verify(spec).errors)
+
+
+def test_model_enumeration_streams_distinct_projected_models():
+    from src.formal.model_enumeration import ModelEnumerator
+    from src.testgen.property_based import generate_all_property_tests
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    spec = load_spec(spec_path)
+    enumerator = ModelEnumerator(spec)
+
+    statuses = list(enumerator.models("Wallet", limit=10, project=["status"]))
+    assert sorted(row["status"] for row in statuses) == ["Active", "Closed", "Frozen"]
+
+    stream = enumerator.models("Wallet", limit=1000, project=["balance"])
+    first = [next(stream)["balance"] for _ in range(5)]
+    stream.close()
+    assert len(set(first)) == 5 and all(b >= 0 and b == b.quantize(Decimal("0.01")) for b in first)
+
+    assert not list(enumerator.models("Wallet", project=["balance"], where=["balance < 0"]))
+    negative = list(enumerator.models("Wallet", limit=3, project=["balance"],
+                                      where=["balance < 0"], relax=["Wallet.positive_balance"]))
+    assert len(negative) == 3
+    transfers = list(enumerator.models("Transfer", limit=20, project=["amount", "Wallet.balance"]))
+    assert len(transfers) == 20 and all(0 < row["amount"] <= row["Wallet.balance"] for row in transfers)
+
+    twins = {"name": "T", "entities": [{"name": "A", "fields": [{"name": "x", "type": "Int"}], "invariants": [
+        {"name": "bound", "expr": "x > 0"}, {"name": "bound", "expr": "x < 10"},
+    ]}], "services": []}
+    assert sorted(row["x"] for row in ModelEnumerator(twins).models("A", limit=20)) == list(range(1, 10))
+
+    tests = generate_all_property_tests(spec)["wallet_property_test.go"]
+    assert 'Balance: decimal.RequireFromString("0")' in tests
+    violations = [line for line in tests.splitlines() if line.endswith("false},")]
+    assert violations and all('Balance: decimal.RequireFromString("-0.01")' in line for line in violations)
+
+
+def test_daemon_keeps_specs_and_sessions_warm(tmp_path):
+    import json
+    from src.daemon.server import METHOD_NOT_FOUND, PARSE_ERROR, VerificationDaemon
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    daemon = VerificationDaemon(timeout_ms=5000, request_timeout_ms=10000)
+
+    def call(method, req_id=1, **params):
+        return json.loads(daemon.handle_line(json.dumps({"jsonrpc": "2.0", "id": req_id, "method": method, "params": params})))
+
+    loaded = call("load", path=str(spec_path))["result"]
+    assert call("load", text=spec_path.read_text())["result"]["spec_hash"] == loaded["spec_hash"]
+
+    first = call("verify", spec_hash=loaded["spec_hash"])["result"]
+    second = call("verify", path=str(spec_path))["result"]
+    assert first["is_consistent"] and first["spec_hash"] == second["spec_hash"]
+    assert {k: v for k, v in first.items() if k not in ("elapsed_ms", "check_stats")} == \
+        {k: v for k, v in second.items() if k not in ("elapsed_ms", "check_stats")}
+
+    generated = call("generate", spec_hash=loaded["spec_hash"], output_dir=str(tmp_path))["result"]
+    assert generated["spec_hash"] == loaded["spec_hash"] and (tmp_path / "entities" / "entities.go").exists()
+
+    assert call("nope")["error"]["code"] == METHOD_NOT_FOUND
+    assert json.loads(daemon.handle_line("{"))["error"]["code"] == PARSE_ERROR
+    stats = call("stats")["result"]
+    assert len(stats["specs"]) == 1 and stats["specs"][0]["warm"]
+    assert call("evict")["result"]["evicted"] == 1
+    assert call("shutdown")["result"]["ok"] and not daemon.running
+
+
+def test_smtlib_export_replays_offline_to_same_results(tmp_path):
+    import shutil
+    from fractions import Fraction
+    from src.formal.smtlib import run_batch
+
+    wallet = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    broken = {
+        "entities": [{"name": "A", "fields": [{"name": "x", "type": "Int"}],
+                      "invariants": [{"name": "lo", "expr": "x > 5"}, {"name": "hi", "expr": "x < 2"}]}],
+    }
+    shrink = {
+        "entities": [{"name": "A", "fields": [{"name": "x", "type": "Int"}],
+                      "invariants": [{"name": "x_low", "expr": "x > 5"}]}],
+        "services": [{"name": "Shrink", "inputs": [{"name": "n", "type": "Int"}],
+                      "preconditions": ["n > 0", "A(id).x <= n", "n < 3"]}],
+    }
+    specs = [wallet, broken, shrink]
+    verifier = FormalVerifier(minimize_cores=True)
+    manifest = verifier.export_smtlib(specs, tmp_path / "queries")
+    assert len(list(manifest.parent.glob("*.smt2"))) == 1 + len(wallet["services"]) + 1 + 2
+
+    run_batch(manifest, tmp_path / "shard0.jsonl", shard=(0, 2), max_workers=1)
+    run_batch(manifest, tmp_path / "shard1.jsonl", shard=(1, 2), max_workers=1)
+    offline = verifier.load_batch(manifest, [tmp_path / "shard0.jsonl", tmp_path / "shard1.jsonl"])
+    assert offline == verifier.verify_many(specs)
+    assert offline[1].conflicts["invariants"] == ["A.lo: x > 5", "A.hi: x < 2"]
+
+    if shutil.which("z3"):
+        run_batch(manifest, tmp_path / "binary.jsonl", z3_binary=shutil.which("z3"))
+        assert verifier.load_batch(manifest, [tmp_path / "binary.jsonl"]) == offline
+
+    transitions = FormalVerifier(instances=2)
+    assert transitions.load_batch(manifest, [tmp_path / "shard0.jsonl", tmp_path / "shard1.jsonl"]) == (
+        transitions.verify_many(specs)
+    )
+
+    finder = CounterexampleFinder()
+    probes = finder.export_smtlib(wallet, tmp_path / "probes")
+    run_batch(probes, tmp_path / "probes.jsonl", max_workers=1)
+    states = finder.load_batch(probes, [tmp_path / "probes.jsonl"])
+    live = finder.find_suspicious_states(wallet) + finder.find_invariant_counterexamples(wallet)
+    assert [(s.entity_name, s.probe, s.description) for s in states] == [
+        (s.entity_name, s.probe, s.description) for s in live
+    ]
+    assert ("Wallet", "balance >= 0") in [(s.entity_name, s.prevention_rule) for s in states]
+    assert Fraction(states[-1].variable_values["Wallet_balance"]) < 0
+
+
+def test_invariant_migration_safety_is_proven_symbolically():
+    import copy
+    from src.migration.data_validator import SAFE, UNSAFE, check_invariant_safety
+    from src.migration.migration_planner import can_migrate_data
+
+    spec_v1 = {"entities": [{
+        "name": "Wallet",
+        "fields": [{"name": "id", "type": "UUID"}, {"name": "balance", "type": "Decimal", "scale": 2},
+                   {"name": "status", "type": "Enum", "values": ["Active", "Frozen"]}],
+        "invariants": [{"name": "positive_balance", "expr": "balance >= 0"}],
+    }]}
+    spec_v2 = copy.deepcopy(spec_v1)
+    spec_v2["entities"][0]["fields"].append({"name": "daily_limit", "type": "Int", "default": 500})
+    spec_v2["entities"][0]["invariants"] = [
+        {"name": "positive_balance", "expr": "balance >= 0 and balance <= 1000000"},
+        {"name": "above_minus_one", "expr": "balance > -1"},
+        {"name": "limit_floor", "expr": "daily_limit >= 100"},
+        {"name": "frozen_empty", "expr": "status != Frozen or balance == 0"},
+    ]
+    diff = compute_diff(spec_v1, spec_v2)
+    assert {(c.name, c.action) for c in diff.invariant_changes} == {
+        ("positive_balance", "modified"), ("above_minus_one", "added"),
+        ("limit_floor", "added"), ("frozen_empty", "added"),
+    }
+
+    results = {s.invariant: s for s in check_invariant_safety(spec_v1, spec_v2, diff)}
+    assert results["above_minus_one"].status == SAFE and results["limit_floor"].status == SAFE
+    capped = results["positive_balance"]
+    assert capped.status == UNSAFE and capped.counterexample["balance"] > 1000000
+    assert capped.violation_query() == "SELECT * FROM wallets WHERE COALESCE(balance > 1000000, TRUE);"
+    assert results["frozen_empty"].sql_predicate == (
+        "(COALESCE(status = 'Frozen', TRUE) AND COALESCE(balance <> 0, TRUE))"
+    )
+    assert results["frozen_empty"].counterexample["status"] == "Frozen"
+
+    ok, errors = can_migrate_data(diff, spec_v2, spec_v1)
+    assert not ok and len(errors) == 2
+
+    spec_v3 = copy.deepcopy(spec_v2)
+    spec_v3["entities"][0]["invariants"] = [{"name": "halves", "expr": "daily_limit / 3 >= 40"}]
+    halves = check_invariant_safety(spec_v2, spec_v3)[0]
+    assert halves.status == UNSAFE and halves.sql_predicate == (
+        "COALESCE((SIGN(3) * FLOOR(CAST(daily_limit AS NUMERIC) / NULLIF(ABS(3), 0))) < 40, TRUE)"
+    )
+    assert can_migrate_data(diff, spec_v2) == (True, [])
+
+
+def test_minimal_checks_drop_implied_invariants(tmp_path):
+    from src.formal.redundancy import find_redundant_invariants
+
+    spec = {"name": "S", "entities": [{
+        "name": "Account",
+        "fields": [{"name": "balance", "type": "Decimal"}, {"name": "x", "type": "Int"},
+                   {"name": "state", "type": "Enum", "values": ["On", "Off"]}],
+        "invariants": [
+            {"name": "non_negative", "expr": "balance >= 0"},
+            {"name": "positive", "expr": "balance > 0"},
+            {"name": "x_low", "expr": "x >= 10"},
+            {"name": "x_range", "expr": "x >= 5 and x <= 200"},
+            {"name": "x_high", "expr": "x <= 100"},
+            {"name": "on", "expr": "state == On"},
+            {"name": "not_off", "expr": "state != Off"},
+        ],
+    }], "services": []}
+    report = find_redundant_invariants(spec)["Account"]
+    assert [(r.name, r.implied_by) for r in report] == [
+        ("non_negative", ["Account.positive"]),
+        ("x_range", ["Account.x_low", "Account.x_high"]),
+        ("not_off", ["Account.on"]),
+    ]
+
+    artifacts = GoCodeGenerator(minimal_checks=True).generate(spec, output_dir=tmp_path)
+    code = (tmp_path / "entities" / "entities.go").read_text()
+    assert "// non_negative: balance >= 0 (implied by Account.positive)" in code
+    assert code.count("ErrInvariantViolation{") == 4 and "if !(e.State == AccountOn) {" in code
+    assert 'Invariant: "positive", Message: "balance > 0"' in code and 'Invariant: "x_range"' not in code
+    assert [r["name"] for r in artifacts["redundant_invariants"]] == ["non_negative", "x_range", "not_off"]
+
+    full = GoCodeGenerator().generate(spec, output_dir=tmp_path / "full")
+    assert "redundant_invariants" not in full
+    assert (tmp_path / "full" / "entities" / "entities.go").read_text().count("ErrInvariantViolation{") == 7
+
+
+def test_redundancy_treats_enums_as_open():
+    from src.formal.redundancy import find_redundant_invariants
+
+    spec = {"name": "S", "entities": [{
+        "name": "Wallet",
+        "fields": [{"name": "status", "type": "Enum", "values": ["Active", "Frozen", "Closed"]}],
+        "invariants": [
+            {"name": "closed", "expr": "status == Closed"},
+            {"name": "not_active", "expr": "status != Active"},
+            {"name": "not_frozen", "expr": "status != Frozen"},
+            {"name": "known", "expr": "status in [Active, Frozen, Closed]"},
+        ],
+    }], "services": []}
+    report = find_redundant_invariants(spec)["Wallet"]
+    assert [(r.name, r.implied_by) for r in report] == [
+        ("not_active", ["Wallet.closed"]), ("not_frozen", ["Wallet.closed"]), ("known", ["Wallet.closed"]),
+    ]
+    spec["entities"][0]["invariants"] = spec["entities"][0]["invariants"][1:]
+    assert find_redundant_invariants(spec) == {}
+
+
+def test_minimal_checks_render_matches_report(tmp_path):
+    spec = {"name": "S", "entities": [{
+        "name": "Account",
+        "fields": [{"name": "x", "type": "Int"}, {"name": "state", "type": "Enum", "values": ["On", "Off"]}],
+        "invariants": [
+            {"name": "always", "expr": "x >= 0 or x < 0"},
+            {"name": "positive", "expr": "x > 0"},
+            {"name": "non_negative", "expr": "x >= 0"},
+            {"name": "either", "expr": "state != On or state != Off"},
+        ],
+    }], "services": [{
+        "name": "Touch", "inputs": [{"name": "n", "type": "Int"}],
+        "preconditions": ["n >= 0 or n < 0", "n > 1", "n > 0"],
+    }]}
+    artifacts = GoCodeGenerator(minimal_checks=True).generate(spec, output_dir=tmp_path)
+    reported = {r["name"]: r["implied_by"] for r in artifacts["redundant_invariants"]}
+    assert reported == {"non_negative": ["Account.positive"]}
+    code = (tmp_path / "entities" / "entities.go").read_text()
+    for inv in spec["entities"][0]["invariants"]:
+        commented = f"// {inv['name']}: {inv['expr']} (implied by " in code
+        assert commented == (inv["name"] in reported)
+        assert (f'Invariant: "{inv["name"]}"' in code) == (inv["name"] not in reported)
+
+    assert [(r["expr"], r["implied_by"]) for r in artifacts["redundant_preconditions"]] == [
+        ("n > 0", ["Touch.pre[1]"]),
+    ]
+    assert "implied by )" not in (tmp_path / "services" / "touch.go").read_text()
+
+
+def test_service_preconditions_are_pruned_and_cost_ordered(tmp_path):
+    from src.formal.redundancy import find_redundant_preconditions
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    spec["services"][1]["preconditions"] += ["amount >= 1", "Wallet(from_wallet_id).balance >= 0"]
+    report = {r.expr: r.implied_by for r in find_redundant_preconditions(spec)["Transfer"]}
+    assert report == {
+        "amount > 0": ["Transfer.pre[6]"],
+        "Wallet(from_wallet_id).balance >= 0": ["Wallet.positive_balance"],
+    }
+
+    artifacts = GoCodeGenerator(minimal_checks=True).generate(spec, output_dir=tmp_path)
+    assert {r["label"] for r in artifacts["redundant_preconditions"]} == {"Transfer.pre[0]", "Transfer.pre[7]"}
+    code = (tmp_path / "services" / "transfer.go").read_text()
+    assert "// amount > 0 (implied by Transfer.pre[6])" in code
+    first_lookup = code.index("deps.LoadWallet(ctx, req.FromWalletId)")
+    assert code.index("req.FromWalletId != req.ToWalletId") < first_lookup
+    assert code.index("req.Amount.Cmp(decimal.NewFromInt(1)) >= 0") < first_lookup
+    assert first_lookup < code.index("fromWallet.Balance.Cmp(req.Amount) >= 0")
+    assert code.count("deps.LoadWallet(") == 2
+
+    GoCodeGenerator().generate(spec, output_dir=tmp_path / "full")
+    full = (tmp_path / "full" / "services" / "transfer.go").read_text()
+    assert "req.Amount.Cmp(decimal.Zero) > 0" in full and "implied by" not in full
+    assert "precondition not checked" in (tmp_path / "full" / "services" / "create_wallet.go").read_text()
+
+
+def test_fixed_point_decimal_encoding():
+    from z3 import Solver, sat
+    from src.formal.expr_lowering import Z3Lowerer
+    from src.formal.z3_translator import translate_spec_to_z3
+
+    spec = {
+        "name": "Ledger",
+        "entities": [{
+            "name": "Entry",
+            "fields": [
+                {"name": "amount", "type": "Decimal", "precision": 6, "scale": 2},
+                {"name": "units", "type": "Int"},
+            ],
+            "invariants": [{"name": "third", "expr": "amount * 3 == 1"}],
+        }],
+        "services": [],
+    }
+    assert FormalVerifier().verify(spec).is_consistent
+    result = FormalVerifier(decimal_encoding="fixed").verify(spec)
+    assert not result.is_consistent
+    assert result.conflicts["invariants"] == ["Entry.third: amount * 3 == 1"]
+
+    spec["entities"][0]["invariants"] = [{"name": "large", "expr": "amount >= 10000"}]
+    assert FormalVerifier().verify(spec).is_consistent
+    result = FormalVerifier(decimal_encoding="fixed").verify(spec)
+    assert result.conflicts["invariants"] == ["Entry.large: amount >= 10000", "Entry.amount:range: DECIMAL(6,2)"]
+
+    t = translate_spec_to_z3(spec, "fixed")
+    lowerer = Z3Lowerer(t.entity_scopes["Entry"])
+    for expr, expected in [
+        ("amount == 0.5 and units == 3", True),
+        ("amount == 0.5 and units == 3 and amount / units == 0.17", True),
+        ("amount == -0.5 and units == 3 and amount / units == -0.17", True),
+        ("amount == 0.25 and units == 2 and amount / units == 0.13", True),
+        ("amount == 0.005", False),
+        ("amount == 1.50 and units == 2 and amount + units == 3.5", True),
+    ]:
+        solver = Solver()
+        solver.add(*t.invariant_formulas[1:], lowerer.lower_bool(expr))
+        assert (solver.check() == sat) == expected, expr
+
+    with pytest.raises(ValueError):
+        translate_spec_to_z3(spec, "binary")
+
+
+def test_typed_sorts_for_enum_bool_uuid_timestamp():
+    from src.formal.model_enumeration import ModelEnumerator
+    from src.formal.z3_translator import translate_spec_to_z3
+
+    spec = {
+        "name": "Accounts",
+        "entities": [{
+            "name": "Account",
+            "fields": [
+                {"name": "id", "type": "UUID", "primary_key": True},
+                {"name": "owner_id", "type": "UUID"},
+                {"name": "status", "type": "Enum", "values": ["Active", "Frozen", "Closed"]},
+                {"name": "verified", "type": "Boolean"},
+                {"name": "opened_at", "type": "Timestamp"},
+            ],
+            "invariants": [
+                {"name": "known_status", "expr": "status != Active and status != Frozen"},
+                {"name": "closed_unverified", "expr": "status != Closed or not verified"},
+            ],
+        }],
+        "services": [],
+    }
+    t = translate_spec_to_z3(spec)
+    assert str(t.entity_vars["Account"]["status"].sort()).startswith("Account_status_enum_")
+    assert str(t.entity_vars["Account"]["id"].sort()) == "UUID"
+    assert t.domain_labels == {"Account.opened_at:range"}
+    rows = list(ModelEnumerator(spec).models("Account", project=["status", "verified"]))
+    assert rows == [{"status": "Closed", "verified": False}]
+
+    spec["entities"][0]["invariants"].append({"name": "not_closed", "expr": "status != Closed"})
+    result = FormalVerifier().verify(spec)
+    assert not result.is_consistent
+    assert sorted(result.conflicts["invariants"]) == [
+        "Account.known_status: status != Active and status != Frozen",
+        "Account.not_closed: status != Closed",
+    ]
+
+    spec["entities"][0]["invariants"] = [
+        {"name": "far_future", "expr": "opened_at > 300000000000"},
+        {"name": "ordered_ids", "expr": "id < owner_id"},
+        {"name": "bogus_status", "expr": "status == Deleted"},
+    ]
+    result = FormalVerifier().verify(spec)
+    assert result.conflicts["invariants"] == [
+        "Account.far_future: opened_at > 300000000000",
+        "Account.opened_at:range: TIMESTAMP",
+    ]
+    assert [where for where, _, _ in translate_spec_to_z3(spec).untranslated] == [
+        "Account.ordered_ids",
+        "Account.bogus_status",
+    ]
+
+
+def test_transitions_preserve_invariants_across_instances():
+    from src.formal.transitions import PRESERVED, VIOLATED, verify_transitions
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    results = {r.service: r for r in verify_transitions(spec, instances=3)}
+    assert results["Transfer"].status == PRESERVED
+    assert results["CreateWallet"].status == PRESERVED
+    assert [where for where, _, _ in results["Transfer"].untranslated] == ["Transfer.post[2]"]
+
+    transfer = next(s for s in spec["services"] if s["name"] == "Transfer")
+    transfer["preconditions"].remove("Wallet(from_wallet_id).balance >= amount")
+    results = {r.service: r for r in verify_transitions(spec, instances=3)}
+    assert results["Transfer"].status == VIOLATED
+    assert results["Transfer"].violated == ["Wallet.positive_balance"]
+
+    result = FormalVerifier(instances=3).verify(spec)
+    assert not result.is_complete
+    labels = [w.partition(": ")[0] for w in result.warnings if "not translated" in w]
+    assert sorted(labels) == ["CreateWallet.pre[1]", "Transfer.post[2]"]
+    assert result.violations == {"Transfer": ["Wallet.positive_balance"]}
+    assert FormalVerifier().verify(spec).violations == {}
+
+
+def test_async_verification_streams_and_cancels():
+    import asyncio
+    import time
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    hard = {
+        "name": "Hard",
+        "entities": [{
+            "name": "Cube",
+            "fields": [{"name": "a", "type": "Int"}, {"name": "b", "type": "Int"}, {"name": "c", "type": "Int"}],
+            "invariants": [
+                {"name": "cubes", "expr": "a * a * a + b * b * b == c * c * c"},
+                {"name": "large", "expr": "a > 1000 and b > 1000 and c > 0"},
+            ],
+        }],
+        "services": [],
+    }
+    verifier = FormalVerifier(timeout_ms=60000)
+
+    async def run() -> tuple[list[str], float, bool]:
+        streamed = [f"{o.task.kind}:{o.task.target}" async for o in verifier.stream_checks(spec)]
+        task = asyncio.create_task(verifier.verify_async(hard))
+        await asyncio.sleep(0.3)
+        start = time.perf_counter()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        result = await verifier.verify_async(spec)
+        return streamed, time.perf_counter() - start, result.is_consistent and result.is_complete
+
+    streamed, elapsed, ok = asyncio.run(run())
+    assert streamed == ["consistency:", "service:CreateWallet", "service:Transfer"]
+    assert elapsed < 5
+    assert ok
+
+
+def test_single_pass_loader_builds_ast_accepted_by_pipeline():
+    from src.dsl.spec_loader import SpecFormatError, load_specification, parse_specification_text
+    from src.dsl.validator import validate_specification
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    ast = load_specification(spec_path)
+    assert ast.services[1].contract.preconditions[0] == ast["services"][1]["preconditions"][0]
+    assert ast["services"][1]["strategy"] == "ACID_Transaction"
+    assert compute_diff(load_spec(spec_path), ast).field_changes == []
+    assert validate_specification(ast) == []
+    result = FormalVerifier().verify(ast)
+    assert result.is_consistent and result.is_complete
+
+    parsed = parse_specification_text("services:\n  - name: Pay\n    inputs: ['amount: Decimal', note]\n")
+    assert [(p.name, p.type) for p in parsed.services[0].contract.inputs] == [("amount", "Decimal"), ("note", "String")]
+    with pytest.raises(SpecFormatError, match=r"entities\[0\]\.fields\[0\]\.name: Field required"):
+        parse_specification_text("entities:\n  - name: A\n    fields:\n      - type: Int\n")
+
+
+def test_slotted_ast_shares_types_and_keeps_dict_view():
+    import dataclasses
+
+    from src.dsl.ast_nodes import TypeTable, spec_dict_to_ast
+    from src.dsl.spec_loader import build_specification
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    types = TypeTable()
+    ast = build_specification(spec, types)
+    wallet, transaction = ast.entities
+    assert not hasattr(wallet.fields[0], "__dict__")
+    assert wallet.fields[0].field_type is transaction.fields[0].field_type
+    assert wallet.fields[0].name is transaction.fields[0].name
+    assert len(types) < sum(len(e.fields) for e in ast.entities)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        wallet.name = "Purse"
+
+    assert wallet["fields"][4]["values"] == ("Active", "Frozen", "Closed")
+    assert wallet["fields"] is wallet.fields
+    assert wallet["fields"][2] == spec["entities"][0]["fields"][2]
+    assert list(spec_dict_to_ast(spec)["services"]) == spec["services"]
+
+    again = build_specification(spec, TypeTable())
+    assert {wallet: 1}[again.entities[0]] == 1 and hash(ast) == hash(again)
+    assert len({*ast.entities, *again.entities}) == 2
+
+
+def test_spec_index_reference_graph_drives_validation():
+    from src.dsl.spec_index import PRECONDITION, SpecIndex
+    from src.dsl.validator import validate_specification
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    index = SpecIndex(spec)
+    assert index.field("Wallet", "balance")["precision"] == 18
+    assert index.enum_field("Wallet")["name"] == "status"
+    transfer = [r for r in index.referenced_by("Wallet") if r.owner == "Transfer" and r.kind == PRECONDITION]
+    assert [r.label for r in transfer] == [f"Transfer.pre[{i}]" for i in range(2, 6)]
+    assert transfer[2].fields == (("Wallet", "balance"),)
+    assert index.referenced_by("Transaction") == []
+
+    spec["entities"][1]["invariants"] = [{"name": "cross", "expr": "Wallet(from_wallet_id).balance >= amount"}]
+    spec["services"][1]["preconditions"].append("Wallet(from_wallet_id).bogus > 0 and 'Wallet(x).nope' != ''")
+    assert validate_specification(spec) == [
+        "Entity Transaction, invariant cross: reference to Wallet — use only your entity's fields",
+        "Service Transfer: precondition references non-existent field bogus",
+    ]
+
+
+def test_incremental_validation_matches_full_validation():
+    import copy
+
+    from src.dsl.spec_loader import load_specification
+    from src.dsl.validator import IncrementalValidator, SpecEdit, validate_specification
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    spec_v1 = load_spec(spec_path)
+    validator = IncrementalValidator(spec_v1)
+    assert validator.errors == []
+
+    # Transfer is untouched, but its preconditions read the dropped field through the reference graph.
+    spec_v2 = copy.deepcopy(spec_v1)
+    spec_v2["entities"][0]["fields"] = [f for f in spec_v2["entities"][0]["fields"] if f["name"] != "currency"]
+    spec_v2["services"][0]["inputs"].append({"name": "", "type": "String"})
+    errors = validator.update(spec_v2, compute_diff(spec_v1, spec_v2))
+    assert errors == validate_spec(spec_v2) + validate_specification(spec_v2)
+    assert errors == [
+        "Service Transfer: precondition references non-existent field currency",
+        "Service CreateWallet: empty parameter name",
+    ]
+
+    spec_v3 = copy.deepcopy(spec_v2)
+    spec_v3["services"][0]["inputs"][-1] = {"type": 3}
+    spec_v3["entities"].append({"name": "Ledger", "fields": [{"name": "id", "type": "UUID"}], "invariants": [
+        {"name": "cross", "expr": "Wallet(id).balance >= 0"},
+    ]})
+    errors = validator.update(spec_v3, SpecEdit(frozenset({"Ledger"}), frozenset({"CreateWallet"})))
+    assert errors == validate_spec(spec_v3) + validate_specification(spec_v3)
+    assert "validation error" in errors[0] and len(errors) == 4
+
+    ast = load_specification(spec_path)
+    assert IncrementalValidator(ast).update(ast, SpecEdit(frozenset({"Wallet"}))) == []
+
+
+def test_compiled_spec_cache_skips_yaml_and_pydantic(tmp_path, monkeypatch):
+    from src.dsl import spec_cache, spec_loader
+
+    spec_path = Path(__file__).parent.parent / "examples" / "wallet_system.yaml"
+    cache_dir = tmp_path / "cbc"
+    spec = load_spec(spec_path, cache_dir)
+    ast = spec_loader.load_specification(spec_path, cache_dir)
+    assert len(list(cache_dir.glob("*.cbc"))) == 2
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(spec_loader.yaml, "load", fail)
+    monkeypatch.setattr(spec_loader.SpecModel, "model_validate", fail)
+    assert load_spec(spec_path, cache_dir) == spec
+    cached = spec_loader.load_specification(spec_path, cache_dir)
+    assert cached.entities[0].fields[2].precision == 18 and cached["services"] == ast["services"]
+
+    assert cached.entities[0].fields[2].field_type is ast.entities[0].fields[2].field_type
+    assert cached.entities[0].name is ast.entities[0].name
+
+    monkeypatch.setattr(spec_cache, "LOADER_DIGEST", "changed")
+    with pytest.raises(AssertionError, match="cache miss"):
+        load_spec(spec_path, cache_dir)
+    monkeypatch.undo()
+
+    for path in cache_dir.glob("*.cbc"):
+        path.chmod(0o666)
+    monkeypatch.setattr(spec_loader.yaml, "load", fail)
+    with pytest.raises(AssertionError, match="cache miss"):
+        load_spec(spec_path, cache_dir)
+    monkeypatch.undo()
+
+    for path in cache_dir.glob("*.cbc"):
+        path.write_bytes(path.read_bytes()[:20])
+    assert load_spec(spec_path, cache_dir) == spec
+
+
+def test_modular_specs_resolve_imports_lazily(tmp_path):
+    from src.dsl.modules import ModuleError, SpecWorkspace, load_modular_spec, load_modular_specification
+    from src.dsl.validator import validate_specification
+
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "wallets.yaml").write_text(
+        "name: Wallets\n"
+        "entities:\n"
+        "  - name: Wallet\n"
+        "    fields: [{name: id, type: UUID, primary_key: true}, {name: balance, type: Decimal}]\n"
+    )
+    (tmp_path / "billing.yaml").write_text(
+        "name: Billing\n"
+        "imports: [shared/wallets.yaml, ledger.yaml]\n"
+        "services:\n"
+        "  - name: Charge\n"
+        "    inputs: [{name: wallet_id, type: UUID}, {name: amount, type: Decimal}]\n"
+        "    preconditions: ['Wallet(wallet_id).balance >= amount', 'Wallet(wallet_id).limit > 0']\n"
+    )
+    (tmp_path / "ledger.yaml").write_text(
+        "imports: [shared/wallets.yaml]\n"
+        "entities: [{name: Entry, fields: [{name: id, type: UUID}, {name: wallet_id, type: UUID}]}]\n"
+    )
+    (tmp_path / "broken.yaml").write_text("entities: [\n")
+
+    spec = load_modular_spec(tmp_path / "billing.yaml", max_workers=1)
+    assert spec["name"] == "Billing"
+    assert [e["name"] for e in spec["entities"]] == ["Wallet", "Entry"]
+    assert validate_specification(spec) == ["Service Charge: precondition references non-existent field limit"]
+    ast = load_modular_specification(tmp_path / "billing.yaml", max_workers=1)
+    assert [s.name for s in ast.services] == ["Charge"] and ast.entities[0].fields[1].type == "Decimal"
+
+    with SpecWorkspace(max_workers=1) as workspace:
+        workspace.load(tmp_path / "ledger.yaml")
+        assert sorted(p.name for p in workspace.modules) == ["ledger.yaml", "wallets.yaml"]
+        (tmp_path / "dup.yaml").write_text("imports: [ledger.yaml]\nentities: [{name: Entry, fields: []}]\n")
+        with pytest.raises(ModuleError, match="Entity Entry is defined in both"):
+            workspace.load(tmp_path / "dup.yaml")
+        (tmp_path / "dup.yaml").write_text("imports: [missing.yaml]\n")
+        with pytest.raises(ModuleError, match="imported module missing.yaml not found"):
+            workspace.load(tmp_path / "dup.yaml")
+    with pytest.raises(ModuleError, match="broken.yaml: YAML parsing error"):
+        load_modular_spec(tmp_path / "broken.yaml", max_workers=1)
+
+    assert load_modular_spec(tmp_path / "billing.yaml", max_workers=2) == spec
+
+
+def test_invariant_probes_disable_the_probed_invariant():
+    from fractions import Fraction
+
+    spec = {"entities": [{
+        "name": "Account",
+        "fields": [{"name": "balance", "type": "Decimal"}, {"name": "limit", "type": "Decimal"}],
+        "invariants": [
+            {"name": "non_negative", "expr": "balance >= 0"},
+            {"name": "reserve", "expr": "balance >= 10"},
+            {"name": "within_limit", "expr": "limit >= balance"},
+        ],
+    }]}
+    sequential = CounterexampleFinder().find_invariant_counterexamples(spec)
+    assert [s.prevention_rule for s in sequential] == ["balance >= 10", "limit >= balance"]
+    assert Fraction(sequential[0].variable_values["Account_balance"]) < 10
+    values = sequential[1].variable_values
+    assert Fraction(values["Account_limit"]) < Fraction(values["Account_balance"])
+
+    parallel = CounterexampleFinder(parallel=True, max_workers=2).find_invariant_counterexamples(spec)
+    assert [s.prevention_rule for s in parallel] == ["balance >= 10", "limit >= balance"]
+
+
+def test_parallel_verification_solves_components_separately():
+    from src.formal.parallel import COMPONENT
+
+    spec = {"name": "Split", "entities": [
+        {"name": "A", "fields": [{"name": "x", "type": "Int"}], "invariants": [{"name": "a", "expr": "x > 0"}]},
+        {"name": "B", "fields": [{"name": "y", "type": "Int"}],
+         "invariants": [{"name": "lo", "expr": "y > 5"}, {"name": "hi", "expr": "y < 2"}]},
+    ], "services": []}
+    verifier = FormalVerifier(parallel=True, max_workers=2)
+    assert [t.kind for t in verifier._plan_parallel(0, spec)] == [COMPONENT, COMPONENT]
+
+    parallel = verifier.verify_many([spec])[0]
+    assert parallel == FormalVerifier().verify(spec)
+    assert not parallel.is_consistent
+    assert parallel.conflicts["invariants"] == ["B.lo: y > 5", "B.hi: y < 2"]
+    assert [s.name for s in parallel.check_stats] == ["consistency"]
+
+
+def test_session_asserts_component_invariants_once():
+    from src.formal.session import VerificationSession
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    session = VerificationSession(spec)
+    session.check_consistency()
+    solver = session.solver_for(session.translation.query_logic([0]))
+    before = len(solver.assertions())
+    assert before >= len(session.translation.components[0].formulas)
+    for service in spec["services"]:
+        session.check_service(service["name"])
+    assert len(solver.assertions()) == before
+
+
+def test_enum_sort_names_do_not_depend_on_translation_history():
+    import subprocess
+    from src.formal.verdict_cache import canonical_digest
+    from src.formal.z3_translator import translate_spec_to_z3
+
+    def spec(values):
+        fields = [{"name": "status", "type": "Enum", "values": values}]
+        return {"entities": [{"name": "W", "fields": fields, "invariants": [{"name": "s", "expr": "status != A"}]}]}
+
+    translate_spec_to_z3(spec(["B", "A"]))
+    digest = canonical_digest(translate_spec_to_z3(spec(["A", "B"])).invariant_formulas)
+    script = (
+        "from src.formal.verdict_cache import canonical_digest; "
+        "from src.formal.z3_translator import translate_spec_to_z3; "
+        f"print(canonical_digest(translate_spec_to_z3({spec(['A', 'B'])!r}).invariant_formulas))"
+    )
+    fresh = subprocess.run([sys.executable, "-c", script], cwd=Path(__file__).parent.parent,
+                           capture_output=True, text=True, check=True)
+    assert fresh.stdout.strip() == digest
+
+
+def test_property_vectors_cover_invariant_fields_only():
+    from src.testgen.property_based import generate_all_property_tests, generate_test_vectors
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    assert "Currency" not in generate_all_property_tests(spec)["wallet_property_test.go"]
+
+    entity = {"name": "Acc", "fields": [
+        {"name": "status", "type": "Enum", "values": ["A", "B", "C"]},
+        {"name": "verified", "type": "Boolean"},
+        {"name": "n", "type": "Int"},
+        {"name": "note", "type": "String"},
+    ], "invariants": [{"name": "x", "expr": "status != C or not verified"}, {"name": "y", "expr": "n > 3"}]}
+    rows = [row for _, row, valid in generate_test_vectors(entity) if valid]
+    assert all(set(row) == {"status", "verified", "n"} for row in rows)
+    assert {(row["status"], row["verified"]) for row in rows} == {
+        ("A", False), ("A", True), ("B", False), ("B", True), ("C", False)
+    }
+    assert {4, 2**63 - 1} <= {row["n"] for row in rows}
+
+
+@pytest.mark.parametrize("raw", [
+    {"services": [{"name": "S", "strategy": "Bogus"}]},
+    {"services": [{"name": "S", "strategy": 5}]},
+    {"services": [{"name": "S", "inputs": ["a:Int", "b", 5], "timeout": "10"}]},
+    {"services": [{"name": "S", "preconditions": None}]},
+    {"services": [{"name": "S", "preconditions": [1]}]},
+    {"services": None},
+    {"entities": ["E", {"name": "F"}], "extra": 1},
+    {"entities": [{"name": "E", "fields": [{"name": "f", "type": 3, "precision": "5", "primary_key": "yes"}]}]},
+    {"entities": [{"name": "E", "fields": [{"name": "f", "precision": 5.5}]}]},
+    {"entities": [{"name": "E", "fields": [{"name": "f", "values": [1, 2]}]}]},
+    {"entities": [{"name": "E", "fields": [], "invariants": None}]},
+    {"entities": [{"name": "E", "fields": [], "invariants": [{"name": "i", "expr": {"expression": "x > 0"}}]}]},
+    {"architecture": {"requirements": {"rps_target": "50"}}},
+    {"name": 5},
+])
+def test_ast_loader_agrees_with_spec_model(raw):
+    import copy
+    from src.dsl.ast_nodes import to_plain
+    from src.dsl.spec_loader import SpecModel, build_specification
+
+    try:
+        expected = SpecModel.model_validate(copy.deepcopy(raw)).model_dump()
+    except ValueError:
+        with pytest.raises(ValueError):
+            build_specification(copy.deepcopy(raw))
+        return
+    assert to_plain(build_specification(copy.deepcopy(raw))) == expected
+
+
+def test_ast_loader_agrees_with_spec_model_on_examples():
+    from src.daemon.server import spec_hash
+    from src.dsl.ast_nodes import to_plain
+    from src.dsl.spec_loader import load_specification
+
+    for path in sorted((Path(__file__).parent.parent / "examples").glob("*.yaml")):
+        assert to_plain(load_specification(path)) == load_spec(path)
+        assert spec_hash(load_specification(path)) == spec_hash(load_spec(path))
+
+
+def test_daemon_evicts_on_accounted_memory_and_reports_memouts(monkeypatch):
+    import json
+    from src.daemon.server import MEMORY_EXCEEDED, VerificationDaemon
+    from src.formal.session import VerificationSession
+
+    daemon = VerificationDaemon(max_memory_mb=10**6, verifier_options={"minimize_cores": True})
+
+    def call(method, **params):
+        request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        return json.loads(daemon.handle_line(json.dumps(request)))
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    hashes = [call("load", spec={**spec, "name": f"W{i}"})["result"]["spec_hash"] for i in range(3)]
+    for entry in daemon._specs.values():
+        entry.size_mb = 100.0
+    daemon.max_memory_mb = daemon.base_memory_mb + 250
+    for _ in range(3):
+        call("load", spec_hash=hashes[2])
+        assert list(daemon._specs) == hashes[1:]
+
+    assert call("verify", spec_hash=hashes[2])["result"]["is_consistent"]
+    assert daemon._specs[hashes[2]].session.minimize_cores
+
+    def memout(self, timeout_ms=None):
+        raise MemoryError("out of memory")
+
+    monkeypatch.setattr(VerificationSession, "check_consistency", memout)
+    daemon._specs[hashes[2]].session = None
+    assert call("verify", spec_hash=hashes[2])["error"]["code"] == MEMORY_EXCEEDED
+    assert list(daemon._specs) == hashes[2:]
+
+
+def test_daemon_deadlines_interrupt_z3_and_only_memouts_evict(monkeypatch):
+    import json
+    import time
+    import z3
+    from src.daemon.server import REQUEST_TIMEOUT, SERVER_ERROR, VerificationDaemon
+    from src.formal.session import VerificationSession
+
+    daemon = VerificationDaemon(timeout_ms=60000)
+
+    def call(method, **params):
+        request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        return json.loads(daemon.handle_line(json.dumps(request)))
+
+    spec = load_spec(Path(__file__).parent.parent / "examples" / "wallet_system.yaml")
+    hashes = [call("load", spec={**spec, "name": f"W{i}"})["result"]["spec_hash"] for i in range(2)]
+
+    def stuck(self, timeout_ms=None):
+        a, b, c = z3.Ints("a b c")
+        solver = z3.Solver()
+        solver.add(a * a * a + b * b * b == c * c * c, a > 1000, b > 1000, c > 0)
+        return solver.check()
+
+    monkeypatch.setattr(VerificationSession, "check_consistency", stuck)
+    start = time.perf_counter()
+    assert call("verify", spec_hash=hashes[1], timeout_ms=300)["error"]["code"] == REQUEST_TIMEOUT
+    assert time.perf_counter() - start < 5
+
+    def invalid(self, spec):
+        raise z3.Z3Exception("invalid value for memory_max_size")
+
+    monkeypatch.setattr(FormalVerifier, "open_session", invalid)
+    daemon._specs[hashes[1]].session = None
+    assert call("verify", spec_hash=hashes[1])["error"]["code"] == SERVER_ERROR
+    assert list(daemon._specs) == hashes